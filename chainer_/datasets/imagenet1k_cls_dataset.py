@@ -90,6 +90,7 @@ class ImageNet1KMetaInfo(DatasetMetaInfo):
                args):
         super(ImageNet1KMetaInfo, self).update(args)
         self.input_image_size = (args.input_size, args.input_size)
+        self.resize_inv_factor = args.resize_inv_factor
 
 
 class ImageNetTrainTransform(object):
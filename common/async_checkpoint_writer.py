@@ -0,0 +1,131 @@
+"""
+    Background writer of checkpoint files.
+"""
+
+__all__ = ['AsyncCheckpointWriter', 'atomic_write']
+
+import os
+import queue
+import logging
+import threading
+
+
+def atomic_write(file_path,
+                 write_fn):
+    """
+    Write a file atomically: the data is written into a temporary file in the same directory, which is then renamed,
+    so readers see either the old file or the complete new one.
+
+    Parameters:
+    ----------
+    file_path : str
+        Destination file path.
+    write_fn : function
+        Function that takes a file path and writes the data into it.
+    """
+    tmp_file_path = "{}.tmp{}".format(file_path, os.getpid())
+    try:
+        write_fn(tmp_file_path)
+        with open(tmp_file_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_file_path, file_path)
+    finally:
+        if os.path.exists(tmp_file_path):
+            os.remove(tmp_file_path)
+
+
+class AsyncCheckpointWriter(object):
+    """
+    Executor of checkpoint file operations (writing, copying, removing) in a background thread. Operations are run
+    one by one in the order of submission, so a copy or a removal of a checkpoint file is done after its writing. An
+    error of an operation is raised in the training thread at the next submission (or at `wait`/`close`).
+
+    Parameters:
+    ----------
+    max_pending : int, default 1
+        Maximal number of pending write operations (submission blocks until the queue has room), which limits the host
+        memory for checkpoint snapshots.
+    """
+    def __init__(self,
+                 max_pending=1):
+        super(AsyncCheckpointWriter, self).__init__()
+        self.pending_write_count = threading.Semaphore(max_pending)
+        self.tasks = queue.Queue()
+        self.error = None
+        self.thread = threading.Thread(
+            target=self._run,
+            name="checkpoint_writer")
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                self.tasks.task_done()
+                break
+            fn, args, is_write = task
+            try:
+                if self.error is None:
+                    fn(*args)
+            except Exception as e:
+                logging.exception("Checkpoint writer error")
+                self.error = e
+            finally:
+                if is_write:
+                    self.pending_write_count.release()
+                self.tasks.task_done()
+
+    def _check_error(self):
+        if self.error is not None:
+            error = self.error
+            self.error = None
+            raise RuntimeError("Checkpoint writing failed: {}".format(error)) from error
+
+    def write(self,
+              file_path,
+              write_fn):
+        """
+        Submit an atomic writing of a file (see `atomic_write`).
+
+        Parameters:
+        ----------
+        file_path : str
+            Destination file path.
+        write_fn : function
+            Function that takes a file path and writes the data into it.
+        """
+        self._check_error()
+        self.pending_write_count.acquire()
+        self.tasks.put((atomic_write, (file_path, write_fn), True))
+
+    def submit(self,
+               fn,
+               *args):
+        """
+        Submit a file operation (e.g. `shutil.copy` or `os.remove`).
+
+        Parameters:
+        ----------
+        fn : function
+            Operation.
+        args : tuple
+            Operation arguments.
+        """
+        self._check_error()
+        self.tasks.put((fn, args, False))
+
+    def wait(self):
+        """
+        Wait until all submitted operations are done.
+        """
+        self.tasks.join()
+        self._check_error()
+
+    def close(self):
+        """
+        Finish all submitted operations and stop the thread.
+        """
+        if self.thread.is_alive():
+            self.tasks.put(None)
+            self.thread.join()
+        self._check_error()
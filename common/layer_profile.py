@@ -0,0 +1,166 @@
+"""
+    Per-layer profile of a model: aggregation of leaf layer statistics (wall time, output activation size) by layer
+    type, by parent block type (e.g. SE blocks), and by stage, logging, and CSV/JSON export.
+"""
+
+__all__ = ['get_layer_stage', 'aggregate_layer_stats', 'create_layer_profile', 'log_layer_profile',
+           'save_layer_profile']
+
+import os
+import csv
+import json
+import logging
+
+
+def get_layer_stage(layer_name,
+                    stage_depth=2):
+    """
+    Get the stage of a layer from its dotted name (e.g. 'features.stage2' for 'features.stage2.unit1.conv1.conv').
+
+    Parameters:
+    ----------
+    layer_name : str
+        Dotted layer name.
+    stage_depth : int, default 2
+        Number of name components in the stage name.
+
+    Returns
+    -------
+    str
+        Stage name.
+    """
+    return ".".join(layer_name.split(".")[:stage_depth])
+
+
+def aggregate_layer_stats(layers,
+                          key):
+    """
+    Aggregate layer statistics by a layer field.
+
+    Parameters:
+    ----------
+    layers : list of dict
+        Layer statistics (with fields `time`, `activation_bytes`, `params`).
+    key : str
+        Field to aggregate by ('type', 'block', or 'stage').
+
+    Returns
+    -------
+    list of dict
+        Aggregated statistics, sorted by time in descending order.
+    """
+    layer_time = sum(layer["time"] for layer in layers)
+    groups = {}
+    for layer in layers:
+        group = groups.setdefault(layer[key], {
+            key: layer[key],
+            "layers": 0,
+            "time": 0.0,
+            "activation_bytes": 0,
+            "params": 0})
+        group["layers"] += 1
+        group["time"] += layer["time"]
+        group["activation_bytes"] += layer["activation_bytes"]
+        group["params"] += layer["params"]
+    for group in groups.values():
+        group["time_share"] = group["time"] / layer_time if layer_time > 0 else 0.0
+    return sorted(groups.values(), key=lambda x: x["time"], reverse=True)
+
+
+def create_layer_profile(layers,
+                         model_time,
+                         peak_activation_bytes,
+                         peak_activation_layer,
+                         stage_depth=2):
+    """
+    Create a model profile from leaf layer statistics.
+
+    Parameters:
+    ----------
+    layers : list of dict
+        Layer statistics in the order of execution, each with fields `name`, `type`, `block` (type of the parent
+        block), `calls`, `time` (sec per forward pass), `activation_bytes` (output bytes per forward pass), `params`.
+    model_time : float
+        Time of a forward pass without hooks (sec).
+    peak_activation_bytes : int
+        Peak size of live activations.
+    peak_activation_layer : str
+        Layer after which the peak is reached.
+    stage_depth : int, default 2
+        Number of name components in the stage name.
+
+    Returns
+    -------
+    dict
+        Profile with per-layer and aggregated statistics.
+    """
+    for layer in layers:
+        layer["stage"] = get_layer_stage(layer["name"], stage_depth)
+    return {
+        "model_time": model_time,
+        "layer_time": sum(layer["time"] for layer in layers),
+        "peak_activation_bytes": peak_activation_bytes,
+        "peak_activation_layer": peak_activation_layer,
+        "layers": layers,
+        "by_type": aggregate_layer_stats(layers, "type"),
+        "by_block": aggregate_layer_stats(layers, "block"),
+        "by_stage": aggregate_layer_stats(layers, "stage"),
+    }
+
+
+def log_layer_profile(profile,
+                      top_k=10):
+    """
+    Log the summary of a model profile: total times, peak activation, and the slowest layer types, block types, and
+    stages.
+
+    Parameters:
+    ----------
+    profile : dict
+        Model profile.
+    top_k : int, default 10
+        Number of logged items of each aggregation.
+    """
+    msgs = ["Forward: {:.2f} ms, leaf layers: {:.2f} ms, peak activation: {:.2f} MB after {}".format(
+        profile["model_time"] * 1e3, profile["layer_time"] * 1e3, profile["peak_activation_bytes"] / 2 ** 20,
+        profile["peak_activation_layer"])]
+    for key in ("type", "block", "stage"):
+        msgs.append("By {}:".format(key))
+        for group in profile["by_{}".format(key)][:top_k]:
+            msgs.append("  {}: {:.2f} ms ({:.1f}%), {} layers, {:.2f} MB activations".format(
+                group[key], group["time"] * 1e3, 100.0 * group["time_share"], group["layers"],
+                group["activation_bytes"] / 2 ** 20))
+    logging.info("Layer profile:\n\t{}".format("\n\t".join(msgs)))
+
+
+def _write_csv(file_path, rows, fields):
+    with open(file_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_layer_profile(profile,
+                       file_path):
+    """
+    Save a model profile. A `.csv` path gets the per-layer table, with the aggregated tables in `<stem>_by_type.csv`,
+    `<stem>_by_block.csv`, and `<stem>_by_stage.csv`; any other path gets the whole profile as JSON.
+
+    Parameters:
+    ----------
+    profile : dict
+        Model profile.
+    file_path : str
+        Destination file path.
+    """
+    file_stem, file_ext = os.path.splitext(file_path)
+    if file_ext.lower() == ".csv":
+        _write_csv(file_path, profile["layers"],
+                   ["name", "type", "block", "stage", "calls", "time", "activation_bytes", "params"])
+        for key in ("type", "block", "stage"):
+            _write_csv("{}_by_{}.csv".format(file_stem, key), profile["by_{}".format(key)],
+                       [key, "layers", "time", "time_share", "activation_bytes", "params"])
+    else:
+        with open(file_path, "w") as f:
+            json.dump(profile, f, indent=2)
+    logging.info("Layer profile is saved: {}".format(file_path))
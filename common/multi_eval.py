@@ -0,0 +1,158 @@
+"""
+    Multi-model evaluation helpers: model specifications and grouping of models into transform buckets (models that
+    share input size and resize factor are evaluated over the same decoded data stream).
+"""
+
+__all__ = ['add_multi_eval_parser_arguments', 'parse_model_spec', 'get_model_specs', 'group_model_specs',
+           'update_metainfo_for_bucket']
+
+import copy
+import logging
+
+
+def add_multi_eval_parser_arguments(parser):
+    """
+    Add arguments of the multi-model evaluation mode.
+
+    Parameters
+    ----------
+    parser : ArgumentParser
+        Argument parser.
+    """
+    parser.add_argument(
+        "--models",
+        type=str,
+        nargs="+",
+        default=None,
+        help="list of models to evaluate in one pass over the data, each as name[:key=value,...] with optional keys "
+             "resume, input_size, resize_inv_factor (e.g. resnet18:resume=resnet18.pth,resize_inv_factor=0.875)")
+    parser.add_argument(
+        "--models-per-pass",
+        type=int,
+        default=0,
+        help="maximal number of models evaluated in one pass over the data (0 means unlimited)")
+
+
+def parse_model_spec(spec):
+    """
+    Parse a model specification `name[:key=value,...]`.
+
+    Parameters
+    ----------
+    spec : str
+        Model specification.
+
+    Returns
+    -------
+    dict
+        Model name, weights file path (`resume`), input size and resize factor (None if not set).
+    """
+    name, _, options = spec.partition(":")
+    model_spec = {"model": name.strip(), "resume": "", "input_size": None, "resize_inv_factor": None}
+    if not model_spec["model"]:
+        raise ValueError("Empty model name in specification: {}".format(spec))
+    for option in options.split(",") if options else []:
+        key, sep, value = option.partition("=")
+        key = key.strip()
+        if (not sep) or (key not in model_spec) or (key == "model"):
+            raise ValueError("Wrong option `{}` in model specification: {}".format(option, spec))
+        if key == "input_size":
+            model_spec[key] = int(value)
+        elif key == "resize_inv_factor":
+            model_spec[key] = float(value)
+        else:
+            model_spec[key] = value.strip()
+    return model_spec
+
+
+def get_model_specs(args):
+    """
+    Get model specifications from the script arguments: `--models` in the multi-model mode, or `--model` with
+    `--resume`.
+
+    Parameters
+    ----------
+    args : Namespace
+        Script arguments.
+
+    Returns
+    -------
+    list of dict
+        Model specifications.
+    """
+    if args.models:
+        return [parse_model_spec(spec) for spec in args.models]
+    if not args.model:
+        raise ValueError("Either --model or --models should be set")
+    return [{"model": args.model, "resume": args.resume.strip(), "input_size": None, "resize_inv_factor": None}]
+
+
+def group_model_specs(model_specs,
+                      get_input_size,
+                      default_resize_inv_factor=None,
+                      max_models_per_pass=0):
+    """
+    Group models into transform buckets by input size and resize factor. Missing input sizes are resolved by the
+    callback (usually from the `in_size` attribute of the model; a model built for that may be kept for its bucket).
+
+    Parameters
+    ----------
+    model_specs : list of dict
+        Model specifications (see `parse_model_spec`).
+    get_input_size : function
+        Callback that takes a model specification and returns its input size (int).
+    default_resize_inv_factor : float or None, default None
+        Resize factor for models without it in the specification.
+    max_models_per_pass : int, default 0
+        Maximal number of models in a bucket (0 means unlimited); larger buckets are split.
+
+    Returns
+    -------
+    list of tuple
+        Buckets as (input size, resize factor, list of model specifications), in order of the first model.
+    """
+    buckets = {}
+    for model_spec in model_specs:
+        model_spec = copy.copy(model_spec)
+        if model_spec["input_size"] is None:
+            model_spec["input_size"] = get_input_size(model_spec)
+        if model_spec["resize_inv_factor"] is None:
+            model_spec["resize_inv_factor"] = default_resize_inv_factor
+        key = (model_spec["input_size"], model_spec["resize_inv_factor"])
+        buckets.setdefault(key, []).append(model_spec)
+    bucket_list = []
+    for (input_size, resize_inv_factor), bucket_specs in buckets.items():
+        step = max_models_per_pass if max_models_per_pass > 0 else len(bucket_specs)
+        for i in range(0, len(bucket_specs), step):
+            bucket_list.append((input_size, resize_inv_factor, bucket_specs[i:(i + step)]))
+    logging.info("Transform buckets: {}".format(", ".join(
+        ["{}/{} ({} models)".format(input_size, resize_inv_factor, len(bucket_specs))
+         for input_size, resize_inv_factor, bucket_specs in bucket_list])))
+    return bucket_list
+
+
+def update_metainfo_for_bucket(ds_metainfo,
+                               input_size,
+                               resize_inv_factor):
+    """
+    Get a copy of dataset metainfo with the input size and the resize factor of a transform bucket.
+
+    Parameters
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+    input_size : int
+        Input size.
+    resize_inv_factor : float or None
+        Resize factor (not changed if None).
+
+    Returns
+    -------
+    DatasetMetaInfo
+        Updated copy of dataset metainfo.
+    """
+    bucket_metainfo = copy.copy(ds_metainfo)
+    bucket_metainfo.input_image_size = (input_size, input_size)
+    if resize_inv_factor is not None:
+        bucket_metainfo.resize_inv_factor = resize_inv_factor
+    return bucket_metainfo
@@ -0,0 +1,239 @@
+"""
+    Step-time breakdown for training and evaluation loops: per-step durations of phases (data wait, host-to-device
+    copy, forward, backward, optimizer, metric), percentile summaries, and Chrome trace output.
+"""
+
+__all__ = ['StepTimer', 'add_step_timer_parser_arguments', 'create_step_timer']
+
+import os
+import json
+import time
+import logging
+import contextlib
+import numpy as np
+
+
+class StepTimer(object):
+    """
+    Recorder of step phase durations. A loop iterates over `timer.iter(data)`, which records the data wait, and calls
+    `timer.lap(phase)` after each phase, which records the time since the previous lap. Without synchronization,
+    asynchronously executed device work is attributed to the phase that waits for it (e.g. the metric or the loss
+    read); with `sync_fn` each lap waits for the device, which gives the exact attribution at some cost.
+
+    Parameters:
+    ----------
+    enabled : bool, default True
+        Whether to record anything (a disabled timer has negligible overhead).
+    sync_fn : function or None, default None
+        Function that waits for the device (e.g. `torch.cuda.synchronize`), called at each lap.
+    trace_file_path : str or None, default None
+        Path to the Chrome trace JSON file (written in `close`).
+    max_trace_events : int, default 1000000
+        Maximal number of trace events (later events are dropped).
+    """
+    def __init__(self,
+                 enabled=True,
+                 sync_fn=None,
+                 trace_file_path=None,
+                 max_trace_events=1000000):
+        super(StepTimer, self).__init__()
+        self.enabled = enabled
+        self.sync_fn = sync_fn
+        self.trace_file_path = trace_file_path
+        self.max_trace_events = max_trace_events
+        self.start_time = time.perf_counter()
+        self.last_time = self.start_time
+        self.category = ""
+        self.phase_times = {}
+        self.span_times = {}
+        self.trace_events = []
+
+    def reset(self):
+        """
+        Reset statistics (not the trace).
+        """
+        self.phase_times = {}
+        self.span_times = {}
+
+    def _add(self, times, name, start, end):
+        times.setdefault(name, []).append(end - start)
+        if (self.trace_file_path is not None) and (len(self.trace_events) < self.max_trace_events):
+            self.trace_events.append({
+                "name": name,
+                "cat": self.category,
+                "ph": "X",
+                "ts": (start - self.start_time) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": 0})
+
+    def lap(self, phase):
+        """
+        Record the time since the previous lap as the phase duration.
+
+        Parameters:
+        ----------
+        phase : str
+            Phase name.
+        """
+        if not self.enabled:
+            return
+        if self.sync_fn is not None:
+            self.sync_fn()
+        curr_time = time.perf_counter()
+        self._add(self.phase_times, phase, self.last_time, curr_time)
+        self.last_time = curr_time
+
+    def iter(self,
+             data,
+             category=""):
+        """
+        Iterate over data, recording the wait for each batch (phase `data`) and the time between the last lap of a
+        step and the request of the next batch (phase `other`, e.g. logging).
+
+        Parameters:
+        ----------
+        data : iterable
+            Data source.
+        category : str, default ''
+            Category of trace events (e.g. 'train' or 'val').
+
+        Returns
+        -------
+        iterable
+            Data batches.
+        """
+        if not self.enabled:
+            return data
+        return self._iter(data, category)
+
+    def _iter(self, data, category):
+        self.category = category
+        data_iter = iter(data)
+        self.last_time = None
+        while True:
+            start_time = time.perf_counter()
+            if self.last_time is not None:
+                self._add(self.phase_times, "other", self.last_time, start_time)
+            try:
+                batch = next(data_iter)
+            except StopIteration:
+                break
+            self.last_time = time.perf_counter()
+            self._add(self.phase_times, "data", start_time, self.last_time)
+            yield batch
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """
+        Context manager that records the duration of a non-step event (e.g. validation or checkpoint saving).
+
+        Parameters:
+        ----------
+        name : str
+            Event name.
+        """
+        if not self.enabled:
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.sync_fn is not None:
+                self.sync_fn()
+            self._add(self.span_times, name, start_time, time.perf_counter())
+
+    def get_summary(self):
+        """
+        Get the summary of phase durations.
+
+        Returns
+        -------
+        list of tuple
+            (phase, count, p50, p90, p99, mean, total) for each phase, durations in seconds.
+        """
+        summary = []
+        for phase, times in list(self.phase_times.items()) + list(self.span_times.items()):
+            times = np.array(times)
+            p50, p90, p99 = np.percentile(times, (50, 90, 99))
+            summary.append((phase, len(times), p50, p90, p99, times.mean(), times.sum()))
+        return summary
+
+    def log_summary(self, title):
+        """
+        Log percentile summaries of phase durations and reset statistics.
+
+        Parameters:
+        ----------
+        title : str
+            Summary title (e.g. '[Epoch 1] train steps').
+        """
+        if not self.enabled:
+            return
+        summary = self.get_summary()
+        step_total = sum(s[6] for s in summary if s[0] in self.phase_times)
+        msgs = []
+        for phase, count, p50, p90, p99, mean, total in summary:
+            share = "{:.1f}%".format(100.0 * total / step_total) if phase in self.phase_times else "-"
+            msgs.append("{}: n={}, p50={:.2f}, p90={:.2f}, p99={:.2f}, mean={:.2f} ms, {}".format(
+                phase, count, p50 * 1e3, p90 * 1e3, p99 * 1e3, mean * 1e3, share))
+        logging.info("{} time breakdown:\n\t{}".format(title, "\n\t".join(msgs)))
+        self.reset()
+
+    def close(self):
+        """
+        Write the Chrome trace file (if set).
+        """
+        if self.enabled and (self.trace_file_path is not None):
+            with open(self.trace_file_path, "w") as f:
+                json.dump({"traceEvents": self.trace_events, "displayTimeUnit": "ms"}, f)
+            logging.info("Step trace is written: {} ({} events)".format(self.trace_file_path, len(self.trace_events)))
+
+
+def add_step_timer_parser_arguments(parser):
+    """
+    Add arguments of the step-time breakdown.
+
+    Parameters:
+    ----------
+    parser : ArgumentParser
+        Argument parser.
+    """
+    parser.add_argument(
+        "--step-timing",
+        action="store_true",
+        help="log percentiles of step phase times (data, host-to-device, forward, backward, optimizer, metric)")
+    parser.add_argument(
+        "--step-timing-sync",
+        action="store_true",
+        help="wait for the device at each phase boundary for the exact attribution of device time (slower)")
+    parser.add_argument(
+        "--step-trace-file",
+        type=str,
+        default="",
+        help="path to Chrome trace JSON file with step phases (enables step timing)")
+
+
+def create_step_timer(args,
+                      sync_fn=None):
+    """
+    Create a step timer from the script arguments.
+
+    Parameters:
+    ----------
+    args : Namespace
+        Script arguments.
+    sync_fn : function or None, default None
+        Function that waits for the device (used with `--step-timing-sync`).
+
+    Returns
+    -------
+    StepTimer
+        Step timer (disabled, if step timing isn't requested).
+    """
+    trace_file_path = args.step_trace_file if args.step_trace_file else None
+    return StepTimer(
+        enabled=(args.step_timing or args.step_timing_sync or (trace_file_path is not None)),
+        sync_fn=(sync_fn if args.step_timing_sync else None),
+        trace_file_path=trace_file_path)
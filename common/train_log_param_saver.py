@@ -45,6 +45,9 @@ class TrainLogParamSaver(object):
         number of current attempt (used for comparing training curves for various hyperparameters)
     best_map_log_file_path : str or None
         file path to best map log file
+    checkpoint_writer : AsyncCheckpointWriter or None
+        background executor of checkpoint file operations (if None, they are done in place);
+        checkpoint_file_save_callback should submit its writing to it too
     """
 
     def __init__(self,
@@ -65,7 +68,8 @@ class TrainLogParamSaver(object):
                  # mask=None,
                  score_log_file_path=None,
                  score_log_attempt_value=1,
-                 best_map_log_file_path=None):
+                 best_map_log_file_path=None,
+                 checkpoint_writer=None):
 
         if not os.path.exists(last_checkpoint_dir_path):
             os.makedirs(last_checkpoint_dir_path)
@@ -148,6 +152,7 @@ class TrainLogParamSaver(object):
         self.best_checkpoint_params_file_stems = []
 
         self.can_save = (self.checkpoint_file_save_callback is not None)
+        self.checkpoint_writer = checkpoint_writer
 
     def __del__(self):
         """
@@ -171,11 +176,7 @@ class TrainLogParamSaver(object):
 
                 self.last_checkpoint_params_file_stems.append(last_checkpoint_params_file_stem)
                 if len(self.last_checkpoint_params_file_stems) > self.last_checkpoint_file_count:
-                    removed_checkpoint_file_stem = self.last_checkpoint_params_file_stems[0]
-                    for ext in self.checkpoint_file_exts:
-                        removed_checkpoint_file_path = removed_checkpoint_file_stem + ext
-                        if os.path.exists(removed_checkpoint_file_path):
-                            os.remove(removed_checkpoint_file_path)
+                    self._run_file_op(self._remove_checkpoint_files, self.last_checkpoint_params_file_stems[0])
                     del self.last_checkpoint_params_file_stems[0]
 
             if (self.best_eval_metric_value is None) or (curr_acc < self.best_eval_metric_value):
@@ -184,23 +185,16 @@ class TrainLogParamSaver(object):
                 best_checkpoint_params_file_stem = self._get_best_checkpoint_params_file_stem(epoch1, curr_acc)
 
                 if last_checkpoint_params_file_stem is not None:
-                    for ext in self.checkpoint_file_exts:
-                        last_checkpoint_params_file_path = last_checkpoint_params_file_stem + ext
-                        best_checkpoint_params_file_path = best_checkpoint_params_file_stem + ext
-                        assert (os.path.exists(last_checkpoint_params_file_path))
-                        shutil.copy(
-                            src=last_checkpoint_params_file_path,
-                            dst=best_checkpoint_params_file_path)
+                    self._run_file_op(
+                        self._copy_checkpoint_files,
+                        last_checkpoint_params_file_stem,
+                        best_checkpoint_params_file_stem)
                 else:
                     self.checkpoint_file_save_callback(best_checkpoint_params_file_stem, **kwargs)
 
                 self.best_checkpoint_params_file_stems.append(best_checkpoint_params_file_stem)
                 if len(self.best_checkpoint_params_file_stems) > self.best_checkpoint_file_count:
-                    removed_checkpoint_file_stem = self.best_checkpoint_params_file_stems[0]
-                    for ext in self.checkpoint_file_exts:
-                        removed_checkpoint_file_path = removed_checkpoint_file_stem + ext
-                        if os.path.exists(removed_checkpoint_file_path):
-                            os.remove(removed_checkpoint_file_path)
+                    self._run_file_op(self._remove_checkpoint_files, self.best_checkpoint_params_file_stems[0])
                     del self.best_checkpoint_params_file_stems[0]
 
                 if self.best_map_log_file is not None:
@@ -213,6 +207,32 @@ class TrainLogParamSaver(object):
             self.score_log_file.write(score_log_file_row)
             self.score_log_file.flush()
 
+    def _run_file_op(self,
+                     fn,
+                     *args):
+        """
+        Run a checkpoint file operation in place, or submit it to the checkpoint writer (after pending writes).
+        """
+        if self.checkpoint_writer is not None:
+            self.checkpoint_writer.submit(fn, *args)
+        else:
+            fn(*args)
+
+    def _remove_checkpoint_files(self, checkpoint_file_stem):
+        for ext in self.checkpoint_file_exts:
+            removed_checkpoint_file_path = checkpoint_file_stem + ext
+            if os.path.exists(removed_checkpoint_file_path):
+                os.remove(removed_checkpoint_file_path)
+
+    def _copy_checkpoint_files(self, src_checkpoint_file_stem, dst_checkpoint_file_stem):
+        for ext in self.checkpoint_file_exts:
+            src_checkpoint_file_path = src_checkpoint_file_stem + ext
+            dst_checkpoint_file_path = dst_checkpoint_file_stem + ext
+            assert (os.path.exists(src_checkpoint_file_path))
+            shutil.copy(
+                src=src_checkpoint_file_path,
+                dst=dst_checkpoint_file_path)
+
     @staticmethod
     def _create_checkpoint_file_path_full_prefix(checkpoint_dir_path,
                                                  checkpoint_file_name_prefix,
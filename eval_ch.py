@@ -2,6 +2,7 @@ import os
 import time
 import logging
 import argparse
+import numpy as np
 
 from chainer import global_config
 from chainercv.utils import apply_to_iterator
@@ -12,14 +13,17 @@ from chainer_.utils import prepare_ch_context, prepare_model, Predictor
 from chainer_.utils import get_composite_metric, report_accuracy
 from chainer_.dataset_utils import get_dataset_metainfo
 from chainer_.dataset_utils import get_val_data_source, get_test_data_source
+from common.multi_eval import add_multi_eval_parser_arguments, get_model_specs, group_model_specs
+from common.multi_eval import update_metainfo_for_bucket
 
 
 def add_eval_parser_arguments(parser):
     parser.add_argument(
         "--model",
         type=str,
-        required=True,
+        default="",
         help="type of model to use. see model_provider for options")
+    add_multi_eval_parser_arguments(parser)
     parser.add_argument(
         "--use-pretrained",
         action="store_true",
@@ -155,6 +159,119 @@ def test(net,
         time.time() - tic))
 
 
+class TimedPredictor(Predictor):
+    """
+    Model predictor that accumulates its running time.
+
+    Parameters
+    ----------
+    model : Chain
+        Base model.
+    """
+    def __init__(self,
+                 model):
+        super(TimedPredictor, self).__init__(
+            model=model,
+            transform=None)
+        self.forward_time = 0.0
+
+    def __call__(self, imgs):
+        tic = time.time()
+        output = super(TimedPredictor, self).__call__(imgs)
+        self.forward_time += time.time() - tic
+        return output
+
+
+def test_models(model_specs,
+                ds_metainfo,
+                get_test_data_source_class,
+                metric_names,
+                metric_extra_kwargs,
+                batch_size,
+                num_workers,
+                use_gpus,
+                use_pretrained,
+                num_classes,
+                in_channels,
+                default_input_size,
+                models_per_pass=0):
+    """
+    Evaluate several models, grouped into transform buckets by input size and resize factor. Each batch of a bucket is
+    decoded once and fed to all its models, with a separate composite metric per model.
+    """
+    def create_model(model_name,
+                     pretrained_model_file_path="",
+                     use_pretrained_weights=False):
+        return prepare_model(
+            model_name=model_name,
+            use_pretrained=use_pretrained_weights,
+            pretrained_model_file_path=pretrained_model_file_path,
+            use_gpus=use_gpus,
+            net_extra_kwargs=ds_metainfo.net_extra_kwargs,
+            num_classes=num_classes,
+            in_channels=in_channels)
+
+    # Models created to read their input sizes are kept for their buckets (by name and weights file path).
+    created_models = {}
+
+    def get_input_size(model_spec):
+        net = create_model(
+            model_name=model_spec["model"],
+            pretrained_model_file_path=model_spec["resume"],
+            use_pretrained_weights=use_pretrained)
+        created_models.setdefault((model_spec["model"], model_spec["resume"]), []).append(net)
+        return net.in_size[0] if hasattr(net, "in_size") else default_input_size
+
+    def get_bucket_model(model_spec):
+        nets = created_models.get((model_spec["model"], model_spec["resume"]))
+        if nets:
+            return nets.pop(0)
+        return create_model(
+            model_name=model_spec["model"],
+            pretrained_model_file_path=model_spec["resume"],
+            use_pretrained_weights=use_pretrained)
+
+    buckets = group_model_specs(
+        model_specs=model_specs,
+        get_input_size=get_input_size,
+        default_resize_inv_factor=getattr(ds_metainfo, "resize_inv_factor", None),
+        max_models_per_pass=models_per_pass)
+    for input_size, resize_inv_factor, bucket_specs in buckets:
+        predictors = [TimedPredictor(model=get_bucket_model(model_spec)) for model_spec in bucket_specs]
+        bucket_metainfo = update_metainfo_for_bucket(
+            ds_metainfo=ds_metainfo,
+            input_size=input_size,
+            resize_inv_factor=resize_inv_factor)
+        test_data = get_test_data_source_class(
+            ds_metainfo=bucket_metainfo,
+            batch_size=batch_size,
+            num_workers=num_workers)
+        tic = time.time()
+        _, out_values, rest_values = apply_to_iterator(
+            func=lambda imgs: tuple(predictor(imgs) for predictor in predictors),
+            iterator=test_data["iterator"],
+            hook=ProgressHook(test_data["ds_len"]))
+        assert (len(rest_values) == 1)
+        assert (len(out_values) == len(predictors))
+
+        labels = np.array(list(rest_values[0]))
+        preds_list = [np.array(list(out_value)) for out_value in out_values]
+        logging.info("Bucket {}/{} ({} models): time cost: {:.4f} sec".format(
+            input_size, resize_inv_factor, len(predictors), time.time() - tic))
+        for model_spec, predictor, preds in zip(bucket_specs, predictors, preds_list):
+            metric = get_composite_metric(
+                metric_names=metric_names,
+                metric_extra_kwargs=metric_extra_kwargs)
+            metric.update(
+                labels=labels,
+                preds=preds)
+            accuracy_msg = report_accuracy(
+                metric=metric,
+                extended_log=True)
+            logging.info("Model {}: {} trainable parameters, Test: {}, forward time: {:.4f} sec".format(
+                model_spec["model"], predictor.model.count_params(), accuracy_msg, predictor.forward_time))
+
+
 def main():
     args = parse_args()
 
@@ -176,6 +293,28 @@ def main():
     global_config.train = False
     use_gpus = prepare_ch_context(args.num_gpus)
 
+    if args.models:
+        model_specs = get_model_specs(args)
+        assert (args.use_pretrained or all(spec["resume"] for spec in model_specs))
+        test_models(
+            model_specs=model_specs,
+            ds_metainfo=ds_metainfo,
+            get_test_data_source_class=(get_val_data_source if args.data_subset == "val" else get_test_data_source),
+            metric_names=(ds_metainfo.val_metric_names if args.data_subset == "val" else
+                          ds_metainfo.test_metric_names),
+            metric_extra_kwargs=(ds_metainfo.val_metric_extra_kwargs if args.data_subset == "val" else
+                                 ds_metainfo.test_metric_extra_kwargs),
+            batch_size=args.batch_size,
+            num_workers=args.num_workers,
+            use_gpus=use_gpus,
+            use_pretrained=args.use_pretrained,
+            num_classes=args.num_classes,
+            in_channels=args.in_channels,
+            default_input_size=ds_metainfo.input_image_size[0] if ds_metainfo.input_image_size else None,
+            models_per_pass=args.models_per_pass)
+        return
+    assert (args.model)
+
     net = prepare_model(
         model_name=args.model,
         use_pretrained=args.use_pretrained,
@@ -2,23 +2,29 @@ import os
 import time
 import logging
 import argparse
+import mxnet as mx
 from common.logger_utils import initialize_logging
 from gluon.utils import prepare_mx_context, prepare_model
-from gluon.utils import calc_net_weight_count, validate
+from gluon.utils import calc_net_weight_count, validate, validate_models
 from gluon.utils import get_composite_metric
 from gluon.utils import report_accuracy
 from gluon.dataset_utils import get_dataset_metainfo
 from gluon.dataset_utils import get_batch_fn
 from gluon.dataset_utils import get_val_data_source, get_test_data_source
-from gluon.model_stats import measure_model
+from gluon.model_stats import measure_model, profile_model
+from common.multi_eval import add_multi_eval_parser_arguments, get_model_specs, group_model_specs
+from common.multi_eval import update_metainfo_for_bucket
+from common.step_timer import add_step_timer_parser_arguments, create_step_timer
+from common.layer_profile import log_layer_profile, save_layer_profile
 
 
 def add_eval_parser_arguments(parser):
     parser.add_argument(
         "--model",
         type=str,
-        required=True,
+        default="",
         help="type of model to use. see model_provider for options")
+    add_multi_eval_parser_arguments(parser)
     parser.add_argument(
         "--use-pretrained",
         action="store_true",
@@ -43,6 +49,12 @@ def add_eval_parser_arguments(parser):
         dest="calc_flops_only",
         action="store_true",
         help="calculate FLOPs without quality estimation")
+    parser.add_argument(
+        "--profile-layers",
+        type=str,
+        default="",
+        help="profile wall time and activation size of each layer (at batch size 1) and save the profile into this "
+             "file (.csv or .json)")
     parser.add_argument(
         "--data-subset",
         type=str,
@@ -98,6 +110,7 @@ def add_eval_parser_arguments(parser):
         "--show-progress",
         action="store_true",
         help="show progress bar")
+    add_step_timer_parser_arguments(parser)
 
 
 def parse_args():
@@ -140,7 +153,9 @@ def test(net,
          calc_weight_count=False,
          calc_flops=False,
          calc_flops_only=True,
-         extended_log=False):
+         extended_log=False,
+         step_timer=None,
+         profile_file_path=""):
     if not calc_flops_only:
         tic = time.time()
         validate(
@@ -150,13 +165,16 @@ def test(net,
             batch_fn=batch_fn,
             data_source_needs_reset=data_source_needs_reset,
             dtype=dtype,
-            ctx=ctx)
+            ctx=ctx,
+            step_timer=step_timer)
         accuracy_msg = report_accuracy(
             metric=metric,
             extended_log=extended_log)
         logging.info("Test: {}".format(accuracy_msg))
         logging.info("Time cost: {:.4f} sec".format(
             time.time() - tic))
+        if step_timer is not None:
+            step_timer.log_summary("Test steps")
 
     if calc_weight_count:
         weight_count = calc_net_weight_count(net)
@@ -172,6 +190,130 @@ def test(net,
             flops=num_flops, flops_m=num_flops / 1e6,
             flops2=num_flops / 2, flops2_m=num_flops / 2 / 1e6,
             macs=num_macs, macs_m=num_macs / 1e6))
+    if profile_file_path:
+        profile = profile_model(
+            model=net,
+            in_channels=in_channels,
+            in_size=input_image_size,
+            ctx=ctx[0])
+        log_layer_profile(profile)
+        save_layer_profile(profile, profile_file_path)
+
+
+def test_models(model_specs,
+                ds_metainfo,
+                get_test_data_source_class,
+                metric_names,
+                metric_extra_kwargs,
+                batch_size,
+                num_workers,
+                dtype,
+                ctx,
+                use_pretrained,
+                classes,
+                in_channels,
+                default_input_size,
+                models_per_pass=0,
+                calc_flops=False,
+                calc_flops_only=False,
+                show_progress=False):
+    """
+    Evaluate several models, grouped into transform buckets by input size and resize factor. Each batch of a bucket is
+    decoded once and fed to all its models, with a separate composite metric per model.
+    """
+    def create_model(model_name,
+                     pretrained_model_file_path="",
+                     use_pretrained_weights=False,
+                     do_hybridize=True):
+        return prepare_model(
+            model_name=model_name,
+            use_pretrained=use_pretrained_weights,
+            pretrained_model_file_path=pretrained_model_file_path,
+            dtype=dtype,
+            net_extra_kwargs=ds_metainfo.net_extra_kwargs,
+            load_ignore_extra=ds_metainfo.load_ignore_extra,
+            classes=classes,
+            in_channels=in_channels,
+            do_hybridize=do_hybridize,
+            ctx=ctx)
+
+    def create_bucket_model(model_spec):
+        return create_model(
+            model_name=model_spec["model"],
+            pretrained_model_file_path=model_spec["resume"],
+            use_pretrained_weights=use_pretrained,
+            do_hybridize=(ds_metainfo.allow_hybridize and (not calc_flops)))
+
+    # Models created to read their input sizes are kept for their buckets (by name and weights file path).
+    created_models = {}
+
+    def get_input_size(model_spec):
+        net = create_bucket_model(model_spec)
+        created_models.setdefault((model_spec["model"], model_spec["resume"]), []).append(net)
+        return net.in_size[0] if hasattr(net, "in_size") else default_input_size
+
+    def get_bucket_model(model_spec):
+        nets = created_models.get((model_spec["model"], model_spec["resume"]))
+        if nets:
+            return nets.pop(0)
+        return create_bucket_model(model_spec)
+
+    buckets = group_model_specs(
+        model_specs=model_specs,
+        get_input_size=get_input_size,
+        default_resize_inv_factor=getattr(ds_metainfo, "resize_inv_factor", None),
+        max_models_per_pass=models_per_pass)
+    batch_fn = get_batch_fn(use_imgrec=ds_metainfo.use_imgrec)
+    for input_size, resize_inv_factor, bucket_specs in buckets:
+        nets = [get_bucket_model(model_spec) for model_spec in bucket_specs]
+        if not calc_flops_only:
+            bucket_metainfo = update_metainfo_for_bucket(
+                ds_metainfo=ds_metainfo,
+                input_size=input_size,
+                resize_inv_factor=resize_inv_factor)
+            metrics = [get_composite_metric(
+                metric_names=metric_names,
+                metric_extra_kwargs=metric_extra_kwargs) for _ in nets]
+            test_data = get_test_data_source_class(
+                ds_metainfo=bucket_metainfo,
+                batch_size=batch_size,
+                num_workers=num_workers)
+            if show_progress:
+                from tqdm import tqdm
+                test_data = tqdm(test_data)
+            tic = time.time()
+            forward_times = validate_models(
+                metrics=metrics,
+                nets=nets,
+                val_data=test_data,
+                batch_fn=batch_fn,
+                data_source_needs_reset=ds_metainfo.use_imgrec,
+                dtype=dtype,
+                ctx=ctx)
+            logging.info("Bucket {}/{} ({} models): time cost: {:.4f} sec".format(
+                input_size, resize_inv_factor, len(nets), time.time() - tic))
+            for model_spec, metric, forward_time in zip(bucket_specs, metrics, forward_times):
+                accuracy_msg = report_accuracy(
+                    metric=metric,
+                    extended_log=True)
+                logging.info("Model {}: Test: {}, forward time: {:.4f} sec".format(
+                    model_spec["model"], accuracy_msg, forward_time))
+        for model_spec, net in zip(bucket_specs, nets):
+            logging.info("Model {}:".format(model_spec["model"]))
+            test(
+                net=net,
+                test_data=None,
+                batch_fn=batch_fn,
+                data_source_needs_reset=False,
+                metric=None,
+                dtype=dtype,
+                ctx=ctx,
+                input_image_size=(input_size, input_size),
+                in_channels=in_channels,
+                calc_weight_count=True,
+                calc_flops=calc_flops,
+                calc_flops_only=True)
+        del nets
 
 
 def main():
@@ -196,6 +338,32 @@ def main():
         num_gpus=args.num_gpus,
         batch_size=args.batch_size)
 
+    if args.models:
+        model_specs = get_model_specs(args)
+        assert (args.use_pretrained or all(spec["resume"] for spec in model_specs) or args.calc_flops_only)
+        test_models(
+            model_specs=model_specs,
+            ds_metainfo=ds_metainfo,
+            get_test_data_source_class=(get_val_data_source if args.data_subset == "val" else get_test_data_source),
+            metric_names=(ds_metainfo.val_metric_names if args.data_subset == "val" else
+                          ds_metainfo.test_metric_names),
+            metric_extra_kwargs=(ds_metainfo.val_metric_extra_kwargs if args.data_subset == "val" else
+                                 ds_metainfo.test_metric_extra_kwargs),
+            batch_size=args.batch_size,
+            num_workers=args.num_workers,
+            dtype=args.dtype,
+            ctx=ctx,
+            use_pretrained=args.use_pretrained,
+            classes=args.num_classes,
+            in_channels=args.in_channels,
+            default_input_size=ds_metainfo.input_image_size[0] if ds_metainfo.input_image_size else None,
+            models_per_pass=args.models_per_pass,
+            calc_flops=args.calc_flops,
+            calc_flops_only=args.calc_flops_only,
+            show_progress=args.show_progress)
+        return
+    assert (args.model)
+
     net = prepare_model(
         model_name=args.model,
         use_pretrained=args.use_pretrained,
@@ -205,7 +373,7 @@ def main():
         load_ignore_extra=ds_metainfo.load_ignore_extra,
         classes=args.num_classes,
         in_channels=args.in_channels,
-        do_hybridize=(ds_metainfo.allow_hybridize and (not args.calc_flops)),
+        do_hybridize=(ds_metainfo.allow_hybridize and (not args.calc_flops) and (not args.profile_layers)),
         ctx=ctx)
     assert (hasattr(net, "in_size"))
     input_image_size = net.in_size
@@ -231,6 +399,9 @@ def main():
         test_data = tqdm(test_data)
 
     assert (args.use_pretrained or args.resume.strip() or args.calc_flops_only)
+    step_timer = create_step_timer(
+        args=args,
+        sync_fn=mx.nd.waitall)
     test(
         net=net,
         test_data=test_data,
@@ -245,7 +416,10 @@ def main():
         calc_weight_count=True,
         calc_flops=args.calc_flops,
         calc_flops_only=args.calc_flops_only,
-        extended_log=True)
+        extended_log=True,
+        step_timer=step_timer,
+        profile_file_path=args.profile_layers)
+    step_timer.close()
 
 
 if __name__ == "__main__":
@@ -2,22 +2,30 @@ import os
 import time
 import logging
 import argparse
+import functools
+import torch.distributed
 from common.logger_utils import initialize_logging
 from pytorch.utils import prepare_pt_context, prepare_model
-from pytorch.utils import calc_net_weight_count, validate
+from pytorch.utils import calc_net_weight_count, validate, validate_models, validate_sharded
 from pytorch.utils import get_composite_metric
 from pytorch.utils import report_accuracy
+from pytorch.utils import init_distributed
 from pytorch.dataset_utils import get_dataset_metainfo
 from pytorch.dataset_utils import get_val_data_source, get_test_data_source
-from pytorch.model_stats import measure_model
+from pytorch.model_stats import measure_model, profile_model
+from common.multi_eval import add_multi_eval_parser_arguments, get_model_specs, group_model_specs
+from common.multi_eval import update_metainfo_for_bucket
+from common.step_timer import add_step_timer_parser_arguments, create_step_timer
+from common.layer_profile import log_layer_profile, save_layer_profile
 
 
 def add_eval_cls_parser_arguments(parser):
     parser.add_argument(
         "--model",
         type=str,
-        required=True,
+        default="",
         help="type of model to use. see model_provider for options")
+    add_multi_eval_parser_arguments(parser)
     parser.add_argument(
         "--use-pretrained",
         action="store_true",
@@ -37,6 +45,16 @@ def add_eval_cls_parser_arguments(parser):
         dest="calc_flops_only",
         action="store_true",
         help="calculate FLOPs without quality estimation")
+    parser.add_argument(
+        "--calc-flops-meta",
+        action="store_true",
+        help="calculate FLOPs from shapes only, on the meta device (fast, no activations are allocated)")
+    parser.add_argument(
+        "--profile-layers",
+        type=str,
+        default="",
+        help="profile wall time and activation size of each layer (at batch size 1) and save the profile into this "
+             "file (.csv or .json)")
     parser.add_argument(
         "--remove-module",
         action="store_true",
@@ -52,13 +70,32 @@ def add_eval_cls_parser_arguments(parser):
         type=int,
         default=0,
         help="number of gpus to use")
+    parser.add_argument(
+        "--distributed",
+        action="store_true",
+        help="enable multi-process evaluation (launch with torchrun, one process per GPU or CPU worker)")
+    parser.add_argument(
+        "--dist-backend",
+        type=str,
+        default="",
+        help="distributed backend. options are gloo and nccl (by default nccl for GPUs, gloo for CPUs)")
+    parser.add_argument(
+        "--num-shards",
+        type=int,
+        default=1,
+        help="number of CPU worker processes, each evaluating its own index shard of the data")
+    parser.add_argument(
+        "--shard-threads",
+        type=int,
+        default=0,
+        help="number of intra-op threads per shard worker (0 means an equal part of all threads)")
     parser.add_argument(
         "-j",
         "--num-data-workers",
         dest="num_workers",
         default=4,
         type=int,
-        help="number of preprocessing workers")
+        help="number of preprocessing workers (split between shard workers)")
 
     parser.add_argument(
         "--batch-size",
@@ -96,6 +133,7 @@ def add_eval_cls_parser_arguments(parser):
         "--show-progress",
         action="store_true",
         help="show progress bar")
+    add_step_timer_parser_arguments(parser)
 
 
 def parse_args():
@@ -106,8 +144,8 @@ def parse_args():
         "--dataset",
         type=str,
         default="ImageNet1K",
-        help="dataset name. options are ImageNet1K, CUB200_2011, CIFAR10, CIFAR100, SVHN, VOC2012, ADE20K, Cityscapes, "
-             "COCO")
+        help="dataset name. options are ImageNet1K, ImageNet1K_shard, CUB200_2011, CIFAR10, CIFAR100, SVHN, VOC2012, "
+             "ADE20K, Cityscapes, COCO")
     parser.add_argument(
         "--work-dir",
         type=str,
@@ -135,27 +173,43 @@ def test(net,
          calc_weight_count=False,
          calc_flops=False,
          calc_flops_only=True,
-         extended_log=False):
+         extended_log=False,
+         num_shards=1,
+         shard_threads=0,
+         step_timer=None,
+         profile_file_path="",
+         calc_flops_meta=False):
     if not calc_flops_only:
         tic = time.time()
-        validate(
-            metric=metric,
-            net=net,
-            val_data=test_data,
-            use_cuda=use_cuda)
+        if num_shards > 1:
+            validate_sharded(
+                metric=metric,
+                net=net,
+                get_data_source=test_data,
+                num_shards=num_shards,
+                num_threads=shard_threads)
+        else:
+            validate(
+                metric=metric,
+                net=net,
+                val_data=test_data,
+                use_cuda=use_cuda,
+                step_timer=step_timer)
         accuracy_msg = report_accuracy(
             metric=metric,
             extended_log=extended_log)
         logging.info("Test: {}".format(accuracy_msg))
         logging.info("Time cost: {:.4f} sec".format(
             time.time() - tic))
+        if step_timer is not None:
+            step_timer.log_summary("Test steps")
 
     if calc_weight_count:
         weight_count = calc_net_weight_count(net)
         if not calc_flops:
             logging.info("Model: {} trainable parameters".format(weight_count))
     if calc_flops:
-        num_flops, num_macs, num_params = measure_model(net, in_channels, input_image_size)
+        num_flops, num_macs, num_params = measure_model(net, in_channels, input_image_size, use_meta=calc_flops_meta)
         assert (not calc_weight_count) or (weight_count == num_params)
         stat_msg = "Params: {params} ({params_m:.2f}M), FLOPs: {flops} ({flops_m:.2f}M)," \
                    " FLOPs/2: {flops2} ({flops2_m:.2f}M), MACs: {macs} ({macs_m:.2f}M)"
@@ -164,6 +218,117 @@ def test(net,
             flops=num_flops, flops_m=num_flops / 1e6,
             flops2=num_flops / 2, flops2_m=num_flops / 2 / 1e6,
             macs=num_macs, macs_m=num_macs / 1e6))
+    if profile_file_path:
+        profile = profile_model(
+            model=(net.module if hasattr(net, "module") else net),
+            in_channels=in_channels,
+            in_size=input_image_size)
+        log_layer_profile(profile)
+        save_layer_profile(profile, profile_file_path)
+
+
+def test_models(model_specs,
+                ds_metainfo,
+                get_test_data_source_class,
+                metric_names,
+                metric_extra_kwargs,
+                batch_size,
+                num_workers,
+                use_cuda,
+                use_pretrained,
+                remove_module,
+                distributed,
+                num_classes,
+                in_channels,
+                default_input_size,
+                models_per_pass=0,
+                calc_flops=False,
+                calc_flops_only=False,
+                show_progress=False):
+    """
+    Evaluate several models, grouped into transform buckets by input size and resize factor. Each batch of a bucket is
+    decoded once and fed to all its models, with a separate composite metric per model.
+    """
+    raw_input = getattr(ds_metainfo, "raw_input", False)
+
+    def create_model(model_spec):
+        return prepare_model(
+            model_name=model_spec["model"],
+            use_pretrained=use_pretrained,
+            pretrained_model_file_path=model_spec["resume"],
+            use_cuda=use_cuda,
+            net_extra_kwargs=ds_metainfo.net_extra_kwargs,
+            load_ignore_extra=ds_metainfo.load_ignore_extra,
+            num_classes=num_classes,
+            in_channels=in_channels,
+            remove_module=remove_module,
+            use_data_parallel=(not distributed),
+            raw_input_normalization=((ds_metainfo.mean_rgb, ds_metainfo.std_rgb) if raw_input else None))
+
+    def get_input_size(model_spec):
+        # The model is created on the meta device only to read its input size (no memory for weights).
+        with torch.device("meta"):
+            net = prepare_model(
+                model_name=model_spec["model"],
+                use_pretrained=False,
+                pretrained_model_file_path="",
+                use_cuda=False,
+                use_data_parallel=False,
+                net_extra_kwargs=ds_metainfo.net_extra_kwargs,
+                num_classes=num_classes,
+                in_channels=in_channels)
+        return net.in_size[0] if hasattr(net, "in_size") else default_input_size
+
+    buckets = group_model_specs(
+        model_specs=model_specs,
+        get_input_size=get_input_size,
+        default_resize_inv_factor=getattr(ds_metainfo, "resize_inv_factor", None),
+        max_models_per_pass=models_per_pass)
+    for input_size, resize_inv_factor, bucket_specs in buckets:
+        nets = [create_model(model_spec) for model_spec in bucket_specs]
+        if not calc_flops_only:
+            bucket_metainfo = update_metainfo_for_bucket(
+                ds_metainfo=ds_metainfo,
+                input_size=input_size,
+                resize_inv_factor=resize_inv_factor)
+            metrics = [get_composite_metric(
+                metric_names=metric_names,
+                metric_extra_kwargs=metric_extra_kwargs) for _ in nets]
+            test_data = get_test_data_source_class(
+                ds_metainfo=bucket_metainfo,
+                batch_size=batch_size,
+                num_workers=num_workers,
+                distributed=distributed)
+            if show_progress:
+                from tqdm import tqdm
+                test_data = tqdm(test_data)
+            tic = time.time()
+            forward_times = validate_models(
+                metrics=metrics,
+                nets=nets,
+                val_data=test_data,
+                use_cuda=use_cuda)
+            logging.info("Bucket {}/{} ({} models): time cost: {:.4f} sec".format(
+                input_size, resize_inv_factor, len(nets), time.time() - tic))
+            for model_spec, metric, forward_time in zip(bucket_specs, metrics, forward_times):
+                accuracy_msg = report_accuracy(
+                    metric=metric,
+                    extended_log=True)
+                logging.info("Model {}: Test: {}, forward time: {:.4f} sec".format(
+                    model_spec["model"], accuracy_msg, forward_time))
+        for model_spec, net in zip(bucket_specs, nets):
+            logging.info("Model {}:".format(model_spec["model"]))
+            test(
+                net=net,
+                test_data=None,
+                metric=None,
+                use_cuda=use_cuda,
+                input_image_size=(input_size, input_size),
+                in_channels=in_channels,
+                calc_weight_count=True,
+                calc_flops=calc_flops,
+                calc_flops_only=True)
+        del nets
 
 
 def main():
@@ -172,21 +337,64 @@ def main():
     if args.disable_cudnn_autotune:
         os.environ["MXNET_CUDNN_AUTOTUNE_DEFAULT"] = "0"
 
-    _, log_file_exist = initialize_logging(
-        logging_dir_path=args.save_dir,
-        logging_file_name=args.logging_file_name,
-        script_args=args,
-        log_packages=args.log_packages,
-        log_pip_packages=args.log_pip_packages)
+    if args.distributed:
+        rank, world_size = init_distributed(
+            backend=args.dist_backend,
+            use_cuda=(args.num_gpus > 0))
+    else:
+        rank, world_size = 0, 1
+
+    if rank == 0:
+        _, log_file_exist = initialize_logging(
+            logging_dir_path=args.save_dir,
+            logging_file_name=args.logging_file_name,
+            script_args=args,
+            log_packages=args.log_packages,
+            log_pip_packages=args.log_pip_packages)
+        if args.distributed:
+            logging.info("Distributed evaluation: {} processes".format(world_size))
 
     ds_metainfo = get_dataset_metainfo(dataset_name=args.dataset)
     ds_metainfo.update(args=args)
     assert (ds_metainfo.ml_type != "imgseg") or (args.batch_size == 1)
     assert (ds_metainfo.ml_type != "imgseg") or args.disable_cudnn_autotune
 
-    use_cuda, batch_size = prepare_pt_context(
-        num_gpus=args.num_gpus,
-        batch_size=args.batch_size)
+    if args.distributed:
+        use_cuda, batch_size = (args.num_gpus > 0), args.batch_size
+    else:
+        use_cuda, batch_size = prepare_pt_context(
+            num_gpus=args.num_gpus,
+            batch_size=args.batch_size)
+
+    if args.models:
+        assert (args.num_shards == 1)
+        model_specs = get_model_specs(args)
+        assert (args.use_pretrained or all(spec["resume"] for spec in model_specs) or args.calc_flops_only)
+        test_models(
+            model_specs=model_specs,
+            ds_metainfo=ds_metainfo,
+            get_test_data_source_class=(get_val_data_source if args.data_subset == "val" else get_test_data_source),
+            metric_names=(ds_metainfo.val_metric_names if args.data_subset == "val" else
+                          ds_metainfo.test_metric_names),
+            metric_extra_kwargs=(ds_metainfo.val_metric_extra_kwargs if args.data_subset == "val" else
+                                 ds_metainfo.test_metric_extra_kwargs),
+            batch_size=args.batch_size,
+            num_workers=args.num_workers,
+            use_cuda=use_cuda,
+            use_pretrained=args.use_pretrained,
+            remove_module=args.remove_module,
+            distributed=args.distributed,
+            num_classes=args.num_classes,
+            in_channels=args.in_channels,
+            default_input_size=ds_metainfo.input_image_size[0] if ds_metainfo.input_image_size else None,
+            models_per_pass=args.models_per_pass,
+            calc_flops=args.calc_flops,
+            calc_flops_only=args.calc_flops_only,
+            show_progress=(args.show_progress and (rank == 0)))
+        if args.distributed:
+            torch.distributed.destroy_process_group()
+        return
+    assert (args.model)
 
     net = prepare_model(
         model_name=args.model,
@@ -197,7 +405,10 @@ def main():
         load_ignore_extra=ds_metainfo.load_ignore_extra,
         num_classes=args.num_classes,
         in_channels=args.in_channels,
-        remove_module=args.remove_module)
+        remove_module=args.remove_module,
+        use_data_parallel=(not args.distributed),
+        raw_input_normalization=((ds_metainfo.mean_rgb, ds_metainfo.std_rgb)
+                                 if getattr(ds_metainfo, "raw_input", False) else None))
     real_net = net.module if hasattr(net, "module") else net
     input_image_size = real_net.in_size[0] if hasattr(real_net, "in_size") else args.input_size
 
@@ -211,16 +422,29 @@ def main():
         test_metric = get_composite_metric(
             metric_names=ds_metainfo.test_metric_names,
             metric_extra_kwargs=ds_metainfo.test_metric_extra_kwargs)
-    test_data = get_test_data_source_class(
-        ds_metainfo=ds_metainfo,
-        batch_size=args.batch_size,
-        num_workers=args.num_workers)
+    if args.num_shards > 1:
+        # Each shard worker builds its own data loader.
+        assert (not use_cuda) and (not args.distributed)
+        test_data = functools.partial(
+            get_test_data_source_class,
+            ds_metainfo=ds_metainfo,
+            batch_size=args.batch_size,
+            num_workers=(args.num_workers // args.num_shards))
+    else:
+        test_data = get_test_data_source_class(
+            ds_metainfo=ds_metainfo,
+            batch_size=args.batch_size,
+            num_workers=args.num_workers,
+            distributed=args.distributed)
 
-    if args.show_progress:
+    if args.show_progress and (rank == 0) and (args.num_shards == 1):
         from tqdm import tqdm
         test_data = tqdm(test_data)
 
     assert (args.use_pretrained or args.resume.strip() or args.calc_flops_only)
+    step_timer = create_step_timer(
+        args=args,
+        sync_fn=(torch.cuda.synchronize if use_cuda else None))
     test(
         net=net,
         test_data=test_data,
@@ -232,7 +456,16 @@ def main():
         calc_weight_count=True,
         calc_flops=args.calc_flops,
         calc_flops_only=args.calc_flops_only,
-        extended_log=True)
+        extended_log=True,
+        num_shards=args.num_shards,
+        shard_threads=args.shard_threads,
+        step_timer=step_timer,
+        profile_file_path=args.profile_layers,
+        calc_flops_meta=args.calc_flops_meta)
+    step_timer.close()
+
+    if args.distributed:
+        torch.distributed.destroy_process_group()
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ from common.logger_utils import initialize_logging
 from pytorch.utils import prepare_pt_context, prepare_model
 from pytorch.dataset_utils import get_dataset_metainfo
 from pytorch.dataset_utils import get_val_data_source
+from pytorch.mch_metrics import calc_matching_metrics
 
 
 def add_eval_parser_arguments(parser):
@@ -62,8 +63,30 @@ def add_eval_parser_arguments(parser):
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=512,
-        help="training batch size per device (CPU/GPU)")
+        default=4,
+        help="maximal number of same-size images in a batch")
+
+    parser.add_argument(
+        "--pair-batch-size",
+        type=int,
+        default=64,
+        help="number of image pairs for a batched metric calculation")
+    parser.add_argument(
+        "--conf-threshs",
+        type=float,
+        nargs="*",
+        default=None,
+        help="detector confidence thresholds for a sweep (the model value by default)")
+    parser.add_argument(
+        "--nms-dists",
+        type=int,
+        nargs="*",
+        default=None,
+        help="detector NMS distances for a sweep (the model value by default)")
+    parser.add_argument(
+        "--skip-homography",
+        action="store_true",
+        help="skip homography estimation metric")
 
     parser.add_argument(
         "--save-dir",
@@ -124,119 +147,131 @@ def parse_args():
     return args
 
 
-def warp_keypoints(src_pts, homography):
-    src_hmg_pts = np.concatenate([src_pts, np.ones((src_pts.shape[0], 1))], axis=1)
-    dst_hmg_pts = np.dot(src_hmg_pts, np.transpose(homography)).squeeze(axis=2)
-    dst_pts = dst_hmg_pts[:, :2] / dst_hmg_pts[:, 2:]
-    return dst_pts
-
-
-def calc_filter_mask(pts, shape):
-    mask = (pts[:, 0] >= 0) & (pts[:, 0] < shape[0]) & (pts[:, 1] >= 0) & (pts[:, 1] < shape[1])
-    return mask
-
-
-def select_k_best(pts,
-                  confs,
-                  max_count=300):
-    inds = confs.argsort()[::-1][:max_count]
-    return pts[inds, :], confs[inds]
-
-
-def calc_repeatability_np(src_pts,
-                          src_confs,
-                          dst_pts,
-                          dst_confs,
-                          homography,
-                          src_shape,
-                          dst_shape,
-                          distance_thresh=3):
-
-    pred_src_pts = warp_keypoints(dst_pts, np.linalg.inv(homography))
-    pred_src_mask = calc_filter_mask(pred_src_pts, src_shape)
-    label_dst_pts, label_dst_confs = dst_pts[pred_src_mask, :], dst_confs[pred_src_mask]
-
-    pred_dst_pts = warp_keypoints(src_pts, homography)
-    pred_dst_mask = calc_filter_mask(pred_dst_pts, dst_shape)
-    pred_dst_pts, pred_dst_confs = pred_dst_pts[pred_dst_mask, :], src_confs[pred_dst_mask]
-
-    label_dst_pts, label_dst_confs = select_k_best(label_dst_pts, label_dst_confs)
-    pred_dst_pts, pred_dst_confs = select_k_best(pred_dst_pts, pred_dst_confs)
-
-    n_pred = pred_dst_pts.shape[0]
-    n_label = label_dst_pts.shape[0]
-
-    label_dst_pts = np.stack([label_dst_pts[:, 0], label_dst_pts[:, 1], label_dst_confs], axis=1)
-    pred_dst_pts = np.stack([pred_dst_pts[:, 0], pred_dst_pts[:, 1], pred_dst_confs], axis=1)
-
-    pred_dst_pts = np.expand_dims(pred_dst_pts, 1)
-    label_dst_pts = np.expand_dims(label_dst_pts, 0)
-    norm = np.linalg.norm(pred_dst_pts - label_dst_pts, ord=None, axis=2)
-
-    count1 = 0
-    count2 = 0
-    if n_label != 0:
-        min1 = np.min(norm, axis=1)
-        count1 = np.sum(min1 <= distance_thresh)
-    if n_pred != 0:
-        min2 = np.min(norm, axis=0)
-        count2 = np.sum(min2 <= distance_thresh)
-    if n_pred + n_label > 0:
-        repeatability = (count1 + count2) / (n_pred + n_label)
-    else:
-        repeatability = 0
-
-    return n_pred, n_label, repeatability
-
-
 def calc_detector_repeatability(test_data,
                                 net,
-                                use_cuda):
+                                use_cuda,
+                                detector_params=None,
+                                pair_batch_size=64,
+                                calc_homography=True):
+    """
+    Calculate the detector repeatability, the descriptor matching metrics, and the homography accuracy for all image
+    pairs. Each image is inferred once (in batches of same-size images), and its results are cached until all pairs
+    with it are processed. Metrics are calculated in batches of pairs. For a sweep over detector parameters, the
+    backbone runs once per batch, and only the detector and the descriptor run for each parameter set.
+
+    Parameters:
+    ----------
+    test_data : DataLoader
+        Data loader for HPatches images.
+    net : Module
+        Network.
+    use_cuda : bool
+        Whether to use CUDA.
+    detector_params : list of tuple of (float, int) or None, default None
+        Detector confidence threshold and NMS distance for each sweep point (None for the model values).
+    pair_batch_size : int, default 64
+        Number of image pairs for a batched metric calculation.
+    calc_homography : bool, default True
+        Whether to estimate homographies.
+
+    Returns
+    -------
+    list of dict of str -> float
+        Mean metric values for each sweep point.
+    """
     tic = time.time()
-    repeatabilities = []
-    n1s = []
-    n2s = []
+    pairs = test_data.dataset.pairs
+    image_pair_inds = {}
+    for pair_ind, (src_ind, dst_ind, _) in enumerate(pairs):
+        image_pair_inds.setdefault(src_ind, []).append(pair_ind)
+        image_pair_inds.setdefault(dst_ind, []).append(pair_ind)
+    real_net = net.module if hasattr(net, "module") else net
+    num_settings = len(detector_params) if detector_params is not None else 1
+    image_pair_counts = [{ind: len(pair_inds) for ind, pair_inds in image_pair_inds.items()}
+                         for _ in range(num_settings)]
+    caches = [{} for _ in range(num_settings)]
+    pending_pair_inds = [[] for _ in range(num_settings)]
+    pair_metrics = [[] for _ in range(num_settings)]
+
+    def flush_pairs(k):
+        cache = caches[k]
+        batch_pairs = [pairs[pair_ind] for pair_ind in pending_pair_inds[k]]
+        if len(batch_pairs) == 0:
+            return
+        src_results = [cache[src_ind] for src_ind, _, _ in batch_pairs]
+        dst_results = [cache[dst_ind] for _, dst_ind, _ in batch_pairs]
+        pair_metrics[k].append(calc_matching_metrics(
+            src_pts_list=[x[0] for x in src_results],
+            src_confs_list=[x[1] for x in src_results],
+            src_descs_list=[x[2] for x in src_results],
+            dst_pts_list=[x[0] for x in dst_results],
+            dst_confs_list=[x[1] for x in dst_results],
+            dst_descs_list=[x[2] for x in dst_results],
+            homographies=[homography for _, _, homography in batch_pairs],
+            src_shapes=[x[3] for x in src_results],
+            dst_shapes=[x[3] for x in dst_results],
+            calc_homography=calc_homography))
+        for src_ind, dst_ind, _ in batch_pairs:
+            for ind in (src_ind, dst_ind):
+                image_pair_counts[k][ind] -= 1
+                if image_pair_counts[k][ind] == 0:
+                    del cache[ind]
+        pending_pair_inds[k] = []
+
     with torch.no_grad():
-        for data_src, data_dst, target in test_data:
+        for data, image_inds in test_data:
             if use_cuda:
-                data_src = data_src.cuda(non_blocking=True)
-                data_dst = data_dst.cuda(non_blocking=True)
-            src_pts, src_confs, src_desc_map = net(data_src)
-            dst_pts, dst_confs, dst_desc_map = net(data_dst)
-            src_shape = data_src.cpu().detach().numpy().shape[2:]
-            dst_shape = data_dst.cpu().detach().numpy().shape[2:]
-            for i in range(len(src_pts)):
-                homography = target.cpu().detach().numpy()
-
-                src_pts_np = src_pts[i].cpu().detach().numpy()
-                src_confs_np = src_confs[i].cpu().detach().numpy()
-
-                dst_pts_np = dst_pts[i].cpu().detach().numpy()
-                dst_confs_np = dst_confs[i].cpu().detach().numpy()
-
-                n1, n2, repeatability = calc_repeatability_np(
-                    src_pts_np,
-                    src_confs_np,
-                    dst_pts_np,
-                    dst_confs_np,
-                    homography,
-                    src_shape,
-                    dst_shape)
-                n1s.append(n1)
-                n2s.append(n2)
-                repeatabilities.append(repeatability)
-
-    logging.info("Average number of points in the first image: {}".format(np.mean(n1s)))
-    logging.info("Average number of points in the second image: {}".format(np.mean(n2s)))
-    logging.info("The repeatability: {:.4f}".format(np.mean(repeatabilities)))
+                data = data.cuda(non_blocking=True)
+            if detector_params is None:
+                outputs = [net(data)]
+            else:
+                x = real_net.features(data)
+                outputs = []
+                model_detector_params = (real_net.detector.conf_thresh, real_net.detector.nms_dist)
+                try:
+                    for conf_thresh, nms_dist in detector_params:
+                        real_net.detector.conf_thresh = conf_thresh
+                        real_net.detector.nms_dist = nms_dist
+                        pts_list, confs_list = real_net.detector(x)
+                        outputs.append((pts_list, confs_list, real_net.descriptor(x, pts_list)))
+                finally:
+                    real_net.detector.conf_thresh, real_net.detector.nms_dist = model_detector_params
+            shape = tuple(data.shape[2:])
+            for k, (pts_list, confs_list, descs_list) in enumerate(outputs):
+                for i, image_ind in enumerate(image_inds.tolist()):
+                    caches[k][image_ind] = (pts_list[i], confs_list[i], descs_list[i], shape)
+                    for pair_ind in image_pair_inds.get(image_ind, []):
+                        src_ind, dst_ind, _ = pairs[pair_ind]
+                        if (src_ind in caches[k]) and (dst_ind in caches[k]):
+                            pending_pair_inds[k].append(pair_ind)
+                if len(pending_pair_inds[k]) >= pair_batch_size:
+                    flush_pairs(k)
+    for k in range(num_settings):
+        flush_pairs(k)
+
+    results = []
+    for k in range(num_settings):
+        metrics = {name: np.concatenate([x[name] for x in pair_metrics[k]]) for name in pair_metrics[k][0].keys()}
+        assert (len(metrics["repeatability"]) == len(pairs))
+        result = {name: float(np.mean(values)) for name, values in metrics.items()}
+        if detector_params is not None:
+            logging.info("Detector: conf_thresh={}, nms_dist={}".format(*detector_params[k]))
+        logging.info("Average number of points in the first image: {}".format(result["n_pred"]))
+        logging.info("Average number of points in the second image: {}".format(result["n_label"]))
+        logging.info("The repeatability: {:.4f}".format(result["repeatability"]))
+        logging.info("MNN matching: matches={:.1f}, precision={:.4f}, matching score={:.4f}".format(
+            result["num_matches"], result["matching_precision"], result["matching_score"]))
+        if calc_homography:
+            logging.info("Homography accuracy: {:.4f}".format(result["homography_accuracy"]))
+        results.append(result)
     logging.info("Time cost: {:.4f} sec".format(time.time() - tic))
+    return results
 
 
 def main():
     args = parse_args()
 
     os.environ["MXNET_CUDNN_AUTOTUNE_DEFAULT"] = "0"
-    assert (args.batch_size == 1)
 
     _, log_file_exist = initialize_logging(
         logging_dir_path=args.save_dir,
@@ -268,10 +303,21 @@ def main():
         batch_size=args.batch_size,
         num_workers=args.num_workers)
 
+    if (args.conf_threshs is not None) or (args.nms_dists is not None):
+        real_net = net.module if hasattr(net, "module") else net
+        conf_threshs = args.conf_threshs if args.conf_threshs else [real_net.detector.conf_thresh]
+        nms_dists = args.nms_dists if args.nms_dists else [real_net.detector.nms_dist]
+        detector_params = [(conf_thresh, nms_dist) for conf_thresh in conf_threshs for nms_dist in nms_dists]
+    else:
+        detector_params = None
+
     calc_detector_repeatability(
         test_data=test_data,
         net=net,
-        use_cuda=use_cuda)
+        use_cuda=use_cuda,
+        detector_params=detector_params,
+        pair_batch_size=args.pair_batch_size,
+        calc_homography=(not args.skip_homography))
 
 
 if __name__ == "__main__":
@@ -5,8 +5,10 @@
 __all__ = ['get_model_file']
 
 import os
+import json
 import zipfile
 import logging
+import threading
 from mxnet.gluon.utils import download, check_sha1
 
 _model_sha1 = {name: (error, checksum, repo_release_tag) for name, error, checksum, repo_release_tag in [
@@ -476,7 +478,8 @@ def get_model_name_suffix_data(model_name):
 
 
 def get_model_file(model_name,
-                   local_model_store_dir_path=os.path.join("~", ".mxnet", "models")):
+                   local_model_store_dir_path=os.path.join("~", ".mxnet", "models"),
+                   force_verify=False):
     """
     Return location for the pretrained on local file system. This function will download from online model zoo when
     model cannot be found or has mismatch. The root directory will be created if it doesn't exist.
@@ -487,6 +490,8 @@ def get_model_file(model_name,
         Name of the model.
     local_model_store_dir_path : str, default $MXNET_HOME/models
         Location for keeping the model parameters.
+    force_verify : bool, default False
+        Whether to rehash an existing file even if it is recorded as verified in the store manifest.
 
     Returns
     -------
@@ -502,7 +507,7 @@ def get_model_file(model_name,
     local_model_store_dir_path = os.path.expanduser(local_model_store_dir_path)
     file_path = os.path.join(local_model_store_dir_path, file_name)
     if os.path.exists(file_path):
-        if check_sha1(file_path, sha1_hash):
+        if _check_sha1_with_manifest(file_path, sha1_hash, force_verify):
             return file_path
         else:
             logging.warning("Mismatch in the content of model file detected. Downloading again.")
@@ -524,7 +529,101 @@ def get_model_file(model_name,
         zf.extractall(local_model_store_dir_path)
     os.remove(zip_file_path)
 
-    if check_sha1(file_path, sha1_hash):
+    if _check_sha1_with_manifest(file_path, sha1_hash, force_verify=True):
         return file_path
     else:
         raise ValueError("Downloaded file has different hash. Please try again.")
+
+
+_manifest_file_name = "sha1_manifest.json"
+_manifest_lock = threading.Lock()
+
+
+def _check_sha1_with_manifest(file_path, sha1_hash, force_verify=False):
+    """
+    Check whether the sha1 hash of the file content matches the expected hash, using the manifest of verified files
+    in the same directory. The file is rehashed only if its size, modification time, or inode differ from the recorded
+    ones.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file.
+    sha1_hash : str
+        Expected sha1 hash in hexadecimal digits.
+    force_verify : bool, default False
+        Whether to rehash the file even if it is recorded as verified.
+
+    Returns
+    -------
+    bool
+        Whether the file content matches the expected hash.
+    """
+    dir_path, file_name = os.path.split(file_path)
+    manifest_file_path = os.path.join(dir_path, _manifest_file_name)
+    file_stat = os.stat(file_path)
+    file_record = {
+        "sha1": sha1_hash,
+        "size": file_stat.st_size,
+        "mtime": file_stat.st_mtime,
+        "inode": file_stat.st_ino}
+
+    if not force_verify:
+        with _manifest_lock:
+            manifest = _load_manifest(manifest_file_path)
+        if manifest.get(file_name) == file_record:
+            return True
+
+    if not check_sha1(file_path, sha1_hash):
+        with _manifest_lock:
+            manifest = _load_manifest(manifest_file_path)
+            if manifest.pop(file_name, None) is not None:
+                _save_manifest(manifest_file_path, manifest)
+        return False
+
+    with _manifest_lock:
+        manifest = _load_manifest(manifest_file_path)
+        manifest[file_name] = file_record
+        _save_manifest(manifest_file_path, manifest)
+    return True
+
+
+def _load_manifest(manifest_file_path):
+    """
+    Load the manifest of verified files (empty for a missing or broken file).
+
+    Parameters
+    ----------
+    manifest_file_path : str
+        Path to the manifest file.
+
+    Returns
+    -------
+    dict
+        File name -> record with sha1 hash, size, modification time, and inode.
+    """
+    if not os.path.exists(manifest_file_path):
+        return {}
+    try:
+        with open(manifest_file_path, "r") as f:
+            manifest = json.load(f)
+    except ValueError:
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(manifest_file_path, manifest):
+    """
+    Save the manifest of verified files atomically.
+
+    Parameters
+    ----------
+    manifest_file_path : str
+        Path to the manifest file.
+    manifest : dict
+        File name -> record with sha1 hash, size, modification time, and inode.
+    """
+    tmp_file_path = "{}.{}.tmp".format(manifest_file_path, os.getpid())
+    with open(tmp_file_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.rename(tmp_file_path, manifest_file_path)
@@ -1,3 +1,4 @@
+import time
 import logging
 import numpy as np
 import mxnet as mx
@@ -8,8 +9,9 @@ from .gluoncv2.models.fishnet import InterpolationBlock, ChannelSqueeze
 from .gluoncv2.models.irevnet import IRevDownscale, IRevSplitBlock, IRevMergeBlock
 from .gluoncv2.models.rir_cifar import RiRFinalBlock
 from .gluoncv2.models.proxylessnas import ProxylessUnit
+from common.layer_profile import create_layer_profile
 
-__all__ = ['measure_model']
+__all__ = ['measure_model', 'profile_model']
 
 
 def calc_block_num_params2(net):
@@ -215,3 +217,169 @@ def measure_model(model,
     [h.detach() for h in hook_handles]
 
     return num_flops, num_macs, num_params1
+
+
+def get_named_leaf_blocks(block,
+                          prefix="",
+                          parent=None):
+    """
+    Get leaf blocks with their dotted names and parent blocks.
+
+    Parameters:
+    ----------
+    block : Block
+        Block.
+    prefix : str, default ''
+        Name of the block.
+    parent : Block or None, default None
+        Parent of the block.
+
+    Returns
+    -------
+    list of tuple
+        (name, block, parent) for each leaf block.
+    """
+    if len(block._children) == 0:
+        return [(prefix, block, parent)]
+    leaf_blocks = []
+    for child_name, child_block in block._children.items():
+        leaf_blocks += get_named_leaf_blocks(child_block, prefix + "." + child_name if prefix else child_name, block)
+    return leaf_blocks
+
+
+def get_block_type_name(block):
+    """
+    Get the type name of a block, with depthwise and grouped convolutions marked.
+    """
+    type_name = type(block).__name__
+    if isinstance(block, nn.Conv2D) and (block._kwargs["num_group"] > 1):
+        type_name += "(depthwise)" if block._kwargs["num_group"] == block._in_channels else "(grouped)"
+    return type_name
+
+
+def get_ndarrays(data):
+    """
+    Get all arrays from an array or a nested tuple/list of arrays.
+    """
+    if isinstance(data, mx.nd.NDArray):
+        return [data]
+    if isinstance(data, (tuple, list)):
+        return [a for d in data for a in get_ndarrays(d)]
+    return []
+
+
+def profile_model(model,
+                  in_channels,
+                  in_size,
+                  ctx=mx.cpu(),
+                  batch_size=1,
+                  num_runs=5,
+                  stage_depth=2):
+    """
+    Profile model layers: wall time and output activation size of each leaf block, and the peak of live activations.
+    Results are aggregated by block type and by stage (see `create_layer_profile`). The model should not be
+    hybridized. An activation is counted as live from the leaf block that produces it until the last leaf block that
+    consumes it (uses by non-leaf blocks, e.g. sums of residual branches, are not seen), so the peak is an estimate.
+
+    Parameters:
+    ----------
+    model : HybridBlock
+        Tested model.
+    in_channels : int
+        Number of input channels.
+    in_size : tuple of two ints
+        Spatial size of the expected input image.
+    ctx : Context, default CPU
+        The context in which to run the model.
+    batch_size : int, default 1
+        Batch size.
+    num_runs : int, default 5
+        Number of timed forward passes (after a warm-up pass, which measures activations).
+    stage_depth : int, default 2
+        Number of name components in the stage name.
+
+    Returns
+    -------
+    dict
+        Model profile.
+    """
+    layers = {}
+    executed_names = []
+    start_times = {}
+    call_names = []
+    activations = {}
+    last_uses = {}
+    track_activations = True
+
+    def pre_hook(name, block, x):
+        mx.nd.waitall()
+        start_times[name] = time.perf_counter()
+
+    def hook(name, block, x, y):
+        mx.nd.waitall()
+        layer = layers[name]
+        layer["time"] += time.perf_counter() - start_times[name]
+        if track_activations:
+            if layer["calls"] == 0:
+                executed_names.append(name)
+            layer["calls"] += 1
+            call_ind = len(call_names)
+            call_names.append(name)
+            for a in get_ndarrays(x):
+                last_uses[a.handle.value] = call_ind
+            for a in get_ndarrays(y):
+                num_bytes = a.size * np.dtype(a.dtype).itemsize
+                layer["activation_bytes"] += num_bytes
+                # The array is kept until the end of the pass, so that its handle isn't reused.
+                activations.setdefault(a.handle.value, (call_ind, num_bytes, a))
+
+    hook_handles = []
+    for name, block, parent in get_named_leaf_blocks(model):
+        layers[name] = {
+            "name": name,
+            "type": get_block_type_name(block),
+            "block": type(parent).__name__ if parent is not None else "",
+            "calls": 0,
+            "time": 0.0,
+            "activation_bytes": 0,
+            "params": int(calc_block_num_params(block))}
+        hook_handles.append(block.register_forward_pre_hook(lambda b, x, name=name: pre_hook(name, b, x)))
+        hook_handles.append(block.register_forward_hook(lambda b, x, y, name=name: hook(name, b, x, y)))
+
+    x = mx.nd.zeros((batch_size, in_channels, in_size[0], in_size[1]), ctx=ctx)
+    activations[x.handle.value] = (0, x.size * np.dtype(x.dtype).itemsize, x)
+    model(x)
+    track_activations = False
+
+    live_bytes_deltas = np.zeros((len(call_names) + 1,), np.int64)
+    for key, (call_ind, num_bytes, _) in activations.items():
+        live_bytes_deltas[call_ind] += num_bytes
+        live_bytes_deltas[max(call_ind, last_uses.get(key, call_ind)) + 1] -= num_bytes
+    live_bytes = np.cumsum(live_bytes_deltas[:-1])
+    peak_call_ind = int(np.argmax(live_bytes)) if len(call_names) > 0 else 0
+    peak_bytes = int(live_bytes[peak_call_ind]) if len(call_names) > 0 else 0
+    peak_name = call_names[peak_call_ind] if len(call_names) > 0 else ""
+    activations.clear()
+
+    for layer in layers.values():
+        layer["time"] = 0.0
+    for _ in range(num_runs):
+        model(x)
+    [h.detach() for h in hook_handles]
+
+    mx.nd.waitall()
+    tic = time.perf_counter()
+    for _ in range(num_runs):
+        model(x)
+    mx.nd.waitall()
+    model_time = (time.perf_counter() - tic) / num_runs
+
+    layers = [layers[name] for name in executed_names]
+    for layer in layers:
+        layer["time"] /= num_runs
+    return create_layer_profile(
+        layers=layers,
+        model_time=model_time,
+        peak_activation_bytes=peak_bytes,
+        peak_activation_layer=peak_name,
+        stage_depth=stage_depth)
@@ -1,8 +1,10 @@
 import os
 import re
+import time
 import logging
 import numpy as np
 import mxnet as mx
+from common.step_timer import StepTimer
 from .gluoncv2.model_provider import get_model
 from .cls_metrics import Top1Error, TopKError
 from .seg_metrics import PixelAccuracyMetric, MeanIoUMetric
@@ -91,17 +93,73 @@ def validate(metric,
              batch_fn,
              data_source_needs_reset,
              dtype,
-             ctx):
+             ctx,
+             step_timer=None):
     if data_source_needs_reset:
         val_data.reset()
     metric.reset()
-    for batch in val_data:
+    if step_timer is None:
+        step_timer = StepTimer(enabled=False)
+    for batch in step_timer.iter(val_data, category="val"):
         data_list, labels_list = batch_fn(batch, ctx)
+        step_timer.lap("h2d")
         outputs_list = [net(X.astype(dtype, copy=False)) for X in data_list]
+        step_timer.lap("forward")
         metric.update(labels_list, outputs_list)
+        step_timer.lap("metric")
     return metric
 
 
+def validate_models(metrics,
+                    nets,
+                    val_data,
+                    batch_fn,
+                    data_source_needs_reset,
+                    dtype,
+                    ctx):
+    """
+    Validate several models over one pass of the data (each batch is decoded once and fed to all models).
+
+    Parameters:
+    ----------
+    metrics : list of EvalMetric
+        Metric for each model.
+    nets : list of HybridBlock
+        Models.
+    val_data : DataLoader or ImageRecordIter
+        Data source.
+    batch_fn : func
+        Function for splitting data after extraction from data loader.
+    data_source_needs_reset : bool
+        Whether to reset the data source before validation.
+    dtype : str
+        Base data type for tensors.
+    ctx : list of Context
+        MXNet contexts.
+
+    Returns
+    -------
+    list of float
+        Forward time (in seconds) for each model.
+    """
+    assert (len(metrics) == len(nets))
+    if data_source_needs_reset:
+        val_data.reset()
+    for metric in metrics:
+        metric.reset()
+    forward_times = [0.0] * len(nets)
+    for batch in val_data:
+        data_list, labels_list = batch_fn(batch, ctx)
+        data_list = [X.astype(dtype, copy=False) for X in data_list]
+        for i, (net, metric) in enumerate(zip(nets, metrics)):
+            tic = time.time()
+            outputs_list = [net(X) for X in data_list]
+            metric.update(labels_list, outputs_list)
+            mx.nd.waitall()
+            forward_times[i] += time.time() - tic
+    return forward_times
+
+
 def report_accuracy(metric,
                     extended_log=False):
     metric_info = metric.get()
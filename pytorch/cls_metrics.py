@@ -1,5 +1,6 @@
 """
-Evaluation Metrics for Image Classification.
+Evaluation Metrics for Image Classification. Correct prediction counts are accumulated as tensors on the device of
+predictions, so updates don't synchronize with the host; values are read in `get`.
 """
 
 import numpy as np
@@ -57,17 +58,14 @@ class Accuracy(EvalMetric):
                 pred_label = torch.argmax(preds, dim=self.axis)
             else:
                 pred_label = preds
-            pred_label = pred_label.cpu().numpy().astype(np.int32)
-            label = labels.cpu().numpy().astype(np.int32)
+            pred_label = pred_label.reshape(-1).long()
+            label = labels.to(pred_label.device).reshape(-1).long()
 
-            label = label.flat
-            pred_label = pred_label.flat
-
-            num_correct = (pred_label == label).sum()
+            num_correct = (pred_label == label).sum(dtype=torch.float64)
             self.sum_metric += num_correct
             self.global_sum_metric += num_correct
-            self.num_inst += len(pred_label)
-            self.global_num_inst += len(pred_label)
+            self.num_inst += pred_label.numel()
+            self.global_num_inst += pred_label.numel()
 
 
 class TopKAccuracy(EvalMetric):
@@ -120,12 +118,10 @@ class TopKAccuracy(EvalMetric):
         assert (len(labels) == len(preds))
         with torch.no_grad():
             if self.torch_like:
-                _, pred = preds.topk(k=self.top_k, dim=1, largest=True, sorted=True)
-                pred = pred.t()
-                correct = pred.eq(labels.view(1, -1).expand_as(pred))
-                num_correct = correct.view(-1).float().sum(dim=0, keepdim=True).item()
+                _, pred = preds.topk(k=self.top_k, dim=1, largest=True, sorted=False)
+                label = labels.to(pred.device).reshape(-1, 1)
+                num_correct = (pred == label).sum(dtype=torch.float64)
                 num_samples = labels.size(0)
-                assert (num_correct <= num_samples)
                 self.sum_metric += num_correct
                 self.global_sum_metric += num_correct
                 self.num_inst += num_samples
@@ -145,10 +141,9 @@ class TopKAccuracy(EvalMetric):
                 elif num_dims == 2:
                     num_classes = pred_label.shape[1]
                     top_k = min(num_classes, self.top_k)
-                    for j in range(top_k):
-                        num_correct = (pred_label[:, num_classes - 1 - j].flat == label.flat).sum()
-                        self.sum_metric += num_correct
-                        self.global_sum_metric += num_correct
+                    num_correct = (pred_label[:, (num_classes - top_k):] == label.reshape(-1, 1)).sum()
+                    self.sum_metric += num_correct
+                    self.global_sum_metric += num_correct
                 self.num_inst += num_samples
                 self.global_num_inst += num_samples
 
@@ -195,7 +190,7 @@ class Top1Error(Accuracy):
         if self.num_inst == 0:
             return self.name, float("nan")
         else:
-            return self.name, 1.0 - self.sum_metric / self.num_inst
+            return self.name, 1.0 - float(self.sum_metric) / self.num_inst
 
 
 class TopKError(TopKAccuracy):
@@ -246,4 +241,4 @@ class TopKError(TopKAccuracy):
         if self.num_inst == 0:
             return self.name, float("nan")
         else:
-            return self.name, 1.0 - self.sum_metric / self.num_inst
+            return self.name, 1.0 - float(self.sum_metric) / self.num_inst
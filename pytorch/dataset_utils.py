@@ -2,9 +2,11 @@
     Dataset routines.
 """
 
-__all__ = ['get_dataset_metainfo', 'get_train_data_source', 'get_val_data_source', 'get_test_data_source']
+__all__ = ['get_dataset_metainfo', 'get_train_data_source', 'get_val_data_source', 'get_test_data_source',
+           'DistributedEvalSampler', 'get_eval_sampler']
 
 from .datasets.imagenet1k_cls_dataset import ImageNet1KMetaInfo
+from .datasets.imagenet1k_shard_cls_dataset import ImageNet1KShardMetaInfo
 from .datasets.cub200_2011_cls_dataset import CUB200MetaInfo
 from .datasets.cifar10_cls_dataset import CIFAR10MetaInfo
 from .datasets.cifar100_cls_dataset import CIFAR100MetaInfo
@@ -14,12 +16,79 @@ from .datasets.ade20k_seg_dataset import ADE20KMetaInfo
 from .datasets.cityscapes_seg_dataset import CityscapesMetaInfo
 from .datasets.coco_seg_dataset import COCOMetaInfo
 from .datasets.hpatches_mch_dataset import HPatchesMetaInfo
-from torch.utils.data import DataLoader
+from .datasets.val_cache_dataset import get_val_cache_dataset
+import torch.distributed as dist
+from torch.utils.data import DataLoader, Sampler, IterableDataset
+from torch.utils.data.distributed import DistributedSampler
+
+
+class DistributedEvalSampler(Sampler):
+    """
+    Sampler that splits a dataset between the processes of the default distributed group without padding, so each
+    sample is evaluated exactly once (the process shards may differ in size by one sample).
+
+    Parameters:
+    ----------
+    dataset : Dataset
+        Dataset to split.
+    num_replicas : int or None, default None
+        Number of processes (the world size by default).
+    rank : int or None, default None
+        Rank of the current process (taken from the default group by default).
+    """
+    def __init__(self,
+                 dataset,
+                 num_replicas=None,
+                 rank=None):
+        super(DistributedEvalSampler, self).__init__()
+        self.num_replicas = num_replicas if num_replicas is not None else dist.get_world_size()
+        self.rank = rank if rank is not None else dist.get_rank()
+        self.num_samples = len(range(self.rank, len(dataset), self.num_replicas))
+        self.dataset_len = len(dataset)
+
+    def __iter__(self):
+        return iter(range(self.rank, self.dataset_len, self.num_replicas))
+
+    def __len__(self):
+        return self.num_samples
+
+
+def get_eval_sampler(dataset,
+                     distributed=False,
+                     shard=None):
+    """
+    Get a sampler for evaluation data: the part of the current distributed process, or an index shard.
+
+    Parameters:
+    ----------
+    dataset : Dataset
+        Dataset.
+    distributed : bool, default False
+        Whether to split the dataset between the processes of the default distributed group.
+    shard : tuple of (int, int) or None, default None
+        Index and count of shards, if only one shard of the dataset is used.
+
+    Returns
+    -------
+    Sampler or None
+        Sampler (None for the whole dataset).
+    """
+    if isinstance(dataset, IterableDataset):
+        assert (shard is None), "Iterable datasets can't be split into index shards"
+        return None
+    if shard is not None:
+        assert (not distributed)
+        shard_index, num_shards = shard
+        return DistributedEvalSampler(dataset, num_replicas=num_shards, rank=shard_index)
+    if distributed:
+        return DistributedEvalSampler(dataset)
+    return None
 
 
 def get_dataset_metainfo(dataset_name):
     dataset_metainfo_map = {
         "ImageNet1K": ImageNet1KMetaInfo,
+        "ImageNet1K_shard": ImageNet1KShardMetaInfo,
         "CUB200_2011": CUB200MetaInfo,
         "CIFAR10": CIFAR10MetaInfo,
         "CIFAR100": CIFAR100MetaInfo,
@@ -38,7 +107,8 @@ def get_dataset_metainfo(dataset_name):
 
 def get_train_data_source(ds_metainfo,
                           batch_size,
-                          num_workers):
+                          num_workers,
+                          distributed=False):
     transform_train = ds_metainfo.train_transform(ds_metainfo=ds_metainfo)
     kwargs = ds_metainfo.dataset_class_extra_kwargs if ds_metainfo.dataset_class_extra_kwargs is not None else {}
     dataset = ds_metainfo.dataset_class(
@@ -46,35 +116,66 @@ def get_train_data_source(ds_metainfo,
         mode="train",
         transform=transform_train,
         **kwargs)
+    if isinstance(dataset, IterableDataset):
+        # Streaming datasets shuffle and split data between processes by themselves.
+        if hasattr(dataset, "set_num_workers"):
+            dataset.set_num_workers(num_workers)
+        return DataLoader(
+            dataset=dataset,
+            batch_size=batch_size,
+            num_workers=num_workers,
+            pin_memory=True)
+    sampler = DistributedSampler(dataset, shuffle=True) if distributed else None
     return DataLoader(
         dataset=dataset,
         batch_size=batch_size,
-        shuffle=True,
+        shuffle=(sampler is None),
+        sampler=sampler,
         num_workers=num_workers,
         pin_memory=True)
 
 
 def get_val_data_source(ds_metainfo,
                         batch_size,
-                        num_workers):
-    transform_val = ds_metainfo.val_transform(ds_metainfo=ds_metainfo)
-    kwargs = ds_metainfo.dataset_class_extra_kwargs if ds_metainfo.dataset_class_extra_kwargs is not None else {}
-    dataset = ds_metainfo.dataset_class(
-        root=ds_metainfo.root_dir_path,
-        mode="val",
-        transform=transform_val,
-        **kwargs)
+                        num_workers,
+                        distributed=False,
+                        shard=None):
+    dataset = None
+    if getattr(ds_metainfo, "val_cache_dir_path", None):
+        dataset = get_val_cache_dataset(
+            ds_metainfo=ds_metainfo,
+            mode="val",
+            num_workers=num_workers)
+    if dataset is None:
+        transform_val = ds_metainfo.val_transform(ds_metainfo=ds_metainfo)
+        kwargs = ds_metainfo.dataset_class_extra_kwargs if ds_metainfo.dataset_class_extra_kwargs is not None else {}
+        dataset = ds_metainfo.dataset_class(
+            root=ds_metainfo.root_dir_path,
+            mode="val",
+            transform=transform_val,
+            **kwargs)
+    if hasattr(dataset, "get_batch_sampler"):
+        # Datasets with their own batch composition (e.g. batches of same-size images).
+        assert (not distributed) and (shard is None)
+        return DataLoader(
+            dataset=dataset,
+            batch_sampler=dataset.get_batch_sampler(batch_size),
+            num_workers=num_workers,
+            pin_memory=True)
     return DataLoader(
         dataset=dataset,
         batch_size=batch_size,
         shuffle=False,
+        sampler=get_eval_sampler(dataset, distributed=distributed, shard=shard),
         num_workers=num_workers,
         pin_memory=True)
 
 
 def get_test_data_source(ds_metainfo,
                          batch_size,
-                         num_workers):
+                         num_workers,
+                         distributed=False,
+                         shard=None):
     transform_test = ds_metainfo.test_transform(ds_metainfo=ds_metainfo)
     kwargs = ds_metainfo.dataset_class_extra_kwargs if ds_metainfo.dataset_class_extra_kwargs is not None else {}
     dataset = ds_metainfo.dataset_class(
@@ -86,5 +187,6 @@ def get_test_data_source(ds_metainfo,
         dataset=dataset,
         batch_size=batch_size,
         shuffle=False,
+        sampler=get_eval_sampler(dataset, distributed=distributed, shard=shard),
         num_workers=num_workers,
         pin_memory=True)
@@ -105,12 +105,8 @@ class ADE20KMetaInfo(VOCMetaInfo):
         self.dataset_class = ADE20KSegDataset
         self.num_classes = ADE20KSegDataset.classes
         self.test_metric_extra_kwargs = [
-            {"vague_idx": ADE20KSegDataset.vague_idx,
-             "use_vague": ADE20KSegDataset.use_vague,
-             "macro_average": False},
             {"num_classes": ADE20KSegDataset.classes,
              "vague_idx": ADE20KSegDataset.vague_idx,
              "use_vague": ADE20KSegDataset.use_vague,
              "bg_idx": ADE20KSegDataset.background_idx,
-             "ignore_bg": ADE20KSegDataset.ignore_bg,
-             "macro_average": False}]
+             "ignore_bg": ADE20KSegDataset.ignore_bg}]
@@ -6,6 +6,7 @@ import os
 from torchvision.datasets import CIFAR10
 import torchvision.transforms as transforms
 from .dataset_metainfo import DatasetMetaInfo
+from .imagenet1k_cls_dataset import get_to_tensor_transforms
 
 
 class CIFAR10Fine(CIFAR10):
@@ -55,6 +56,23 @@ class CIFAR10MetaInfo(DatasetMetaInfo):
         self.val_transform = cifar10_val_transform
         self.test_transform = cifar10_val_transform
         self.ml_type = "imgcls"
+        self.raw_input = False
+        self.mean_rgb = (0.4914, 0.4822, 0.4465)
+        self.std_rgb = (0.2023, 0.1994, 0.2010)
+
+    def add_dataset_parser_arguments(self,
+                                     parser,
+                                     work_dir_path):
+        super(CIFAR10MetaInfo, self).add_dataset_parser_arguments(parser, work_dir_path)
+        parser.add_argument(
+            '--raw-input',
+            action='store_true',
+            help='feed raw uint8 images to the model, with input normalization folded into it (evaluation only)')
+
+    def update(self,
+               args):
+        super(CIFAR10MetaInfo, self).update(args)
+        self.raw_input = args.raw_input
 
 
 def cifar10_train_transform(ds_metainfo,
@@ -83,9 +101,4 @@ def cifar10_val_transform(ds_metainfo,
                           mean_rgb=(0.4914, 0.4822, 0.4465),
                           std_rgb=(0.2023, 0.1994, 0.2010)):
     assert (ds_metainfo is not None)
-    return transforms.Compose([
-        transforms.ToTensor(),
-        transforms.Normalize(
-            mean=mean_rgb,
-            std=std_rgb)
-    ])
+    return transforms.Compose(get_to_tensor_transforms(ds_metainfo, mean_rgb, std_rgb))
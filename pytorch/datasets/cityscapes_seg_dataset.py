@@ -120,12 +120,8 @@ class CityscapesMetaInfo(VOCMetaInfo):
         self.dataset_class = CityscapesSegDataset
         self.num_classes = CityscapesSegDataset.classes
         self.test_metric_extra_kwargs = [
-            {"vague_idx": CityscapesSegDataset.vague_idx,
-             "use_vague": CityscapesSegDataset.use_vague,
-             "macro_average": False},
             {"num_classes": CityscapesSegDataset.classes,
              "vague_idx": CityscapesSegDataset.vague_idx,
              "use_vague": CityscapesSegDataset.use_vague,
              "bg_idx": CityscapesSegDataset.background_idx,
-             "ignore_bg": CityscapesSegDataset.ignore_bg,
-             "macro_average": False}]
+             "ignore_bg": CityscapesSegDataset.ignore_bg}]
@@ -144,12 +144,8 @@ class COCOMetaInfo(VOCMetaInfo):
         self.dataset_class = COCOSegDataset
         self.num_classes = COCOSegDataset.classes
         self.test_metric_extra_kwargs = [
-            {"vague_idx": COCOSegDataset.vague_idx,
-             "use_vague": COCOSegDataset.use_vague,
-             "macro_average": False},
             {"num_classes": COCOSegDataset.classes,
              "vague_idx": COCOSegDataset.vague_idx,
              "use_vague": COCOSegDataset.use_vague,
              "bg_idx": COCOSegDataset.background_idx,
-             "ignore_bg": COCOSegDataset.ignore_bg,
-             "macro_average": False}]
+             "ignore_bg": COCOSegDataset.ignore_bg}]
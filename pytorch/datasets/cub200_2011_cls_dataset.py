@@ -5,9 +5,8 @@
 import os
 import numpy as np
 import pandas as pd
-from PIL import Image
 import torch.utils.data as data
-from .imagenet1k_cls_dataset import ImageNet1KMetaInfo
+from .imagenet1k_cls_dataset import ImageNet1KMetaInfo, get_image_loader
 
 
 class CUB200_2011(data.Dataset):
@@ -85,11 +84,12 @@ class CUB200_2011(data.Dataset):
 
         self._transform = transform
         self._target_transform = target_transform
+        self._loader = get_image_loader(transform)
 
     def __getitem__(self, index):
         image_file_name = self.image_file_names[index]
         image_file_path = os.path.join(self.images_dir_path, image_file_name)
-        img = Image.open(image_file_path).convert("RGB")
+        img = self._loader(image_file_path)
         label = int(self.class_ids[index])
 
         if self._transform is not None:
@@ -31,6 +31,8 @@ class DatasetMetaInfo(object):
         self.allow_hybridize = True
         self.net_extra_kwargs = None
         self.load_ignore_extra = False
+        self.val_cache_dir_path = None
+        self.val_cache_max_size = None
 
     def add_dataset_parser_arguments(self,
                                      parser,
@@ -50,9 +52,21 @@ class DatasetMetaInfo(object):
             type=int,
             default=self.in_channels,
             help="number of input channels")
+        parser.add_argument(
+            "--val-cache-dir",
+            type=str,
+            default="",
+            help="path to directory with cache of preprocessed validation images (disabled if empty)")
+        parser.add_argument(
+            "--val-cache-max-size",
+            type=float,
+            default=64.0,
+            help="maximal size of validation cache in GB")
 
     def update(self,
                args):
         self.root_dir_path = args.data_dir
         self.num_classes = args.num_classes
         self.in_channels = args.in_channels
+        self.val_cache_dir_path = args.val_cache_dir if args.val_cache_dir else None
+        self.val_cache_max_size = int(args.val_cache_max_size * (1 << 30))
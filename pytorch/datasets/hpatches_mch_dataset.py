@@ -5,6 +5,8 @@
 import os
 import cv2
 import numpy as np
+from collections import OrderedDict
+from PIL import Image
 import torch.utils.data as data
 import torchvision.transforms as transforms
 from .dataset_metainfo import DatasetMetaInfo
@@ -16,6 +18,9 @@ class HPatches(data.Dataset):
     Info URL: https://github.com/hpatches/hpatches-dataset
     Data URL: http://icvl.ee.ic.ac.uk/vbalnt/hpatches/hpatches-sequences-release.tar.gz
 
+    Each image (the reference one or a warped one) is a separate sample, so that the reference image of a sequence is
+    decoded and inferred only once. The image pairs for matching are listed in `pairs`.
+
     Parameters
     ----------
     root : str, default '~/.torch/datasets/hpatches'
@@ -39,25 +44,27 @@ class HPatches(data.Dataset):
 
         self.mode = mode
         self.image_paths = []
-        self.warped_image_paths = []
-        self.homographies = []
+        self.sequence_indices = []
+        self.pairs = []
 
-        subdir_names = [name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))]
+        subdir_names = sorted([name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name))])
         if alteration != "all":
             subdir_names = [name for name in subdir_names if name[0] == alteration]
-        for subdir_name in subdir_names:
+        for seq_index, subdir_name in enumerate(subdir_names):
             subdir_path = os.path.join(root, subdir_name)
+            src_index = len(self.image_paths)
+            self.image_paths.append(os.path.join(subdir_path, "1" + image_file_ext))
+            self.sequence_indices.append(seq_index)
             for i in range(num_images):
                 k = i + 2
-                self.image_paths.append(os.path.join(subdir_path, "1" + image_file_ext))
-                self.warped_image_paths.append(os.path.join(subdir_path, str(k) + image_file_ext))
-                self.homographies.append(np.loadtxt(os.path.join(subdir_path, "H_1_" + str(k))))
+                homography = np.loadtxt(os.path.join(subdir_path, "H_1_" + str(k)))
+                self.pairs.append((src_index, len(self.image_paths), homography))
+                self.image_paths.append(os.path.join(subdir_path, str(k) + image_file_ext))
+                self.sequence_indices.append(seq_index)
 
         self.transform = transform
 
     def __getitem__(self, index):
-        print("Image file name: {}, index: {}".format(self.image_paths[index], index))
-
         image = cv2.imread(self.image_paths[index], flags=0)
         if image.shape[0] > 1500:
             image = cv2.resize(
@@ -66,28 +73,89 @@ class HPatches(data.Dataset):
                 fx=0.5,
                 fy=0.5,
                 interpolation=cv2.INTER_AREA)
-        print("Image shape: {}".format(image.shape))
-
-        warped_image = cv2.imread(self.warped_image_paths[index], flags=0)
-        if warped_image.shape[0] > 1500:
-            warped_image = cv2.resize(
-                src=warped_image,
-                dsize=None,
-                fx=0.5,
-                fy=0.5,
-                interpolation=cv2.INTER_AREA)
-        print("W-Image shape: {}".format(warped_image.shape))
-        homography = self.homographies[index]
 
         if self.transform is not None:
             image = self.transform(image)
-            warped_image = self.transform(warped_image)
 
-        return image, warped_image, homography
+        return image, index
 
     def __len__(self):
         return len(self.image_paths)
 
+    def get_image_size(self, index):
+        """
+        Get the size of an image (as returned by `__getitem__`) from the image header, without decoding.
+
+        Parameters
+        ----------
+        index : int
+            Image index.
+
+        Returns
+        -------
+        tuple of (int, int)
+            Image height and width.
+        """
+        with Image.open(self.image_paths[index]) as image:
+            width, height = image.size
+        if height > 1500:
+            height, width = int(round(height * 0.5)), int(round(width * 0.5))
+        return height, width
+
+    def get_batch_sampler(self, batch_size):
+        """
+        Get a batch sampler with batches of same-size images.
+
+        Parameters
+        ----------
+        batch_size : int
+            Maximal number of images in a batch.
+
+        Returns
+        -------
+        HPatchesBatchSampler
+            Batch sampler.
+        """
+        return HPatchesBatchSampler(self, batch_size=batch_size)
+
+
+class HPatchesBatchSampler(data.Sampler):
+    """
+    Batch sampler for HPatches, which groups images of the same size into batches. Images are taken in windows of
+    several consecutive sequences, so that all images of a sequence come close to each other (it bounds the number of
+    cached inference results in the matching evaluation).
+
+    Parameters
+    ----------
+    dataset : HPatches
+        HPatches dataset.
+    batch_size : int
+        Maximal number of images in a batch.
+    window_size : int, default 8
+        Number of sequences in a window.
+    """
+    def __init__(self,
+                 dataset,
+                 batch_size,
+                 window_size=8):
+        super(HPatchesBatchSampler, self).__init__()
+        assert (batch_size > 0) and (window_size > 0)
+        self.batches = []
+        window_buckets = OrderedDict()
+        for index in range(len(dataset)):
+            window_index = dataset.sequence_indices[index] // window_size
+            bucket = window_buckets.setdefault((window_index, dataset.get_image_size(index)), [])
+            bucket.append(index)
+        for bucket in window_buckets.values():
+            self.batches += [bucket[i:(i + batch_size)] for i in range(0, len(bucket), batch_size)]
+        self.batches.sort(key=lambda batch: batch[0])
+
+    def __iter__(self):
+        return iter(self.batches)
+
+    def __len__(self):
+        return len(self.batches)
+
 
 class HPatchesMetaInfo(DatasetMetaInfo):
     def __init__(self):
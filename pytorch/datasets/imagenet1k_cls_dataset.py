@@ -3,12 +3,16 @@
 """
 
 import os
+import io
 import math
 import cv2
 import numpy as np
+import torch
 from PIL import Image
 from torchvision.datasets import ImageFolder
+from torchvision.datasets.folder import default_loader
 import torchvision.transforms as transforms
+import torchvision.transforms.functional as TF
 from .dataset_metainfo import DatasetMetaInfo
 
 
@@ -23,7 +27,8 @@ class ImageNet1K(ImageFolder):
     mode : str, default 'train'
         'train', 'val', or 'test'.
     transform : function, default None
-        A function that takes data and label and transforms them.
+        A function that takes data and label and transforms them. If it decodes images itself, it gets encoded image
+        bytes or a lazily opened image (see `get_image_loader`).
     """
     def __init__(self,
                  root=os.path.join("~", ".torch", "datasets", "imagenet"),
@@ -31,7 +36,66 @@ class ImageNet1K(ImageFolder):
                  transform=None):
         split = "train" if mode == "train" else "val"
         root = os.path.join(root, split)
-        super(ImageNet1K, self).__init__(root=root, transform=transform)
+        super(ImageNet1K, self).__init__(root=root, transform=transform, loader=get_image_loader(transform))
+
+
+def read_image_bytes(path):
+    """
+    Read an encoded image file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the image file.
+
+    Returns
+    -------
+    bytes
+        File content.
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def open_image_lazy(path):
+    """
+    Open an image file without decoding (so that it can be decoded at a reduced scale, see `PIL.Image.draft`).
+
+    Parameters
+    ----------
+    path : str
+        Path to the image file.
+
+    Returns
+    -------
+    PIL.Image
+        Lazily opened image.
+    """
+    return Image.open(io.BytesIO(read_image_bytes(path)))
+
+
+def get_image_loader(transform):
+    """
+    Get an image file loader for a transform: encoded bytes for transforms with the `decodes_bytes` attribute,
+    a lazily opened image for ones with the `decodes_lazy` attribute (for a composition the first transform is checked),
+    and a decoded RGB image otherwise.
+
+    Parameters
+    ----------
+    transform : function or None
+        Image transform.
+
+    Returns
+    -------
+    function
+        Image file loader.
+    """
+    first_transform = transform.transforms[0] if isinstance(transform, transforms.Compose) else transform
+    if getattr(first_transform, "decodes_bytes", False):
+        return read_image_bytes
+    if getattr(first_transform, "decodes_lazy", False):
+        return open_image_lazy
+    return default_loader
 
 
 class ImageNet1KMetaInfo(DatasetMetaInfo):
@@ -58,6 +122,11 @@ class ImageNet1KMetaInfo(DatasetMetaInfo):
         self.test_transform = imagenet_val_transform
         self.ml_type = "imgcls"
         self.use_cv_resize = False
+        self.use_cv_pipeline = False
+        self.use_jpeg_draft = False
+        self.raw_input = False
+        self.mean_rgb = (0.485, 0.456, 0.406)
+        self.std_rgb = (0.229, 0.224, 0.225)
 
     def add_dataset_parser_arguments(self,
                                      parser,
@@ -77,12 +146,28 @@ class ImageNet1KMetaInfo(DatasetMetaInfo):
             '--use-cv-resize',
             action='store_true',
             help='use OpenCV resize preprocessing')
+        parser.add_argument(
+            '--use-cv-pipeline',
+            action='store_true',
+            help='use OpenCV decode-resize-crop preprocessing for evaluation (without PIL)')
+        parser.add_argument(
+            '--use-jpeg-draft',
+            action='store_true',
+            help='decode JPEG images at the smallest DCT scale that covers the target size')
+        parser.add_argument(
+            '--raw-input',
+            action='store_true',
+            help='feed raw uint8 images to the model, with input normalization folded into it (evaluation only)')
 
     def update(self,
                args):
         super(ImageNet1KMetaInfo, self).update(args)
         self.input_image_size = (args.input_size, args.input_size)
+        self.resize_inv_factor = args.resize_inv_factor
         self.use_cv_resize = args.use_cv_resize
+        self.use_cv_pipeline = args.use_cv_pipeline
+        self.use_jpeg_draft = args.use_jpeg_draft
+        self.raw_input = args.raw_input
 
 
 def imagenet_train_transform(ds_metainfo,
@@ -91,6 +176,7 @@ def imagenet_train_transform(ds_metainfo,
                              jitter_param=0.4):
     input_image_size = ds_metainfo.input_image_size
     return transforms.Compose([
+        DraftRandomResizedCrop(input_image_size) if ds_metainfo.use_jpeg_draft else
         transforms.RandomResizedCrop(input_image_size),
         transforms.RandomHorizontalFlip(),
         transforms.ColorJitter(
@@ -111,14 +197,104 @@ def imagenet_val_transform(ds_metainfo,
     resize_value = calc_val_resize_value(
         input_image_size=ds_metainfo.input_image_size,
         resize_inv_factor=ds_metainfo.resize_inv_factor)
-    return transforms.Compose([
+    if ds_metainfo.use_cv_pipeline:
+        return CvValPipeline(
+            resize_value=resize_value,
+            crop_size=input_image_size,
+            mean_rgb=mean_rgb,
+            std_rgb=std_rgb,
+            raw_output=getattr(ds_metainfo, "raw_input", False))
+    return transforms.Compose(([DraftDecode(resize_value)] if ds_metainfo.use_jpeg_draft else []) + [
         CvResize(resize_value) if ds_metainfo.use_cv_resize else transforms.Resize(resize_value),
         transforms.CenterCrop(size=input_image_size),
+    ] + get_to_tensor_transforms(ds_metainfo, mean_rgb, std_rgb))
+
+
+def get_to_tensor_transforms(ds_metainfo,
+                             mean_rgb,
+                             std_rgb):
+    """
+    Get the final transforms of a PIL image to a tensor: a normalized float tensor, or a raw uint8 one (if
+    `ds_metainfo.raw_input` is set, the normalization is folded into the model, see `RawInputNet`).
+
+    Parameters
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+    mean_rgb : tuple of 3 float
+        Mean of RGB channels in the dataset.
+    std_rgb : tuple of 3 float
+        STD of RGB channels in the dataset.
+
+    Returns
+    -------
+    list of function
+        Transforms.
+    """
+    if getattr(ds_metainfo, "raw_input", False):
+        return [transforms.PILToTensor()]
+    return [
         transforms.ToTensor(),
         transforms.Normalize(
             mean=mean_rgb,
             std=std_rgb)
-    ])
+    ]
+
+
+class DraftDecode(object):
+    """
+    Decode a lazily opened image at the smallest JPEG DCT scale (1/2, 1/4, or 1/8) that keeps the shorter side not
+    less than the given size, and convert it to RGB. Other formats are decoded at full resolution.
+
+    Parameters
+    ----------
+    min_size : int
+        Minimal size of the shorter side.
+    """
+    decodes_lazy = True
+
+    def __init__(self, min_size):
+        self.min_size = min_size
+
+    def __call__(self, img):
+        """
+        Decode image.
+
+        Parameters
+        ----------
+        img : PIL.Image
+            Lazily opened image.
+
+        Returns
+        -------
+        PIL.Image
+            Resulted image.
+        """
+        img.draft("RGB", (self.min_size, self.min_size))
+        return img.convert("RGB")
+
+    def __repr__(self):
+        return "{}(min_size={})".format(self.__class__.__name__, self.min_size)
+
+
+class DraftRandomResizedCrop(transforms.RandomResizedCrop):
+    """
+    `RandomResizedCrop` for a lazily opened image: the crop box is sampled first, and then the image is decoded at the
+    smallest JPEG DCT scale that keeps the box not less than the output size.
+    """
+    decodes_lazy = True
+
+    def forward(self, img):
+        w, h = img.size
+        i, j, crop_h, crop_w = self.get_params(img, self.scale, self.ratio)
+        img.draft("RGB", (int(math.ceil(w * self.size[1] / crop_w)), int(math.ceil(h * self.size[0] / crop_h))))
+        img = img.convert("RGB")
+        if img.size != (w, h):
+            scale_x = float(img.size[0]) / w
+            scale_y = float(img.size[1]) / h
+            i, j = int(round(i * scale_y)), int(round(j * scale_x))
+            crop_h, crop_w = max(1, int(round(crop_h * scale_y))), max(1, int(round(crop_w * scale_x)))
+        return TF.resized_crop(img, i, j, crop_h, crop_w, self.size, self.interpolation, antialias=self.antialias)
 
 
 class CvResize(object):
@@ -180,6 +356,101 @@ class CvResize(object):
             cv_img = cv2.resize(cv_img, dsize=self.size, interpolation=cv_interpolation)
             return Image.fromarray(cv_img)
 
+    def __repr__(self):
+        return "{}(size={}, interpolation={})".format(self.__class__.__name__, self.size, self.interpolation)
+
+
+class CvValPipeline(object):
+    """
+    Validation preprocessing via OpenCV/NumPy without PIL: decoding from bytes, resizing of the shorter side and center
+    cropping (as `CvResize` + `CenterCrop`), and conversion to a contiguous CHW tensor. Resizing and cropping are done
+    in one affine warp, which computes only the cropped pixels with the same bilinear sampling positions as the resize.
+
+    Parameters
+    ----------
+    resize_value : int
+        Size of the shorter image side after resizing.
+    crop_size : tuple of (H, W)
+        Size of the center crop.
+    mean_rgb : tuple of 3 float
+        Mean of RGB channels in the dataset.
+    std_rgb : tuple of 3 float
+        STD of RGB channels in the dataset.
+    raw_output : bool, default False
+        Whether to output a raw uint8 tensor (otherwise a normalized float one).
+    """
+    decodes_bytes = True
+
+    def __init__(self,
+                 resize_value,
+                 crop_size,
+                 mean_rgb,
+                 std_rgb,
+                 raw_output=False):
+        self.resize_value = resize_value
+        self.crop_size = crop_size
+        self.raw_output = raw_output
+        self.mean = (255.0 * np.array(mean_rgb, np.float32)).reshape(3, 1, 1)
+        self.inv_std = (1.0 / (255.0 * np.array(std_rgb, np.float32))).reshape(3, 1, 1)
+
+    def __call__(self, img):
+        """
+        Preprocess image.
+
+        Parameters
+        ----------
+        img : bytes or np.array or PIL.Image
+            Encoded image, or decoded RGB image.
+
+        Returns
+        -------
+        Tensor
+            Resulted image (CHW).
+        """
+        if isinstance(img, bytes):
+            # The EXIF orientation is ignored, as by PIL. Channels are in BGR order.
+            cv_img = cv2.imdecode(np.frombuffer(img, np.uint8), cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION)
+            if cv_img is None:
+                raise ValueError("Image can't be decoded")
+            channels = [2, 1, 0]
+        else:
+            cv_img = np.asarray(img.convert("RGB") if isinstance(img, Image.Image) else img)
+            channels = [0, 1, 2]
+
+        h, w = cv_img.shape[:2]
+        if w < h:
+            out_w, out_h = self.resize_value, int(self.resize_value * h / w)
+        else:
+            out_w, out_h = int(self.resize_value * w / h), self.resize_value
+        crop_h, crop_w = self.crop_size
+        top = int(round((out_h - crop_h) / 2.0))
+        left = int(round((out_w - crop_w) / 2.0))
+        # Source coordinates of the crop pixel (x, y), as for `cv2.resize`: (x + left + 0.5) * w / out_w - 0.5.
+        scale_x = float(w) / out_w
+        scale_y = float(h) / out_h
+        inv_affine = np.array([
+            [scale_x, 0.0, (left + 0.5) * scale_x - 0.5],
+            [0.0, scale_y, (top + 0.5) * scale_y - 0.5]])
+        cv_img = cv2.warpAffine(
+            cv_img,
+            M=inv_affine,
+            dsize=(crop_w, crop_h),
+            flags=(cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP),
+            borderMode=cv2.BORDER_REPLICATE)
+
+        chw_img = cv_img.transpose(2, 0, 1)[channels]
+        if self.raw_output:
+            return torch.from_numpy(np.ascontiguousarray(chw_img))
+        chw_img = chw_img.astype(np.float32)
+        chw_img -= self.mean
+        chw_img *= self.inv_std
+        return torch.from_numpy(chw_img)
+
+    def __repr__(self):
+        return "{}(resize_value={}, crop_size={}, mean={}, inv_std={}, raw_output={})".format(
+            self.__class__.__name__, self.resize_value, self.crop_size, self.mean.ravel().tolist(),
+            self.inv_std.ravel().tolist(), self.raw_output)
+
 
 def calc_val_resize_value(input_image_size=(224, 224),
                           resize_inv_factor=0.875):
@@ -0,0 +1,317 @@
+"""
+    ImageNet-1K classification dataset (via packed shards).
+"""
+
+import os
+import io
+import json
+import math
+import random
+import tarfile
+import argparse
+import torch.distributed as dist
+from PIL import Image
+from torch.utils.data import IterableDataset, get_worker_info
+from torchvision.datasets.folder import find_classes, make_dataset, IMG_EXTENSIONS
+from .imagenet1k_cls_dataset import ImageNet1KMetaInfo, get_image_loader, read_image_bytes, open_image_lazy
+
+
+class ImageNet1KShards(IterableDataset):
+    """
+    ImageNet-1K classification dataset, packed into tar shards with a JSON index (see `convert_image_folder_to_shards`).
+    Shards are read sequentially, one shard at a time. In training mode the shard order is shuffled each epoch and
+    the samples are mixed via a shuffle buffer. Shards are partitioned between data loader workers and distributed
+    processes. In training mode each data loader worker gets the same number of samples in all distributed processes,
+    so all processes get the same number of batches (set the number of workers via `set_num_workers`).
+
+    Parameters
+    ----------
+    root : str, default '~/.torch/datasets/imagenet_shard'
+        Path to the folder stored the dataset.
+    mode : str, default 'train'
+        'train', 'val', or 'test'.
+    transform : function, default None
+        A function that takes data and label and transforms them.
+    shuffle_buffer_size : int, default 1024
+        Number of samples in the shuffle buffer (for training mode).
+    seed : int, default 0
+        Base random seed for shard shuffling.
+    """
+    def __init__(self,
+                 root=os.path.join("~", ".torch", "datasets", "imagenet_shard"),
+                 mode="train",
+                 transform=None,
+                 shuffle_buffer_size=1024,
+                 seed=0):
+        super(ImageNet1KShards, self).__init__()
+        split = "train" if mode == "train" else "val"
+        self.root = os.path.expanduser(root)
+        self.transform = transform
+        self.shuffle = (mode == "train")
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.seed = seed
+        self.epoch = 0
+        self.num_workers = 1
+        with open(os.path.join(self.root, "{}.json".format(split)), "r") as f:
+            index = json.load(f)
+        self.classes = index["classes"]
+        self.shards = index["shards"]
+        if dist.is_available() and dist.is_initialized():
+            self.rank, self.num_replicas = dist.get_rank(), dist.get_world_size()
+        else:
+            self.rank, self.num_replicas = 0, 1
+
+    def set_epoch(self, epoch):
+        """
+        Set the epoch for shard shuffling (must be called before creating the data loader iterator).
+
+        Parameters
+        ----------
+        epoch : int
+            Epoch number.
+        """
+        self.epoch = epoch
+
+    def set_num_workers(self, num_workers):
+        """
+        Set the number of data loader workers (for the sample count in distributed training mode).
+
+        Parameters
+        ----------
+        num_workers : int
+            Number of data loader workers.
+        """
+        self.num_workers = max(1, num_workers)
+
+    def _get_shard_order(self):
+        """
+        Get the shard order for the current epoch (the same for all processes and workers).
+        """
+        shard_order = list(range(len(self.shards)))
+        if self.shuffle:
+            random.Random(self.seed + self.epoch).shuffle(shard_order)
+        return shard_order
+
+    @staticmethod
+    def _split_slices(slices,
+                      num_parts):
+        """
+        Split shard slices into parts: by whole slices if there are enough of them, otherwise into contiguous sample
+        ranges of (almost) equal size.
+
+        Parameters
+        ----------
+        slices : list of tuple of (int, int, int)
+            Shard slices (shard index, first sample, sample count).
+        num_parts : int
+            Number of parts.
+
+        Returns
+        -------
+        list of list of tuple of (int, int, int)
+            Shard slices for each part.
+        """
+        if len(slices) >= num_parts:
+            return [slices[i::num_parts] for i in range(num_parts)]
+        total_count = sum(count for _, _, count in slices)
+        parts = [[] for _ in range(num_parts)]
+        slice_pos = 0
+        for j, begin, count in slices:
+            for i in range(num_parts):
+                part_begin = max(total_count * i // num_parts, slice_pos) - slice_pos
+                part_end = min(total_count * (i + 1) // num_parts, slice_pos + count) - slice_pos
+                if part_end > part_begin:
+                    parts[i].append((j, begin + part_begin, part_end - part_begin))
+            slice_pos += count
+        return parts
+
+    @staticmethod
+    def _cut_slices(slices,
+                    total_count):
+        """
+        Cut the tail of shard slices, so that they contain the given number of samples.
+        """
+        cut_slices = []
+        for j, begin, count in slices:
+            if total_count <= 0:
+                break
+            cut_slices.append((j, begin, min(count, total_count)))
+            total_count -= count
+        return cut_slices
+
+    def _get_worker_parts(self,
+                          num_workers):
+        """
+        Get shard slices for each data loader worker of the current process.
+
+        Parameters
+        ----------
+        num_workers : int
+            Number of data loader workers.
+
+        Returns
+        -------
+        list of list of tuple of (int, int, int)
+            Shard slices for each worker.
+        """
+        slices = [(j, 0, self.shards[j]["num_samples"]) for j in self._get_shard_order()]
+        rank_parts = self._split_slices(slices, self.num_replicas)
+        worker_parts = self._split_slices(rank_parts[self.rank], num_workers)
+        if self.shuffle and (self.num_replicas > 1):
+            # Each worker yields its own batches (with a partial last one), so a worker part is cut to the minimal size
+            # of this worker part over all processes: then each process has the same number of batches (it is required
+            # by DDP).
+            worker_counts = [[sum(c for _, _, c in part) for part in self._split_slices(rank_part, num_workers)]
+                             for rank_part in rank_parts]
+            worker_parts = [self._cut_slices(part, min(counts[i] for counts in worker_counts))
+                            for i, part in enumerate(worker_parts)]
+        return worker_parts
+
+    def __len__(self):
+        return sum(count for part in self._get_worker_parts(self.num_workers) for _, _, count in part)
+
+    def _iter_raw_samples(self,
+                          part):
+        """
+        Read raw samples from shard slices.
+        """
+        for j, begin, count in part:
+            shard = self.shards[j]
+            samples = shard["samples"][begin:(begin + count)]
+            with open(os.path.join(self.root, shard["file"]), "rb", buffering=(8 * 1024 * 1024)) as f:
+                f.seek(samples[0][0])
+                for offset, size, label in samples:
+                    if f.tell() != offset:
+                        f.seek(offset)
+                    yield f.read(size), label
+
+    def _iter_shuffled(self,
+                       raw_samples,
+                       rng):
+        """
+        Mix samples via a shuffle buffer.
+        """
+        buffer = []
+        for sample in raw_samples:
+            if len(buffer) < self.shuffle_buffer_size:
+                buffer.append(sample)
+                continue
+            k = rng.randrange(len(buffer))
+            yield buffer[k]
+            buffer[k] = sample
+        rng.shuffle(buffer)
+        for sample in buffer:
+            yield sample
+
+    def __iter__(self):
+        worker_info = get_worker_info()
+        if worker_info is None:
+            worker_id, num_workers = 0, 1
+        else:
+            worker_id, num_workers = worker_info.id, worker_info.num_workers
+        part = self._get_worker_parts(num_workers)[worker_id]
+        raw_samples = self._iter_raw_samples(part)
+        if self.shuffle:
+            rng = random.Random((self.seed + self.epoch) * 1000003 + self.rank * num_workers + worker_id)
+            raw_samples = self._iter_shuffled(raw_samples, rng)
+        loader = get_image_loader(self.transform)
+        for data, label in raw_samples:
+            if loader is read_image_bytes:
+                img = data
+            elif loader is open_image_lazy:
+                img = Image.open(io.BytesIO(data))
+            else:
+                img = Image.open(io.BytesIO(data)).convert("RGB")
+            if self.transform is not None:
+                img = self.transform(img)
+            yield img, label
+
+
+class ImageNet1KShardMetaInfo(ImageNet1KMetaInfo):
+    def __init__(self):
+        super(ImageNet1KShardMetaInfo, self).__init__()
+        self.label = "ImageNet1K_shard"
+        self.root_dir_name = "imagenet_shard"
+        self.dataset_class = ImageNet1KShards
+        self.num_training_samples = 1281167
+
+
+def convert_image_folder_to_shards(src_dir_path,
+                                   dst_dir_path,
+                                   split,
+                                   samples_per_shard=1024,
+                                   shuffle=True,
+                                   seed=0):
+    """
+    Pack an image folder dataset split (`<src_dir_path>/<split>/<class>/<image>`) into tar shards
+    (`<dst_dir_path>/<split>-NNNNN.tar`) with a JSON index (`<dst_dir_path>/<split>.json`). The index keeps the class
+    list, and for each shard its file name and the data offset, size, and label of each sample. The class indices are
+    the same as for `ImageNet1K`.
+
+    Parameters
+    ----------
+    src_dir_path : str
+        Path to the source dataset folder.
+    dst_dir_path : str
+        Path to the destination folder.
+    split : str
+        Split name ('train' or 'val').
+    samples_per_shard : int, default 1024
+        Number of samples in each shard.
+    shuffle : bool, default True
+        Whether to shuffle samples before packing (so that each shard contains mixed classes).
+    seed : int, default 0
+        Random seed for shuffling.
+
+    Returns
+    -------
+    str
+        Path to the index file.
+    """
+    src_split_dir_path = os.path.join(src_dir_path, split)
+    classes, class_to_idx = find_classes(src_split_dir_path)
+    samples = make_dataset(src_split_dir_path, class_to_idx, extensions=IMG_EXTENSIONS)
+    if shuffle:
+        random.Random(seed).shuffle(samples)
+    if not os.path.exists(dst_dir_path):
+        os.makedirs(dst_dir_path)
+
+    shards = []
+    num_shards = int(math.ceil(float(len(samples)) / samples_per_shard))
+    for i in range(num_shards):
+        shard_file_name = "{}-{:05d}.tar".format(split, i)
+        shard_samples = []
+        with tarfile.open(os.path.join(dst_dir_path, shard_file_name), "w", format=tarfile.USTAR_FORMAT) as tar:
+            for k, (img_file_path, label) in enumerate(samples[(i * samples_per_shard):((i + 1) * samples_per_shard)]):
+                tar_info = tarfile.TarInfo(name="{:08d}{}".format(i * samples_per_shard + k,
+                                                                  os.path.splitext(img_file_path)[1].lower()))
+                tar_info.size = os.path.getsize(img_file_path)
+                data_offset = tar.offset + len(tar_info.tobuf(tar.format, tar.encoding, tar.errors))
+                with open(img_file_path, "rb") as f:
+                    tar.addfile(tar_info, f)
+                shard_samples.append([data_offset, tar_info.size, label])
+        shards.append({"file": shard_file_name, "num_samples": len(shard_samples), "samples": shard_samples})
+
+    index_file_path = os.path.join(dst_dir_path, "{}.json".format(split))
+    tmp_index_file_path = index_file_path + ".tmp"
+    with open(tmp_index_file_path, "w") as f:
+        json.dump({"classes": classes, "shards": shards}, f)
+    os.replace(tmp_index_file_path, index_file_path)
+    return index_file_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pack ImageNet-1K image folders into shards (python -m pytorch.datasets.imagenet1k_shard_cls_dataset)",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--src-dir", type=str, required=True, help="path to dataset with train/val image folders")
+    parser.add_argument("--dst-dir", type=str, required=True, help="path to output directory")
+    parser.add_argument("--splits", type=str, nargs="+", default=("train", "val"), help="splits to convert")
+    parser.add_argument("--samples-per-shard", type=int, default=1024, help="number of samples in each shard")
+    args = parser.parse_args()
+    for split_name in args.splits:
+        print("Packed: {}".format(convert_image_folder_to_shards(
+            src_dir_path=args.src_dir,
+            dst_dir_path=args.dst_dir,
+            split=split_name,
+            samples_per_shard=args.samples_per_shard)))
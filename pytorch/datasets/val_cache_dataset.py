@@ -0,0 +1,251 @@
+"""
+    Persistent cache of preprocessed validation images (memory-mapped uint8 tensors).
+"""
+
+__all__ = ['ValCacheDataset', 'get_val_cache_dataset']
+
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import numpy as np
+import torch
+import torch.distributed as dist
+import torch.utils.data as data
+import torchvision.transforms as transforms
+
+
+class ValCacheDataset(data.Dataset):
+    """
+    Dataset of preprocessed images from a cache file (a memory-mapped array of uint8 CHW images and an array of
+    labels, see `get_val_cache_dataset`).
+
+    Parameters
+    ----------
+    images_file_path : str
+        Path to the image array file (.npy).
+    labels_file_path : str
+        Path to the label array file (.npy).
+    transform : function, default None
+        A function that takes a uint8 image tensor and transforms it.
+    """
+    def __init__(self,
+                 images_file_path,
+                 labels_file_path,
+                 transform=None):
+        super(ValCacheDataset, self).__init__()
+        self.images = np.load(images_file_path, mmap_mode="r")
+        self.labels = np.load(labels_file_path)
+        self.transform = transform
+
+    def __getitem__(self, index):
+        img = torch.from_numpy(np.array(self.images[index]))
+        if self.transform is not None:
+            img = self.transform(img)
+        return img, int(self.labels[index])
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def _calc_dataset_fingerprint(dataset):
+    """
+    Calculate a fingerprint of dataset content: file paths, sizes and modification times for file datasets (as
+    `ImageFolder` or `CUB200_2011`), or data hash for in-memory ones (as CIFAR).
+    """
+    sha1 = hashlib.sha1()
+    sha1.update(str(len(dataset)).encode())
+    if hasattr(dataset, "samples"):
+        file_paths = [path for path, _ in dataset.samples]
+        sha1.update(json.dumps(dataset.samples).encode())
+    elif hasattr(dataset, "image_file_names"):
+        file_paths = [os.path.join(dataset.images_dir_path, name) for name in dataset.image_file_names]
+        sha1.update(json.dumps(dataset.class_ids.tolist()).encode())
+    else:
+        file_paths = []
+        if hasattr(dataset, "data"):
+            sha1.update(np.ascontiguousarray(dataset.data).tobytes())
+        if hasattr(dataset, "targets"):
+            sha1.update(json.dumps(np.asarray(dataset.targets).tolist()).encode())
+    for path in file_paths:
+        stat = os.stat(path)
+        sha1.update("{}:{}:{}".format(path, stat.st_size, stat.st_mtime_ns).encode())
+    return sha1.hexdigest()
+
+
+def _get_cache_entries(cache_dir_path):
+    """
+    Get cache entries (key hash, size in bytes, last use time).
+    """
+    entries = []
+    for file_name in os.listdir(cache_dir_path):
+        if not file_name.endswith(".json"):
+            continue
+        key_hash = file_name[:-len(".json")]
+        file_paths = [os.path.join(cache_dir_path, key_hash + ext) for ext in (".json", ".images.npy", ".labels.npy")]
+        size = sum(os.path.getsize(p) for p in file_paths if os.path.exists(p))
+        entries.append((key_hash, size, os.path.getmtime(file_paths[0])))
+    return entries
+
+
+def _evict_cache_entries(cache_dir_path,
+                         required_size,
+                         max_size):
+    """
+    Remove least recently used cache entries, so that the required size fits into the cache size limit.
+    """
+    entries = sorted(_get_cache_entries(cache_dir_path), key=lambda x: x[2])
+    total_size = sum(size for _, size, _ in entries)
+    for key_hash, size, _ in entries:
+        if total_size + required_size <= max_size:
+            break
+        logging.info("Evicting validation cache entry: {}".format(key_hash))
+        for ext in (".json", ".images.npy", ".labels.npy"):
+            file_path = os.path.join(cache_dir_path, key_hash + ext)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        total_size -= size
+
+
+def _build_cache(dataset,
+                 cache_dir_path,
+                 key_hash,
+                 key,
+                 max_size,
+                 num_workers):
+    """
+    Preprocess all images of a dataset and write them into a cache entry (via temporary files and atomic renames).
+
+    Returns
+    -------
+    bool
+        Whether the entry is written (it isn't, if the data doesn't fit into the cache size limit).
+    """
+    data_loader = data.DataLoader(
+        dataset=dataset,
+        batch_size=64,
+        shuffle=False,
+        num_workers=num_workers)
+    images = None
+    labels = np.empty((len(dataset),), np.int64)
+    pos = 0
+    tic = time.time()
+    with tempfile.TemporaryDirectory(dir=cache_dir_path) as tmp_dir_path:
+        tmp_images_file_path = os.path.join(tmp_dir_path, "images.npy")
+        for batch_data, batch_labels in data_loader:
+            if batch_data.dtype != torch.uint8:
+                raise ValueError("Validation cache supports only uint8 images, but got {}".format(batch_data.dtype))
+            if images is None:
+                shape = (len(dataset),) + tuple(batch_data.shape[1:])
+                required_size = int(np.prod(shape)) + labels.nbytes
+                if required_size > max_size:
+                    logging.info("Validation cache entry doesn't fit into the size limit: {} > {} bytes".format(
+                        required_size, max_size))
+                    return False
+                _evict_cache_entries(cache_dir_path, required_size, max_size)
+                images = np.lib.format.open_memmap(tmp_images_file_path, mode="w+", dtype=np.uint8, shape=shape)
+            images[pos:(pos + len(batch_data))] = batch_data.numpy()
+            labels[pos:(pos + len(batch_data))] = batch_labels.numpy()
+            pos += len(batch_data)
+        assert (pos == len(dataset))
+        images.flush()
+        del images
+        np.save(os.path.join(tmp_dir_path, "labels.npy"), labels)
+        with open(os.path.join(tmp_dir_path, "meta.json"), "w") as f:
+            json.dump(key, f)
+        os.replace(tmp_images_file_path, os.path.join(cache_dir_path, key_hash + ".images.npy"))
+        os.replace(os.path.join(tmp_dir_path, "labels.npy"), os.path.join(cache_dir_path, key_hash + ".labels.npy"))
+        # The metadata file is written last, so that only complete entries are visible.
+        os.replace(os.path.join(tmp_dir_path, "meta.json"), os.path.join(cache_dir_path, key_hash + ".json"))
+    logging.info("Validation cache entry {} is built: {} images, {:.1f} sec".format(
+        key_hash, len(dataset), time.time() - tic))
+    return True
+
+
+def get_val_cache_dataset(ds_metainfo,
+                          mode="val",
+                          num_workers=0):
+    """
+    Get a validation dataset backed by the persistent cache of preprocessed images. Images are transformed into uint8
+    crops (the raw input mode of the dataset transforms) and stored in a memory-mapped array in
+    `ds_metainfo.val_cache_dir_path`. The cache entry key consists of the dataset class, root, split, content
+    fingerprint, and the transform description (with input size and other parameters), so a changed dataset or
+    transform gets a new entry. Least recently used entries are evicted to keep the cache size within
+    `ds_metainfo.val_cache_max_size` bytes. Returned images are normalized as usual, unless raw input is requested.
+
+    Parameters
+    ----------
+    ds_metainfo : DatasetMetaInfo
+        Dataset metainfo.
+    mode : str, default 'val'
+        'val' or 'test'.
+    num_workers : int, default 0
+        Number of workers for building the cache.
+
+    Returns
+    -------
+    Dataset or None
+        Cached dataset, or None if the dataset can't be cached.
+    """
+    if not hasattr(ds_metainfo, "raw_input"):
+        logging.info("Validation cache isn't supported for dataset {}".format(ds_metainfo.label))
+        return None
+    raw_metainfo = copy.copy(ds_metainfo)
+    raw_metainfo.raw_input = True
+    raw_transform = (raw_metainfo.val_transform if mode == "val" else raw_metainfo.test_transform)(
+        ds_metainfo=raw_metainfo)
+    kwargs = ds_metainfo.dataset_class_extra_kwargs if ds_metainfo.dataset_class_extra_kwargs is not None else {}
+    dataset = ds_metainfo.dataset_class(
+        root=ds_metainfo.root_dir_path,
+        mode=mode,
+        transform=raw_transform,
+        **kwargs)
+    if isinstance(dataset, data.IterableDataset):
+        logging.info("Validation cache isn't supported for iterable datasets")
+        return None
+
+    key = {
+        "dataset": "{}.{}".format(type(dataset).__module__, type(dataset).__name__),
+        "root": os.path.abspath(os.path.expanduser(ds_metainfo.root_dir_path)),
+        "mode": mode,
+        "fingerprint": _calc_dataset_fingerprint(dataset),
+        "transform": repr(raw_transform),
+    }
+    key_hash = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    cache_dir_path = os.path.expanduser(ds_metainfo.val_cache_dir_path)
+    if not os.path.exists(cache_dir_path):
+        os.makedirs(cache_dir_path, exist_ok=True)
+    meta_file_path = os.path.join(cache_dir_path, key_hash + ".json")
+
+    is_distributed = dist.is_available() and dist.is_initialized()
+    if (not os.path.exists(meta_file_path)) and ((not is_distributed) or (dist.get_rank() == 0)):
+        _build_cache(
+            dataset=dataset,
+            cache_dir_path=cache_dir_path,
+            key_hash=key_hash,
+            key=key,
+            max_size=int(ds_metainfo.val_cache_max_size),
+            num_workers=num_workers)
+    if is_distributed:
+        dist.barrier()
+    if not os.path.exists(meta_file_path):
+        return None
+
+    # The modification time of the metadata file is the last use time (for eviction).
+    os.utime(meta_file_path)
+    if ds_metainfo.raw_input:
+        transform = None
+    else:
+        transform = transforms.Compose([
+            transforms.ConvertImageDtype(torch.float32),
+            transforms.Normalize(
+                mean=ds_metainfo.mean_rgb,
+                std=ds_metainfo.std_rgb)
+        ])
+    return ValCacheDataset(
+        images_file_path=os.path.join(cache_dir_path, key_hash + ".images.npy"),
+        labels_file_path=os.path.join(cache_dir_path, key_hash + ".labels.npy"),
+        transform=transform)
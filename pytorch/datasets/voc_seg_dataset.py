@@ -125,19 +125,15 @@ class VOCMetaInfo(DatasetMetaInfo):
         self.train_metric_extra_kwargs = None
         self.val_metric_capts = None
         self.val_metric_names = None
-        self.test_metric_extra_kwargs = [{}, {}]
-        self.test_metric_capts = ["Val.PixAcc", "Val.IoU"]
-        self.test_metric_names = ["PixelAccuracyMetric", "MeanIoUMetric"]
+        self.test_metric_capts = ["Val.PixAcc", "Val.IoU", "Val.FwIoU"]
+        self.test_metric_names = ["ConfusionMatrixMetric"]
         self.test_metric_extra_kwargs = [
-            {"vague_idx": VOCSegDataset.vague_idx,
-             "use_vague": VOCSegDataset.use_vague,
-             "macro_average": False},
             {"num_classes": VOCSegDataset.classes,
              "vague_idx": VOCSegDataset.vague_idx,
              "use_vague": VOCSegDataset.use_vague,
              "bg_idx": VOCSegDataset.background_idx,
-             "ignore_bg": VOCSegDataset.ignore_bg,
-             "macro_average": False}]
+             "ignore_bg": VOCSegDataset.ignore_bg}]
+        # Index in the values of the metric (pix_acc, mean_iou, fw_iou): mean IoU, as with the former metric list.
         self.saver_acc_ind = 1
         self.train_transform = None
         self.val_transform = voc_test_transform
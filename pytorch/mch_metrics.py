@@ -0,0 +1,461 @@
+"""
+    Evaluation metrics for image matching (keypoint repeatability, descriptor matching, homography estimation),
+    calculated for many image pairs at once.
+"""
+
+__all__ = ['pad_point_lists', 'warp_keypoints', 'warp_row_col_keypoints', 'calc_nearest_neighbours', 'calc_repeatability',
+           'calc_mnn_matches', 'calc_homography_accuracy', 'calc_matching_metrics']
+
+import numpy as np
+import cv2
+import torch
+
+
+def pad_point_lists(tensor_list,
+                    value=0.0):
+    """
+    Pack tensors with different numbers of points into one padded tensor.
+
+    Parameters
+    ----------
+    tensor_list : list of torch.Tensor
+        Tensors with shapes (N_i, ...) or (N_i,).
+    value : float, default 0.0
+        Padding value.
+
+    Returns
+    -------
+    tuple of (torch.Tensor, torch.Tensor)
+        Padded tensor with shape (P, max N_i, ...) and mask of valid points with shape (P, max N_i).
+    """
+    counts = torch.tensor([len(x) for x in tensor_list], device=tensor_list[0].device)
+    padded = torch.nn.utils.rnn.pad_sequence(tensor_list, batch_first=True, padding_value=value)
+    mask = torch.arange(padded.size(1), device=padded.device).unsqueeze(0) < counts.unsqueeze(1)
+    return padded, mask
+
+
+def warp_keypoints(pts,
+                   homographies):
+    """
+    Warp keypoints by homographies.
+
+    Parameters
+    ----------
+    pts : torch.Tensor
+        Points (x, y) with shape (P, N, 2).
+    homographies : torch.Tensor
+        Homographies with shape (P, 3, 3).
+
+    Returns
+    -------
+    torch.Tensor
+        Warped points (x, y) with shape (P, N, 2).
+    """
+    hmg_pts = torch.cat([pts, torch.ones_like(pts[:, :, :1])], dim=2)
+    dst_hmg_pts = torch.bmm(hmg_pts, homographies.transpose(1, 2))
+    return dst_hmg_pts[:, :, :2] / dst_hmg_pts[:, :, 2:]
+
+
+def warp_row_col_keypoints(pts,
+                           homographies):
+    """
+    Warp detector keypoints, given as (row, col), by homographies acting on (x, y).
+
+    Parameters
+    ----------
+    pts : torch.Tensor
+        Points (row, col) with shape (P, N, 2).
+    homographies : torch.Tensor
+        Homographies with shape (P, 3, 3).
+
+    Returns
+    -------
+    torch.Tensor
+        Warped points (row, col) with shape (P, N, 2).
+    """
+    return warp_keypoints(pts[..., [1, 0]], homographies)[..., [1, 0]]
+
+
+def calc_filter_mask(pts,
+                     shapes):
+    """
+    Calculate the mask of points inside images.
+
+    Parameters
+    ----------
+    pts : torch.Tensor
+        Points with shape (P, N, 2).
+    shapes : torch.Tensor
+        Image shapes with shape (P, 2).
+
+    Returns
+    -------
+    torch.Tensor
+        Mask with shape (P, N).
+    """
+    shapes = shapes.unsqueeze(1).to(pts.dtype)
+    return ((pts >= 0) & (pts < shapes)).all(dim=2)
+
+
+def calc_nearest_neighbours(x,
+                            x_mask,
+                            y,
+                            y_mask,
+                            max_elements=(1 << 24)):
+    """
+    Find the nearest neighbours between two point sets in both directions (Euclidean distance). The distance matrix
+    is calculated once, by chunks of pairs (and of `x` points for large sets), so that memory is bounded for
+    thousands of points.
+
+    Parameters
+    ----------
+    x : torch.Tensor
+        First points with shape (P, N, D).
+    x_mask : torch.Tensor
+        Mask of valid first points with shape (P, N).
+    y : torch.Tensor
+        Second points with shape (P, M, D).
+    y_mask : torch.Tensor
+        Mask of valid second points with shape (P, M).
+    max_elements : int, default 2**24
+        Maximal number of elements in a distance matrix chunk.
+
+    Returns
+    -------
+    tuple of four torch.Tensor
+        Distances (inf if there are no valid points) and indices of the nearest neighbours in `y` for `x` points
+        (with shape (P, N)), and the same for `y` points in `x` (with shape (P, M)).
+    """
+    num_pairs, n, _ = x.size()
+    m = y.size(1)
+    xy_dists = x.new_full((num_pairs, n), float("inf"))
+    xy_inds = torch.zeros((num_pairs, n), dtype=torch.long, device=x.device)
+    yx_dists = y.new_full((num_pairs, m), float("inf"))
+    yx_inds = torch.zeros((num_pairs, m), dtype=torch.long, device=y.device)
+    if (n == 0) or (m == 0):
+        return xy_dists, xy_inds, yx_dists, yx_inds
+    if n * m <= max_elements:
+        pair_chunk_size, row_chunk_size = max(1, max_elements // (n * m)), n
+    else:
+        pair_chunk_size, row_chunk_size = 1, max(1, max_elements // m)
+    for p in range(0, num_pairs, pair_chunk_size):
+        ps = slice(p, p + pair_chunk_size)
+        y_invalid_mask = ~y_mask[ps].unsqueeze(1)
+        for i in range(0, n, row_chunk_size):
+            rs = slice(i, i + row_chunk_size)
+            dists = torch.cdist(x[ps, rs], y[ps])
+            dists.masked_fill_(y_invalid_mask, float("inf"))
+            xy_dists[ps, rs], xy_inds[ps, rs] = dists.min(dim=2)
+            dists.masked_fill_(~x_mask[ps, rs].unsqueeze(2), float("inf"))
+            chunk_dists, chunk_inds = dists.min(dim=1)
+            update_mask = (chunk_dists < yx_dists[ps])
+            yx_dists[ps] = torch.where(update_mask, chunk_dists, yx_dists[ps])
+            yx_inds[ps] = torch.where(update_mask, chunk_inds + i, yx_inds[ps])
+    return xy_dists, xy_inds, yx_dists, yx_inds
+
+
+def select_k_best(pts,
+                  confs,
+                  mask,
+                  max_count):
+    """
+    Select points with the best confidences.
+
+    Parameters
+    ----------
+    pts : torch.Tensor
+        Points with shape (P, N, 2).
+    confs : torch.Tensor
+        Confidences with shape (P, N).
+    mask : torch.Tensor
+        Mask of valid points with shape (P, N).
+    max_count : int
+        Maximal number of points.
+
+    Returns
+    -------
+    tuple of three torch.Tensor
+        Points, confidences, and mask of the selected points, in descending order of confidence.
+    """
+    k = min(max_count, confs.size(1))
+    confs = confs.masked_fill(~mask, float("-inf"))
+    best_confs, inds = confs.topk(k=k, dim=1, largest=True, sorted=True)
+    best_pts = torch.gather(pts, dim=1, index=inds.unsqueeze(2).expand(-1, -1, 2))
+    best_mask = (best_confs > float("-inf"))
+    return best_pts, best_confs.masked_fill(~best_mask, 0.0), best_mask
+
+
+def calc_repeatability(src_pts,
+                       src_confs,
+                       src_mask,
+                       dst_pts,
+                       dst_confs,
+                       dst_mask,
+                       homographies,
+                       src_shapes,
+                       dst_shapes,
+                       distance_thresh=3,
+                       max_count=300,
+                       max_elements=(1 << 24)):
+    """
+    Calculate the detector repeatability for image pairs (as in the SuperPoint evaluation: the distance includes the
+    confidence difference, and only the `max_count` best points in the shared view are used).
+
+    Parameters
+    ----------
+    src_pts : torch.Tensor
+        Points (row, col) in source images with shape (P, N, 2).
+    src_confs : torch.Tensor
+        Confidences of source points with shape (P, N).
+    src_mask : torch.Tensor
+        Mask of valid source points with shape (P, N).
+    dst_pts : torch.Tensor
+        Points (row, col) in destination images with shape (P, M, 2).
+    dst_confs : torch.Tensor
+        Confidences of destination points with shape (P, M).
+    dst_mask : torch.Tensor
+        Mask of valid destination points with shape (P, M).
+    homographies : torch.Tensor
+        Homographies from source to destination images with shape (P, 3, 3).
+    src_shapes : torch.Tensor
+        Source image shapes with shape (P, 2).
+    dst_shapes : torch.Tensor
+        Destination image shapes with shape (P, 2).
+    distance_thresh : float, default 3
+        Distance threshold for repeated points.
+    max_count : int, default 300
+        Maximal number of points in each image.
+    max_elements : int, default 2**24
+        Maximal number of elements in a distance matrix chunk.
+
+    Returns
+    -------
+    tuple of three torch.Tensor
+        Numbers of predicted points, numbers of label points, and repeatabilities (each with shape (P,)).
+    """
+    pred_src_pts = warp_row_col_keypoints(dst_pts, torch.inverse(homographies))
+    label_mask = dst_mask & calc_filter_mask(pred_src_pts, src_shapes)
+    label_pts, label_confs, label_mask = select_k_best(dst_pts, dst_confs, label_mask, max_count)
+
+    pred_dst_pts = warp_row_col_keypoints(src_pts, homographies)
+    pred_mask = src_mask & calc_filter_mask(pred_dst_pts, dst_shapes)
+    pred_pts, pred_confs, pred_mask = select_k_best(pred_dst_pts, src_confs, pred_mask, max_count)
+
+    label_pts = torch.cat([label_pts, label_confs.unsqueeze(2)], dim=2)
+    pred_pts = torch.cat([pred_pts, pred_confs.unsqueeze(2)], dim=2)
+
+    n_pred = pred_mask.sum(dim=1)
+    n_label = label_mask.sum(dim=1)
+    min1, _, min2, _ = calc_nearest_neighbours(pred_pts, pred_mask, label_pts, label_mask, max_elements)
+    count1 = ((min1 <= distance_thresh) & pred_mask).sum(dim=1)
+    count2 = ((min2 <= distance_thresh) & label_mask).sum(dim=1)
+    n_total = n_pred + n_label
+    repeatability = (count1 + count2).double() / n_total.clamp(min=1).double()
+    return n_pred, n_label, repeatability
+
+
+def calc_mnn_matches(src_descs,
+                     src_mask,
+                     dst_descs,
+                     dst_mask,
+                     max_elements=(1 << 24)):
+    """
+    Match descriptors by mutual nearest neighbours.
+
+    Parameters
+    ----------
+    src_descs : torch.Tensor
+        Source descriptors with shape (P, N, D).
+    src_mask : torch.Tensor
+        Mask of valid source descriptors with shape (P, N).
+    dst_descs : torch.Tensor
+        Destination descriptors with shape (P, M, D).
+    dst_mask : torch.Tensor
+        Mask of valid destination descriptors with shape (P, M).
+    max_elements : int, default 2**24
+        Maximal number of elements in a distance matrix chunk.
+
+    Returns
+    -------
+    tuple of (torch.Tensor, torch.Tensor)
+        Indices of matched destination points with shape (P, N) and mask of matched source points with shape (P, N).
+    """
+    _, nn12, _, nn21 = calc_nearest_neighbours(src_descs, src_mask, dst_descs, dst_mask, max_elements)
+    src_inds = torch.arange(src_descs.size(1), device=src_descs.device).unsqueeze(0)
+    if dst_descs.size(1) == 0:
+        return nn12, torch.zeros_like(src_mask)
+    match_mask = src_mask & (torch.gather(nn21, dim=1, index=nn12) == src_inds) & dst_mask.any(dim=1, keepdim=True)
+    return nn12, match_mask
+
+
+def calc_homography_accuracy(src_pts,
+                             matched_dst_pts,
+                             match_mask,
+                             homographies,
+                             src_shapes,
+                             correctness_thresh=3.0,
+                             ransac_thresh=3.0):
+    """
+    Estimate homographies from matches (via RANSAC) and check them by the mean error of the warped image corners.
+
+    Parameters
+    ----------
+    src_pts : torch.Tensor
+        Source points (row, col) with shape (P, N, 2).
+    matched_dst_pts : torch.Tensor
+        Matched destination points (row, col) with shape (P, N, 2).
+    match_mask : torch.Tensor
+        Mask of matches with shape (P, N).
+    homographies : torch.Tensor
+        Ground truth homographies with shape (P, 3, 3).
+    src_shapes : torch.Tensor
+        Source image shapes with shape (P, 2).
+    correctness_thresh : float, default 3.0
+        Corner error threshold for correct homographies.
+    ransac_thresh : float, default 3.0
+        RANSAC reprojection threshold.
+
+    Returns
+    -------
+    np.array
+        Flags of correct homographies with shape (P,).
+    """
+    num_pairs = src_pts.size(0)
+    src_pts_np = src_pts[..., [1, 0]].cpu().numpy()
+    matched_dst_pts_np = matched_dst_pts[..., [1, 0]].cpu().numpy()
+    match_mask_np = match_mask.cpu().numpy()
+    est_homographies = np.zeros((num_pairs, 3, 3))
+    est_mask = np.zeros((num_pairs,), np.bool_)
+    for i in range(num_pairs):
+        if match_mask_np[i].sum() < 4:
+            continue
+        est_homography, _ = cv2.findHomography(
+            src_pts_np[i][match_mask_np[i]],
+            matched_dst_pts_np[i][match_mask_np[i]],
+            cv2.RANSAC,
+            ransac_thresh)
+        if est_homography is not None:
+            est_homographies[i] = est_homography
+            est_mask[i] = True
+
+    shapes = src_shapes.to(torch.float64) - 1.0
+    zeros = torch.zeros_like(shapes[:, 0])
+    corners = torch.stack([
+        torch.stack([zeros, zeros], dim=1),
+        torch.stack([shapes[:, 1], zeros], dim=1),
+        torch.stack([zeros, shapes[:, 0]], dim=1),
+        shapes[:, [1, 0]]], dim=1)
+    est_homographies = torch.from_numpy(est_homographies).to(corners.device)
+    est_homographies[~torch.from_numpy(est_mask).to(corners.device)] = torch.eye(3, dtype=torch.float64,
+                                                                                 device=corners.device)
+    gt_corners = warp_keypoints(corners, homographies.to(torch.float64))
+    est_corners = warp_keypoints(corners, est_homographies)
+    errors = (gt_corners - est_corners).norm(dim=2).mean(dim=1).cpu().numpy()
+    return est_mask & (errors <= correctness_thresh)
+
+
+def calc_matching_metrics(src_pts_list,
+                          src_confs_list,
+                          src_descs_list,
+                          dst_pts_list,
+                          dst_confs_list,
+                          dst_descs_list,
+                          homographies,
+                          src_shapes,
+                          dst_shapes,
+                          distance_thresh=3,
+                          max_count=300,
+                          calc_homography=True,
+                          max_elements=(1 << 24)):
+    """
+    Calculate repeatability, mutual nearest neighbour matching, and homography estimation metrics for image pairs.
+
+    Parameters
+    ----------
+    src_pts_list : list of torch.Tensor
+        Points (row, col) in source images (each with shape (N_i, 2)).
+    src_confs_list : list of torch.Tensor
+        Confidences of source points.
+    src_descs_list : list of torch.Tensor
+        Descriptors of source points (each with shape (N_i, D)).
+    dst_pts_list : list of torch.Tensor
+        Points in destination images.
+    dst_confs_list : list of torch.Tensor
+        Confidences of destination points.
+    dst_descs_list : list of torch.Tensor
+        Descriptors of destination points.
+    homographies : list of np.array
+        Homographies from source to destination images (acting on (x, y) points).
+    src_shapes : list of tuple of (int, int)
+        Source image shapes (height, width).
+    dst_shapes : list of tuple of (int, int)
+        Destination image shapes (height, width).
+    distance_thresh : float, default 3
+        Distance threshold for repeated points and correct matches.
+    max_count : int, default 300
+        Maximal number of points in each image for repeatability.
+    calc_homography : bool, default True
+        Whether to estimate homographies.
+    max_elements : int, default 2**24
+        Maximal number of elements in a distance matrix chunk.
+
+    Returns
+    -------
+    dict of str -> np.array
+        Metric values for each pair: `n_pred` and `n_label` (numbers of points for repeatability), `repeatability`,
+        `num_matches`, `matching_precision` (ratio of correct matches), `matching_score` (ratio of correct matches to
+        source points in the shared view), and `homography_accuracy` (flags of correct estimations).
+    """
+    device = src_pts_list[0].device
+    src_pts, src_mask = pad_point_lists([x.to(torch.float64) for x in src_pts_list])
+    dst_pts, dst_mask = pad_point_lists([x.to(torch.float64) for x in dst_pts_list])
+    src_confs, _ = pad_point_lists([x.to(torch.float64) for x in src_confs_list])
+    dst_confs, _ = pad_point_lists([x.to(torch.float64) for x in dst_confs_list])
+    homographies = torch.from_numpy(np.stack(homographies)).to(device=device, dtype=torch.float64)
+    src_shapes = torch.tensor(src_shapes, device=device)
+    dst_shapes = torch.tensor(dst_shapes, device=device)
+
+    n_pred, n_label, repeatability = calc_repeatability(
+        src_pts=src_pts,
+        src_confs=src_confs,
+        src_mask=src_mask,
+        dst_pts=dst_pts,
+        dst_confs=dst_confs,
+        dst_mask=dst_mask,
+        homographies=homographies,
+        src_shapes=src_shapes,
+        dst_shapes=dst_shapes,
+        distance_thresh=distance_thresh,
+        max_count=max_count,
+        max_elements=max_elements)
+    metrics = {
+        "n_pred": n_pred.cpu().numpy(),
+        "n_label": n_label.cpu().numpy(),
+        "repeatability": repeatability.cpu().numpy()}
+
+    if src_descs_list is not None:
+        src_descs, _ = pad_point_lists(src_descs_list)
+        dst_descs, _ = pad_point_lists(dst_descs_list)
+        nn12, match_mask = calc_mnn_matches(src_descs, src_mask, dst_descs, dst_mask, max_elements)
+        if dst_pts.size(1) > 0:
+            matched_dst_pts = torch.gather(dst_pts, dim=1, index=nn12.unsqueeze(2).expand(-1, -1, 2))
+        else:
+            matched_dst_pts = torch.zeros_like(src_pts)
+        warped_src_pts = warp_row_col_keypoints(src_pts, homographies)
+        correct_mask = match_mask & ((warped_src_pts - matched_dst_pts).norm(dim=2) <= distance_thresh)
+        shared_mask = src_mask & calc_filter_mask(warped_src_pts, dst_shapes)
+        num_matches = match_mask.sum(dim=1)
+        num_correct = correct_mask.sum(dim=1)
+        metrics["num_matches"] = num_matches.cpu().numpy()
+        metrics["matching_precision"] = (num_correct.double() / num_matches.clamp(min=1).double()).cpu().numpy()
+        metrics["matching_score"] = (num_correct.double() / shared_mask.sum(dim=1).clamp(min=1).double()).cpu().numpy()
+        if calc_homography:
+            metrics["homography_accuracy"] = calc_homography_accuracy(
+                src_pts=src_pts,
+                matched_dst_pts=matched_dst_pts,
+                match_mask=match_mask,
+                homographies=homographies,
+                src_shapes=src_shapes,
+                correctness_thresh=distance_thresh)
+
+    return metrics
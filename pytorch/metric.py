@@ -4,7 +4,9 @@
 
 __all__ = ['EvalMetric', 'CompositeEvalMetric', 'check_label_shapes']
 
+import copy
 from collections import OrderedDict
+import torch
 
 
 def check_label_shapes(labels, preds, shape=False):
@@ -44,6 +46,9 @@ class EvalMetric(object):
         Name of labels that should be used when updating with update_dict.
         By default include all labels.
     """
+    # Names of accumulator attributes, which form the mergeable state of a metric (missing ones are skipped).
+    state_attr_names = ("num_inst", "sum_metric", "global_num_inst", "global_sum_metric")
+
     def __init__(self,
                  name,
                  output_names=None,
@@ -124,6 +129,69 @@ class EvalMetric(object):
         self.num_inst = 0
         self.sum_metric = 0.0
 
+    def get_state(self):
+        """
+        Gets the internal evaluation state (accumulator values). The state can be pickled, sent to another process, and
+        merged into a metric with the same configuration.
+
+        Returns
+        -------
+        dict
+            Accumulator values (numbers, numpy arrays, or CPU tensors) by attribute names.
+        """
+        state = {}
+        for attr_name in self.state_attr_names:
+            if not hasattr(self, attr_name):
+                continue
+            value = getattr(self, attr_name)
+            if isinstance(value, torch.Tensor):
+                value = value.detach().cpu().clone()
+            else:
+                value = copy.deepcopy(value)
+            state[attr_name] = value
+        return state
+
+    def set_state(self, state):
+        """
+        Sets the internal evaluation state (see `get_state`).
+
+        Parameters
+        ----------
+        state : dict
+            Accumulator values by attribute names.
+        """
+        for attr_name, value in state.items():
+            setattr(self, attr_name, copy.deepcopy(value))
+
+    def merge(self, other):
+        """
+        Merges the internal evaluation state of another metric into this one, as if this metric was also updated with
+        the data of the other one.
+
+        Parameters
+        ----------
+        other : EvalMetric or dict
+            Metric with the same configuration, or its state (see `get_state`).
+
+        Returns
+        -------
+        EvalMetric
+            This metric.
+        """
+        other_state = other.get_state() if isinstance(other, EvalMetric) else other
+        for attr_name, other_value in other_state.items():
+            value = getattr(self, attr_name, None)
+            if other_value is None:
+                continue
+            if value is None:
+                value = copy.deepcopy(other_value)
+            elif isinstance(value, torch.Tensor):
+                value += torch.as_tensor(other_value).to(device=value.device, dtype=value.dtype)
+            else:
+                value = value + other_value
+            setattr(self, attr_name, value)
+        return self
+
     def get(self):
         """
         Gets the current evaluation result.
@@ -138,7 +206,7 @@ class EvalMetric(object):
         if self.num_inst == 0:
             return self.name, float("nan")
         else:
-            return self.name, self.sum_metric / self.num_inst
+            return self.name, float(self.sum_metric) / self.num_inst
 
     def get_global(self):
         """
@@ -155,7 +223,7 @@ class EvalMetric(object):
             if self.global_num_inst == 0:
                 return self.name, float("nan")
             else:
-                return self.name, self.global_sum_metric / self.global_num_inst
+                return self.name, float(self.global_sum_metric) / self.global_num_inst
         else:
             return self.get()
 
@@ -279,6 +347,50 @@ class CompositeEvalMetric(EvalMetric):
         except AttributeError:
             pass
 
+    def get_state(self):
+        """
+        Gets the internal evaluation states of the child metrics.
+
+        Returns
+        -------
+        dict
+            States of the child metrics (in the `metrics` list).
+        """
+        return {"metrics": [metric.get_state() for metric in self.metrics]}
+
+    def set_state(self, state):
+        """
+        Sets the internal evaluation states of the child metrics (see `get_state`).
+
+        Parameters
+        ----------
+        state : dict
+            States of the child metrics.
+        """
+        assert (len(state["metrics"]) == len(self.metrics))
+        for metric, metric_state in zip(self.metrics, state["metrics"]):
+            metric.set_state(metric_state)
+
+    def merge(self, other):
+        """
+        Merges the internal evaluation states of the child metrics of another composite metric into this one.
+
+        Parameters
+        ----------
+        other : CompositeEvalMetric or dict
+            Composite metric with the same child metrics, or its state (see `get_state`).
+
+        Returns
+        -------
+        CompositeEvalMetric
+            This metric.
+        """
+        other_state = other.get_state() if isinstance(other, EvalMetric) else other
+        assert (len(other_state["metrics"]) == len(self.metrics))
+        for metric, metric_state in zip(self.metrics, other_state["metrics"]):
+            metric.merge(metric_state)
+        return self
+
     def get(self):
         """
         Returns the current evaluation result.
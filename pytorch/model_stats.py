@@ -1,15 +1,18 @@
+import copy
+import time
 import logging
+import weakref
 import numpy as np
 import torch
 import torch.nn as nn
-from torch.autograd import Variable
-from .pytorchcv.models.common import ChannelShuffle, ChannelShuffle2, Identity, Flatten, Swish
+from .pytorchcv.models.common import ChannelShuffle, ChannelShuffle2, Identity, Flatten, Swish, HSigmoid, HSwish
 from .pytorchcv.models.fishnet import InterpolationBlock, ChannelSqueeze
 from .pytorchcv.models.irevnet import IRevDownscale, IRevSplitBlock, IRevMergeBlock
 from .pytorchcv.models.rir_cifar import RiRFinalBlock
 from .pytorchcv.models.proxylessnas import ProxylessUnit
+from common.layer_profile import create_layer_profile
 
-__all__ = ['measure_model']
+__all__ = ['measure_model', 'profile_model', 'register_flops_handler']
 
 
 def calc_block_num_params2(net):
@@ -30,20 +33,183 @@ def calc_block_num_params(module):
     return weight_count
 
 
+_flops_handlers = {}
+
+
+def register_flops_handler(*module_types,
+                           multi_input=False):
+    """
+    Decorator that registers a FLOPs/MACs counting function for leaf module types. The function takes the module, its
+    inputs and output, and returns the numbers of FLOPs and MACs. A handler of a base type is used for subclasses,
+    unless they have own handlers. Models with custom leaf modules can register handlers for them.
+
+    Parameters:
+    ----------
+    module_types : tuple of types
+        Leaf module types.
+    multi_input : bool, default False
+        Whether the modules take several inputs.
+    """
+    def decorator(handler):
+        for module_type in module_types:
+            _flops_handlers[module_type] = (handler, multi_input)
+        return handler
+    return decorator
+
+
+def get_flops_handler(module):
+    """
+    Get the registered FLOPs/MACs counting function for a module (by the nearest type in the class hierarchy).
+
+    Parameters:
+    ----------
+    module : nn.Module
+        Leaf module.
+
+    Returns
+    -------
+    tuple or None
+        (handler, multi_input), or None for unknown modules.
+    """
+    for module_type in type(module).__mro__:
+        if module_type in _flops_handlers:
+            return _flops_handlers[module_type]
+    return None
+
+
+def elementwise_flops_handler(flops_per_element):
+    """
+    Create a counting function for element-wise modules (a number of FLOPs per input element, no MACs).
+    """
+    def handler(module, x, y):
+        return flops_per_element * x[0].numel(), 0
+    return handler
+
+
+register_flops_handler(nn.Dropout, nn.Sequential, nn.ZeroPad2d, Identity, Flatten)(elementwise_flops_handler(0))
+register_flops_handler(nn.ReLU, nn.ReLU6, ChannelShuffle, ChannelShuffle2, InterpolationBlock, ChannelSqueeze,
+                       ProxylessUnit)(elementwise_flops_handler(1))
+register_flops_handler(IRevSplitBlock, IRevMergeBlock, RiRFinalBlock, multi_input=True)(elementwise_flops_handler(1))
+register_flops_handler(nn.LeakyReLU)(elementwise_flops_handler(2))
+register_flops_handler(nn.PReLU, HSigmoid, nn.Hardsigmoid)(elementwise_flops_handler(3))
+register_flops_handler(nn.Sigmoid, nn.BatchNorm2d, nn.InstanceNorm2d, nn.BatchNorm1d, HSwish,
+                       nn.Hardswish)(elementwise_flops_handler(4))
+register_flops_handler(Swish, nn.SiLU, IRevDownscale)(elementwise_flops_handler(5))
+
+
+@register_flops_handler(nn.Linear)
+def calc_linear_flops(module, x, y):
+    batch = x[0].shape[0]
+    in_units = module.in_features
+    out_units = module.out_features
+    num_macs = in_units * out_units
+    if module.bias is None:
+        num_flops = (2 * in_units - 1) * out_units
+    else:
+        num_flops = 2 * in_units * out_units
+    return num_flops * batch, num_macs * batch
+
+
+@register_flops_handler(nn.Conv2d)
+def calc_conv2d_flops(module, x, y):
+    batch = x[0].shape[0]
+    x_h = x[0].shape[2]
+    x_w = x[0].shape[3]
+    kernel_size = module.kernel_size
+    stride = module.stride
+    dilation = module.dilation
+    padding = module.padding
+    groups = module.groups
+    in_channels = module.in_channels
+    out_channels = module.out_channels
+    y_h = (x_h + 2 * padding[0] - dilation[0] * (kernel_size[0] - 1) - 1) // stride[0] + 1
+    y_w = (x_w + 2 * padding[1] - dilation[1] * (kernel_size[1] - 1) - 1) // stride[1] + 1
+    assert (out_channels == y.shape[1])
+    assert (y_h == y.shape[2])
+    assert (y_w == y.shape[3])
+    kernel_total_size = kernel_size[0] * kernel_size[1]
+    y_size = y_h * y_w
+    num_macs = kernel_total_size * in_channels * y_size * out_channels // groups
+    if module.bias is None:
+        num_flops = (2 * kernel_total_size * y_size - 1) * in_channels * out_channels // groups
+    else:
+        num_flops = 2 * kernel_total_size * in_channels * y_size * out_channels // groups
+    return num_flops * batch, num_macs * batch
+
+
+@register_flops_handler(nn.MaxPool2d, nn.AvgPool2d)
+def calc_pool2d_flops(module, x, y):
+    assert (x[0].shape[1] == y.shape[1])
+    batch = x[0].shape[0]
+    kernel_size = module.kernel_size if isinstance(module.kernel_size, tuple) else\
+        (module.kernel_size, module.kernel_size)
+    y_h = y.shape[2]
+    y_w = y.shape[3]
+    channels = x[0].shape[1]
+    y_size = y_h * y_w
+    pool_total_size = kernel_size[0] * kernel_size[1]
+    return channels * y_size * pool_total_size * batch, 0
+
+
+@register_flops_handler(nn.AdaptiveAvgPool2d, nn.AdaptiveMaxPool2d)
+def calc_adaptive_pool2d_flops(module, x, y):
+    assert (x[0].shape[1] == y.shape[1])
+    batch = x[0].shape[0]
+    x_h = x[0].shape[2]
+    x_w = x[0].shape[3]
+    y_h = y.shape[2]
+    y_w = y.shape[3]
+    channels = x[0].shape[1]
+    y_size = y_h * y_w
+    pool_total_size = x_h * x_w
+    return channels * y_size * pool_total_size * batch, 0
+
+
+def get_meta_model(model):
+    """
+    Get a copy of a model on the meta device (parameters and buffers have shapes, but no data).
+
+    Parameters:
+    ----------
+    model : nn.Module
+        Model.
+
+    Returns
+    -------
+    nn.Module
+        Model copy.
+    """
+    memo = {}
+    for param in model.parameters():
+        memo[id(param)] = nn.Parameter(param.to("meta"), requires_grad=param.requires_grad)
+    for buffer in model.buffers():
+        memo[id(buffer)] = buffer.to("meta")
+    return copy.deepcopy(model, memo)
+
+
 def measure_model(model,
                   in_channels,
-                  in_size):
+                  in_size,
+                  use_meta=False,
+                  strict=True):
     """
     Calculate model statistics.
 
     Parameters:
     ----------
-    model : HybridBlock
+    model : nn.Module
         Tested model.
     in_channels : int
         Number of input channels.
     in_size : tuple of two ints
         Spatial size of the expected input image.
+    use_meta : bool, default False
+        Whether to count from shapes only, running the model on the meta device (no activations are allocated). A
+        model on another device is copied to the meta device without its data. Models with data-dependent control flow
+        can't be run this way.
+    strict : bool, default True
+        Whether to raise an error for a leaf module without a registered handler (otherwise it's counted as zero with
+        a warning).
     """
     global num_flops
     global num_macs
@@ -53,145 +219,21 @@ def measure_model(model,
     num_macs = 0
     num_params = 0
     # names = {}
+    unknown_types = set()
 
     def call_hook(module, x, y):
-        if not (isinstance(module, IRevSplitBlock) or isinstance(module, IRevMergeBlock) or
-                isinstance(module, RiRFinalBlock)):
-            assert (len(x) == 1)
         assert (len(module._modules) == 0)
-        if isinstance(module, nn.Linear):
-            batch = x[0].shape[0]
-            in_units = module.in_features
-            out_units = module.out_features
-            extra_num_macs = in_units * out_units
-            if module.bias is None:
-                extra_num_flops = (2 * in_units - 1) * out_units
-            else:
-                extra_num_flops = 2 * in_units * out_units
-            extra_num_flops *= batch
-            extra_num_macs *= batch
-        elif isinstance(module, nn.ReLU):
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, nn.Sigmoid):
-            extra_num_flops = 4 * x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, nn.LeakyReLU):
-            extra_num_flops = 2 * x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, nn.ReLU6):
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, nn.PReLU):
-            extra_num_flops = 3 * x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, Swish):
-            extra_num_flops = 5 * x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, nn.Conv2d):
-            batch = x[0].shape[0]
-            x_h = x[0].shape[2]
-            x_w = x[0].shape[3]
-            kernel_size = module.kernel_size
-            stride = module.stride
-            dilation = module.dilation
-            padding = module.padding
-            groups = module.groups
-            in_channels = module.in_channels
-            out_channels = module.out_channels
-            y_h = (x_h + 2 * padding[0] - dilation[0] * (kernel_size[0] - 1) - 1) // stride[0] + 1
-            y_w = (x_w + 2 * padding[1] - dilation[1] * (kernel_size[1] - 1) - 1) // stride[1] + 1
-            assert (out_channels == y.shape[1])
-            assert (y_h == y.shape[2])
-            assert (y_w == y.shape[3])
-            kernel_total_size = kernel_size[0] * kernel_size[1]
-            y_size = y_h * y_w
-            extra_num_macs = kernel_total_size * in_channels * y_size * out_channels // groups
-            if module.bias is None:
-                extra_num_flops = (2 * kernel_total_size * y_size - 1) * in_channels * out_channels // groups
-            else:
-                extra_num_flops = 2 * kernel_total_size * in_channels * y_size * out_channels // groups
-            extra_num_flops *= batch
-            extra_num_macs *= batch
-        elif isinstance(module, nn.BatchNorm2d):
-            extra_num_flops = 4 * x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, nn.InstanceNorm2d):
-            extra_num_flops = 4 * x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, nn.BatchNorm1d):
-            extra_num_flops = 4 * x[0].numel()
-            extra_num_macs = 0
-        elif type(module) in [nn.MaxPool2d, nn.AvgPool2d]:
-            assert (x[0].shape[1] == y.shape[1])
-            batch = x[0].shape[0]
-            kernel_size = module.kernel_size if isinstance(module.kernel_size, tuple) else\
-                (module.kernel_size, module.kernel_size)
-            y_h = y.shape[2]
-            y_w = y.shape[3]
-            channels = x[0].shape[1]
-            y_size = y_h * y_w
-            pool_total_size = kernel_size[0] * kernel_size[1]
-            extra_num_flops = channels * y_size * pool_total_size
-            extra_num_macs = 0
-            extra_num_flops *= batch
-            extra_num_macs *= batch
-        elif type(module) in [nn.AdaptiveAvgPool2d, nn.AdaptiveMaxPool2d]:
-            assert (x[0].shape[1] == y.shape[1])
-            batch = x[0].shape[0]
-            x_h = x[0].shape[2]
-            x_w = x[0].shape[3]
-            y_h = y.shape[2]
-            y_w = y.shape[3]
-            channels = x[0].shape[1]
-            y_size = y_h * y_w
-            pool_total_size = x_h * x_w
-            extra_num_flops = channels * y_size * pool_total_size
-            extra_num_macs = 0
-            extra_num_flops *= batch
-            extra_num_macs *= batch
-        elif isinstance(module, nn.Dropout):
-            extra_num_flops = 0
-            extra_num_macs = 0
-        elif isinstance(module, nn.Sequential):
-            assert (len(module._modules) == 0)
-            extra_num_flops = 0
-            extra_num_macs = 0
-        elif type(module) in [ChannelShuffle, ChannelShuffle2]:
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, nn.ZeroPad2d):
-            extra_num_flops = 0
-            extra_num_macs = 0
-        elif isinstance(module, Identity):
-            extra_num_flops = 0
-            extra_num_macs = 0
-        elif isinstance(module, Flatten):
-            extra_num_flops = 0
-            extra_num_macs = 0
-        elif isinstance(module, InterpolationBlock):
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, ChannelSqueeze):
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, IRevDownscale):
-            extra_num_flops = 5 * x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, IRevSplitBlock):
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, IRevMergeBlock):
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, RiRFinalBlock):
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
-        elif isinstance(module, ProxylessUnit):
-            extra_num_flops = x[0].numel()
-            extra_num_macs = 0
+        flops_handler = get_flops_handler(module)
+        if flops_handler is None:
+            if strict:
+                raise TypeError("Unknown layer type: {}".format(type(module)))
+            unknown_types.add(type(module).__name__)
+            extra_num_flops, extra_num_macs = 0, 0
         else:
-            raise TypeError("Unknown layer type: {}".format(type(module)))
+            handler, multi_input = flops_handler
+            if not multi_input:
+                assert (len(x) == 1)
+            extra_num_flops, extra_num_macs = handler(module, x, y)
 
         global num_flops
         global num_macs
@@ -216,18 +258,232 @@ def measure_model(model,
             handle = a_module.register_forward_hook(call_hook)
             return [handle]
 
+    device = None
+    if use_meta:
+        if any(not p.is_meta for p in model.parameters()):
+            model = get_meta_model(model)
+        device = "meta"
+
     hook_handles = register_forward_hooks(model)
 
-    x = Variable(torch.zeros(1, in_channels, in_size[0], in_size[1]))
+    x = torch.zeros(1, in_channels, in_size[0], in_size[1], device=device)
     model.eval()
-    model(x)
+    try:
+        with torch.no_grad():
+            model(x)
+    finally:
+        [h.remove() for h in hook_handles]
 
     num_params1 = calc_block_num_params2(model)
     if num_params != num_params1:
         logging.warning(
             "Calculated numbers of parameters are different: standard method: {},\tper-leaf method: {}".format(
                 num_params1, num_params))
-
-    [h.remove() for h in hook_handles]
+    if unknown_types:
+        logging.warning("FLOPs of unknown layer types are not counted: {}".format(", ".join(sorted(unknown_types))))
 
     return num_flops, num_macs, num_params1
+
+
+def get_named_leaf_modules(module,
+                           prefix="",
+                           parent=None):
+    """
+    Get leaf modules with their dotted names and parent modules.
+
+    Parameters:
+    ----------
+    module : nn.Module
+        Module.
+    prefix : str, default ''
+        Name of the module.
+    parent : nn.Module or None, default None
+        Parent of the module.
+
+    Returns
+    -------
+    list of tuple
+        (name, module, parent) for each leaf module.
+    """
+    if len(module._modules) == 0:
+        return [(prefix, module, parent)]
+    leaf_modules = []
+    for child_name, child_module in module._modules.items():
+        if child_module is not None:
+            leaf_modules += get_named_leaf_modules(
+                child_module, prefix + "." + child_name if prefix else child_name, module)
+    return leaf_modules
+
+
+def get_module_type_name(module):
+    """
+    Get the type name of a module, with depthwise and grouped convolutions marked.
+    """
+    type_name = type(module).__name__
+    if isinstance(module, nn.Conv2d) and (module.groups > 1):
+        type_name += "(depthwise)" if module.groups == module.in_channels else "(grouped)"
+    return type_name
+
+
+def get_tensors(data):
+    """
+    Get all tensors from a tensor or a nested tuple/list of tensors.
+    """
+    if isinstance(data, torch.Tensor):
+        return [data]
+    if isinstance(data, (tuple, list)):
+        return [t for d in data for t in get_tensors(d)]
+    return []
+
+
+class LiveActivationTracker(object):
+    """
+    Tracker of the total size of live activations. Tensors sharing a storage (views, in-place results) are counted
+    once, and a storage is counted until all tracked tensors of it are freed. Tensors created outside of leaf modules
+    (e.g. sums of residual branches) are not tracked, so the result is an estimate from below.
+    """
+    def __init__(self):
+        super(LiveActivationTracker, self).__init__()
+        self.storage_refs = {}
+        self.live_bytes = 0
+        self.peak_bytes = 0
+        self.peak_name = ""
+
+    def _release(self, key):
+        count, num_bytes = self.storage_refs[key]
+        if count == 1:
+            del self.storage_refs[key]
+            self.live_bytes -= num_bytes
+        else:
+            self.storage_refs[key] = (count - 1, num_bytes)
+
+    def add(self, tensor):
+        """
+        Start tracking a tensor.
+
+        Parameters:
+        ----------
+        tensor : Tensor
+            Activation tensor.
+        """
+        storage = tensor.untyped_storage()
+        key = storage.data_ptr()
+        count, num_bytes = self.storage_refs.get(key, (0, storage.nbytes()))
+        if count == 0:
+            self.live_bytes += num_bytes
+        self.storage_refs[key] = (count + 1, num_bytes)
+        weakref.finalize(tensor, self._release, key)
+
+    def update_peak(self, name):
+        """
+        Update the peak size of live activations.
+
+        Parameters:
+        ----------
+        name : str
+            Name of the current layer.
+        """
+        if self.live_bytes > self.peak_bytes:
+            self.peak_bytes = self.live_bytes
+            self.peak_name = name
+
+
+def profile_model(model,
+                  in_channels,
+                  in_size,
+                  batch_size=1,
+                  num_runs=5,
+                  stage_depth=2):
+    """
+    Profile model layers: wall time and output activation size of each leaf module, and the peak of live activations.
+    Results are aggregated by module type and by stage (see `create_layer_profile`).
+
+    Parameters:
+    ----------
+    model : nn.Module
+        Tested model.
+    in_channels : int
+        Number of input channels.
+    in_size : tuple of two ints
+        Spatial size of the expected input image.
+    batch_size : int, default 1
+        Batch size.
+    num_runs : int, default 5
+        Number of timed forward passes (after a warm-up pass, which measures activations).
+    stage_depth : int, default 2
+        Number of name components in the stage name.
+
+    Returns
+    -------
+    dict
+        Model profile.
+    """
+    param = next(model.parameters(), None)
+    device = param.device if param is not None else torch.device("cpu")
+    sync_fn = torch.cuda.synchronize if device.type == "cuda" else (lambda: None)
+
+    layers = {}
+    executed_names = []
+    start_times = {}
+    tracker = None
+
+    def pre_hook(name, module, x):
+        sync_fn()
+        start_times[name] = time.perf_counter()
+
+    def hook(name, module, x, y):
+        sync_fn()
+        layer = layers[name]
+        layer["time"] += time.perf_counter() - start_times[name]
+        if tracker is not None:
+            if layer["calls"] == 0:
+                executed_names.append(name)
+            layer["calls"] += 1
+            for t in get_tensors(y):
+                layer["activation_bytes"] += t.numel() * t.element_size()
+                tracker.add(t)
+            tracker.update_peak(name)
+
+    hook_handles = []
+    for name, module, parent in get_named_leaf_modules(model):
+        layers[name] = {
+            "name": name,
+            "type": get_module_type_name(module),
+            "block": type(parent).__name__ if parent is not None else "",
+            "calls": 0,
+            "time": 0.0,
+            "activation_bytes": 0,
+            "params": int(calc_block_num_params(module))}
+        hook_handles.append(module.register_forward_pre_hook(lambda m, x, name=name: pre_hook(name, m, x)))
+        hook_handles.append(module.register_forward_hook(lambda m, x, y, name=name: hook(name, m, x, y)))
+
+    model.eval()
+    with torch.no_grad():
+        x = torch.zeros(batch_size, in_channels, in_size[0], in_size[1], device=device)
+        tracker = LiveActivationTracker()
+        tracker.add(x)
+        model(x)
+        peak_bytes, peak_name = tracker.peak_bytes, tracker.peak_name
+        tracker = None
+        for layer in layers.values():
+            layer["time"] = 0.0
+        for _ in range(num_runs):
+            model(x)
+        [h.remove() for h in hook_handles]
+
+        sync_fn()
+        tic = time.perf_counter()
+        for _ in range(num_runs):
+            model(x)
+        sync_fn()
+        model_time = (time.perf_counter() - tic) / num_runs
+
+    layers = [layers[name] for name in executed_names]
+    for layer in layers:
+        layer["time"] /= num_runs
+    return create_layer_profile(
+        layers=layers,
+        model_time=model_time,
+        peak_activation_bytes=peak_bytes,
+        peak_activation_layer=peak_name,
+        stage_depth=stage_depth)
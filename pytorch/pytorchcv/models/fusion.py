@@ -0,0 +1,389 @@
+"""
+    Inference-time fusion of Batch normalization into convolutions for models in PyTorch.
+"""
+
+__all__ = ['fuse_conv_bn', 'fuse_bn_conv', 'fuse_for_inference', 'RawInputNet']
+
+import copy
+import torch
+import torch.nn as nn
+from torch.nn.modules.dropout import _DropoutNd
+from .common import Identity, PreConvBlock
+
+
+def _get_bn_scale_shift(bn):
+    """
+    Get per-channel scale and shift of Batch normalization in inference mode.
+
+    Parameters:
+    ----------
+    bn : nn.BatchNorm2d
+        Batch normalization layer.
+
+    Returns:
+    -------
+    tuple of two Tensors
+        Scale and shift.
+    """
+    scale = torch.rsqrt(bn.running_var + bn.eps)
+    shift = -bn.running_mean * scale
+    if bn.affine:
+        scale = scale * bn.weight
+        shift = shift * bn.weight + bn.bias
+    return scale, shift
+
+
+def _set_conv_bias(conv, bias):
+    if conv.bias is None:
+        conv.bias = nn.Parameter(bias)
+    else:
+        conv.bias.copy_(bias)
+
+
+def fuse_conv_bn(conv, bn):
+    """
+    Fold Batch normalization (in inference mode) into the weights and bias of the preceding convolution.
+
+    Parameters:
+    ----------
+    conv : nn.Conv2d
+        Convolution layer (modified in place).
+    bn : nn.BatchNorm2d
+        Batch normalization layer, which follows the convolution.
+    """
+    with torch.no_grad():
+        scale, shift = _get_bn_scale_shift(bn)
+        bias = shift if conv.bias is None else conv.bias * scale + shift
+        conv.weight.mul_(scale.view(-1, 1, 1, 1).to(conv.weight.dtype))
+        _set_conv_bias(conv, bias.to(conv.weight.dtype))
+
+
+def _fold_input_affine(conv, scale, shift):
+    """
+    Fold a per-channel affine transform of the input into the weights and bias of a convolution.
+    """
+    with torch.no_grad():
+        scale = scale.to(conv.weight.device)
+        shift = shift.to(conv.weight.device)
+        out_channels, group_in_channels = conv.weight.shape[:2]
+        groups = conv.groups
+        group_out_channels = out_channels // groups
+        in_scale = scale.view(groups, 1, group_in_channels).expand(groups, group_out_channels, group_in_channels)
+        in_shift = shift.view(groups, 1, group_in_channels).expand(groups, group_out_channels, group_in_channels)
+        in_scale = in_scale.reshape(out_channels, group_in_channels, 1, 1)
+        in_shift = in_shift.reshape(out_channels, group_in_channels, 1, 1)
+        bias = (conv.weight * in_shift).sum(dim=(1, 2, 3))
+        if conv.bias is not None:
+            bias = bias + conv.bias
+        conv.weight.mul_(in_scale.to(conv.weight.dtype))
+        _set_conv_bias(conv, bias.to(conv.weight.dtype))
+
+
+def fuse_bn_conv(bn, conv):
+    """
+    Fold Batch normalization (in inference mode) into the weights and bias of the following convolution. It's exact
+    only for convolutions without padding (a padded border would not be normalized).
+
+    Parameters:
+    ----------
+    bn : nn.BatchNorm2d
+        Batch normalization layer.
+    conv : nn.Conv2d
+        Convolution layer, which follows Batch normalization (modified in place).
+    """
+    with torch.no_grad():
+        scale, shift = _get_bn_scale_shift(bn)
+    _fold_input_affine(conv, scale, shift)
+
+
+def _is_foldable_bn(module):
+    return isinstance(module, nn.BatchNorm2d) and module.track_running_stats and (module.running_var is not None)
+
+
+def _is_unpadded_conv(conv):
+    return (conv.padding == "valid") or all(p == 0 for p in conv.padding)
+
+
+def _count_grad_fn_refs(y):
+    """
+    Count references to each autograd graph node from other nodes and from the outputs.
+    """
+    refs = {}
+    stack = []
+    outputs = [y]
+    while outputs:
+        t = outputs.pop()
+        if isinstance(t, torch.Tensor):
+            if t.grad_fn is not None:
+                stack.append(t.grad_fn)
+                refs[t.grad_fn] = refs.get(t.grad_fn, 0) + 1
+        elif isinstance(t, (list, tuple)):
+            outputs.extend(t)
+        elif isinstance(t, dict):
+            outputs.extend(t.values())
+    visited = set(stack)
+    while stack:
+        node = stack.pop()
+        for next_node, _ in node.next_functions:
+            if next_node is None:
+                continue
+            refs[next_node] = refs.get(next_node, 0) + 1
+            if next_node not in visited:
+                visited.add(next_node)
+                stack.append(next_node)
+    return refs
+
+
+def _get_sample_input(net):
+    """
+    Get a random sample input (a batch of size 1 for `net.in_size`).
+    """
+    first_conv = next(module for module in net.modules() if isinstance(module, nn.Conv2d))
+    in_size = getattr(net, "in_size", (224, 224))
+    return torch.randn(
+        (1, first_conv.in_channels) + tuple(in_size),
+        dtype=first_conv.weight.dtype,
+        device=first_conv.weight.device)
+
+
+def _find_input_conv(net, x):
+    """
+    Find the convolution, which is the only consumer of the network input, via one traced forward pass.
+
+    Parameters:
+    ----------
+    net : Module
+        Network in inference mode.
+    x : Tensor
+        Sample input.
+
+    Returns:
+    -------
+    nn.Conv2d or None
+        Input convolution.
+    """
+    calls = []
+    convs = [module for module in net.modules() if isinstance(module, nn.Conv2d)]
+    hooks = [module.register_forward_hook(lambda module, inputs, output: calls.append((module, inputs)))
+             for module in convs]
+    x = x.detach().requires_grad_()
+    try:
+        with torch.enable_grad():
+            refs = _count_grad_fn_refs(net(x))
+    finally:
+        for hook in hooks:
+            hook.remove()
+
+    input_refs = sum(count for node, count in refs.items() if getattr(node, "variable", None) is x)
+    input_convs = [module for module, inputs in calls if inputs[0] is x]
+    if (input_refs != 1) or (len(input_convs) != 1) or (sum(module is input_convs[0] for module, _ in calls) != 1):
+        return None
+    return input_convs[0]
+
+
+def _find_conv_bn_pairs(net, x):
+    """
+    Find convolutions, which output is consumed only by a Batch normalization layer, via one traced forward pass.
+    Consumers are counted in the autograd graph, so that functional uses (e.g. concatenation) are taken into account.
+    Each pair should be the same for all calls of its layers (for shared or reused layers).
+
+    Parameters:
+    ----------
+    net : Module
+        Network in inference mode.
+    x : Tensor
+        Sample input.
+
+    Returns:
+    -------
+    list of tuple of (nn.Conv2d, nn.BatchNorm2d)
+        Fusible pairs.
+    """
+    calls = []
+    leaves = [module for module in net.modules() if len(module._modules) == 0]
+    hooks = [module.register_forward_hook(lambda module, inputs, output: calls.append((module, inputs, output)))
+             for module in leaves]
+    try:
+        with torch.enable_grad():
+            refs = _count_grad_fn_refs(net(x.detach().requires_grad_()))
+    finally:
+        for hook in hooks:
+            hook.remove()
+
+    # Tensors are kept alive by `calls`, so their ids are unique.
+    producers = {}
+    consumers = {}
+    for module, inputs, output in calls:
+        for t in inputs:
+            if isinstance(t, torch.Tensor):
+                consumers.setdefault(id(t), []).append(module)
+        if isinstance(output, torch.Tensor):
+            producers[id(output)] = module
+
+    num_calls = {}
+    pair_calls = {}
+    for module, inputs, _ in calls:
+        num_calls[module] = num_calls.get(module, 0) + 1
+        if not (_is_foldable_bn(module) and (len(inputs) == 1)):
+            continue
+        conv = producers.get(id(inputs[0]))
+        if isinstance(conv, nn.Conv2d) and (consumers[id(inputs[0])] == [module]) and\
+                (refs.get(inputs[0].grad_fn, 0) == 1):
+            pair_calls[(conv, module)] = pair_calls.get((conv, module), 0) + 1
+    return [(conv, bn) for (conv, bn), count in pair_calls.items()
+            if (count == num_calls[conv]) and (count == num_calls[bn])]
+
+
+def _replace_module(net, module, new_module):
+    """
+    Replace all occurrences of a submodule.
+    """
+    for parent in net.modules():
+        for name, child in parent._modules.items():
+            if child is module:
+                parent._modules[name] = new_module
+
+
+def _remove_noops(net):
+    """
+    Replace Dropout layers by identities and drop identities from plain sequential containers.
+    """
+    for parent in list(net.modules()):
+        for name, child in parent._modules.items():
+            if isinstance(child, _DropoutNd):
+                parent._modules[name] = nn.Identity()
+        if type(parent) is nn.Sequential:
+            for name in [name for name, child in parent._modules.items() if isinstance(child, (nn.Identity, Identity))]:
+                del parent._modules[name]
+
+
+def _calc_max_rel_diff(y_ref, y):
+    """
+    Calculate the maximal relative difference between (nested) outputs.
+    """
+    if isinstance(y_ref, torch.Tensor):
+        return float((y.float() - y_ref.float()).abs().max() / y_ref.float().abs().max().clamp(min=1e-12))
+    if isinstance(y_ref, (list, tuple)):
+        return max([_calc_max_rel_diff(a, b) for a, b in zip(y_ref, y)] + [0.0])
+    if isinstance(y_ref, dict):
+        return max([_calc_max_rel_diff(y_ref[k], y[k]) for k in y_ref] + [0.0])
+    return 0.0
+
+
+def fuse_for_inference(net,
+                       x=None,
+                       inplace=False,
+                       check=True,
+                       tol=1e-4):
+    """
+    Prepare a model for inference: fold Batch normalization into convolutions (Conv-BN in `ConvBlock` and in any other
+    block, and BN-Conv in `PreConvBlock` without activation and padding), and drop Identity/Dropout no-ops. Activations
+    are kept as is. The fused model is checked for numerical equivalence with the original one.
+
+    Parameters:
+    ----------
+    net : Module
+        Network.
+    x : Tensor or None, default None
+        Sample input for tracing and checking. If None, a random batch of size 1 for `net.in_size` is used.
+    inplace : bool, default False
+        Whether to modify the network in place (otherwise a copy is fused).
+    check : bool, default True
+        Whether to check the fused model outputs against the original ones.
+    tol : float, default 1e-4
+        Maximal relative difference of outputs (with respect to the maximal absolute output).
+
+    Returns:
+    -------
+    Module
+        Fused network in inference mode.
+    """
+    net.eval()
+    if x is None:
+        x = _get_sample_input(net)
+    if check:
+        with torch.no_grad():
+            y_ref = net(x)
+    fused_net = net if inplace else copy.deepcopy(net)
+
+    for conv, bn in _find_conv_bn_pairs(fused_net, x):
+        fuse_conv_bn(conv, bn)
+        _replace_module(fused_net, bn, nn.Identity())
+    for module in fused_net.modules():
+        if isinstance(module, PreConvBlock) and (not module.activate) and (not module.return_preact) and\
+                _is_foldable_bn(module.bn) and _is_unpadded_conv(module.conv):
+            fuse_bn_conv(module.bn, module.conv)
+            module.bn = nn.Identity()
+    _remove_noops(fused_net)
+
+    if check:
+        with torch.no_grad():
+            y = fused_net(x)
+        rel_diff = _calc_max_rel_diff(y_ref, y)
+        if rel_diff > tol:
+            raise RuntimeError("Fused model outputs differ from the original ones: relative difference {} > {}".format(
+                rel_diff, tol))
+    return fused_net
+
+
+class RawInputNet(nn.Module):
+    """
+    Model wrapper for raw uint8 input (with values in [0, 255], see `transforms.PILToTensor`). The input normalization
+    `(x / 255 - mean) / std` is folded into the first convolution: the scale always, and the shift too, if the
+    convolution has no padding (otherwise the mean is subtracted on the device, so that the padded border stays exact).
+    If the network input isn't consumed by a single convolution, the whole normalization is done on the device. The
+    wrapped network is modified in place.
+
+    Parameters:
+    ----------
+    net : Module
+        Network, which expects normalized input.
+    mean_rgb : tuple of 3 float
+        Mean of RGB channels in the dataset.
+    std_rgb : tuple of 3 float
+        STD of RGB channels in the dataset.
+    x : Tensor or None, default None
+        Sample normalized input for tracing. If None, a random batch of size 1 for `net.in_size` is used.
+    """
+    def __init__(self,
+                 net,
+                 mean_rgb,
+                 std_rgb,
+                 x=None):
+        super(RawInputNet, self).__init__()
+        self.net = net
+        if hasattr(net, "in_size"):
+            self.in_size = net.in_size
+        if hasattr(net, "num_classes"):
+            self.num_classes = net.num_classes
+
+        net.eval()
+        if x is None:
+            x = _get_sample_input(net)
+        scale = 1.0 / (255.0 * torch.tensor(std_rgb, dtype=torch.float64))
+        mean = 255.0 * torch.tensor(mean_rgb, dtype=torch.float64)
+        conv = _find_input_conv(net, x)
+        input_shift = -mean
+        input_scale = None
+        if conv is None:
+            input_scale = scale
+        elif _is_unpadded_conv(conv):
+            _fold_input_affine(conv, scale.to(conv.weight.dtype), (-mean * scale).to(conv.weight.dtype))
+            input_shift = None
+        else:
+            _fold_input_affine(conv, scale.to(conv.weight.dtype), torch.zeros_like(scale, dtype=conv.weight.dtype))
+        self.register_buffer(
+            "input_shift",
+            input_shift.to(x.dtype).view(1, -1, 1, 1) if input_shift is not None else None)
+        self.register_buffer(
+            "input_scale",
+            input_scale.to(x.dtype).view(1, -1, 1, 1) if input_scale is not None else None)
+        self.to(x.device)
+
+    def forward(self, x):
+        x = x.to(dtype=next(self.net.parameters()).dtype)
+        if self.input_shift is not None:
+            x = x + self.input_shift
+        if self.input_scale is not None:
+            x = x * self.input_scale
+        return self.net(x)
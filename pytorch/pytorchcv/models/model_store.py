@@ -2,12 +2,16 @@
     Model store which provides pretrained models.
 """
 
-__all__ = ['get_model_file', 'load_model', 'download_model', 'calc_num_params']
+__all__ = ['get_model_file', 'prefetch_models', 'load_model', 'download_model', 'calc_num_params', 'save_state_dict_mmap',
+           'load_state_dict_mmap', 'load_model_mmap', 'convert_model_file_to_mmap']
 
 import os
+import json
 import zipfile
 import logging
 import hashlib
+import threading
+import struct
 
 _model_sha1 = {name: (error, checksum, repo_release_tag) for name, error, checksum, repo_release_tag in [
     ('alexnet', '2093', '6429d865d917d57d1198e89232dd48a117ddb4d5', 'v0.0.108'),
@@ -415,7 +419,8 @@ def get_model_name_suffix_data(model_name):
 
 
 def get_model_file(model_name,
-                   local_model_store_dir_path=os.path.join("~", ".torch", "models")):
+                   local_model_store_dir_path=os.path.join("~", ".torch", "models"),
+                   force_verify=False):
     """
     Return location for the pretrained on local file system. This function will download from online model zoo when
     model cannot be found or has mismatch. The root directory will be created if it doesn't exist.
@@ -426,6 +431,8 @@ def get_model_file(model_name,
         Name of the model.
     local_model_store_dir_path : str, default $TORCH_HOME/models
         Location for keeping the model parameters.
+    force_verify : bool, default False
+        Whether to rehash an existing file even if it is recorded as verified in the store manifest.
 
     Returns
     -------
@@ -441,7 +448,7 @@ def get_model_file(model_name,
     local_model_store_dir_path = os.path.expanduser(local_model_store_dir_path)
     file_path = os.path.join(local_model_store_dir_path, file_name)
     if os.path.exists(file_path):
-        if _check_sha1(file_path, sha1_hash):
+        if _check_sha1_with_manifest(file_path, sha1_hash, force_verify):
             return file_path
         else:
             logging.warning("Mismatch in the content of model file detected. Downloading again.")
@@ -458,18 +465,65 @@ def get_model_file(model_name,
             repo_release_tag=repo_release_tag,
             file_name=file_name),
         path=zip_file_path,
-        overwrite=True)
+        overwrite=True,
+        resume=True)
     with zipfile.ZipFile(zip_file_path) as zf:
         zf.extractall(local_model_store_dir_path)
     os.remove(zip_file_path)
 
-    if _check_sha1(file_path, sha1_hash):
+    if _check_sha1_with_manifest(file_path, sha1_hash, force_verify=True):
         return file_path
     else:
         raise ValueError("Downloaded file has different hash. Please try again.")
 
 
-def _download(url, path=None, overwrite=False, sha1_hash=None, retries=5, verify_ssl=True):
+def prefetch_models(model_names,
+                    local_model_store_dir_path=os.path.join("~", ".torch", "models"),
+                    workers=4,
+                    force_verify=False):
+    """
+    Download (if necessary), verify, and extract pretrained models concurrently. Interrupted downloads are resumed,
+    and verified hashes are recorded in the manifest of the model store, so that later loads skip hashing.
+
+    Parameters
+    ----------
+    model_names : list of str
+        Names of the models.
+    local_model_store_dir_path : str, default $TORCH_HOME/models
+        Location for keeping the model parameters.
+    workers : int, default 4
+        Number of download threads.
+    force_verify : bool, default False
+        Whether to rehash existing files even if they are recorded as verified in the store manifest.
+
+    Returns
+    -------
+    list of str
+        Paths to the pretrained model files.
+    """
+    from multiprocessing.pool import ThreadPool
+
+    for model_name in model_names:
+        get_model_name_suffix_data(model_name)
+    local_model_store_dir_path = os.path.expanduser(local_model_store_dir_path)
+    if not os.path.exists(local_model_store_dir_path):
+        os.makedirs(local_model_store_dir_path)
+
+    pool = ThreadPool(processes=max(1, min(workers, len(model_names))))
+    try:
+        file_paths = pool.map(
+            lambda model_name: get_model_file(
+                model_name=model_name,
+                local_model_store_dir_path=local_model_store_dir_path,
+                force_verify=force_verify),
+            model_names)
+    finally:
+        pool.close()
+        pool.join()
+    return file_paths
+
+
+def _download(url, path=None, overwrite=False, sha1_hash=None, retries=5, verify_ssl=True, resume=False):
     """
     Download an given URL
 
@@ -489,6 +543,8 @@ def _download(url, path=None, overwrite=False, sha1_hash=None, retries=5, verify
         The number of times to attempt the download in case of failure or non 200 return codes
     verify_ssl : bool, default True
         Verify SSL certificates.
+    resume : bool, default False
+        Whether to keep partially downloaded data in a `.part` file and to continue it with a HTTP Range request.
 
     Returns
     -------
@@ -530,13 +586,33 @@ def _download(url, path=None, overwrite=False, sha1_hash=None, retries=5, verify
             # pylint: disable=W0703
             try:
                 print("Downloading {} from {}...".format(fname, url))
-                r = requests.get(url, stream=True, verify=verify_ssl)
-                if r.status_code != 200:
-                    raise RuntimeError("Failed downloading url {}".format(url))
-                with open(fname, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=1024):
-                        if chunk:  # filter out keep-alive new chunks
-                            f.write(chunk)
+                if resume:
+                    part_fname = fname + ".part"
+                    part_size = os.path.getsize(part_fname) if os.path.exists(part_fname) else 0
+                    headers = {"Range": "bytes={}-".format(part_size)} if part_size > 0 else None
+                    r = requests.get(url, stream=True, verify=verify_ssl, headers=headers)
+                    if r.status_code == 416:
+                        # The part file is complete (or broken), so the server can not continue it.
+                        r.close()
+                        os.remove(part_fname)
+                        raise RuntimeError("Failed resuming download of url {}".format(url))
+                    if r.status_code not in (200, 206):
+                        raise RuntimeError("Failed downloading url {}".format(url))
+                    with open(part_fname, "ab" if r.status_code == 206 else "wb") as f:
+                        for chunk in r.iter_content(chunk_size=1048576):
+                            if chunk:  # filter out keep-alive new chunks
+                                f.write(chunk)
+                    if os.path.exists(fname):
+                        os.remove(fname)
+                    os.rename(part_fname, fname)
+                else:
+                    r = requests.get(url, stream=True, verify=verify_ssl)
+                    if r.status_code != 200:
+                        raise RuntimeError("Failed downloading url {}".format(url))
+                    with open(fname, "wb") as f:
+                        for chunk in r.iter_content(chunk_size=1024):
+                            if chunk:  # filter out keep-alive new chunks
+                                f.write(chunk)
                 if sha1_hash and not _check_sha1(fname, sha1_hash):
                     raise UserWarning("File {} is downloaded but the content hash does not match."
                                       " The repo may be outdated or download may be incomplete. "
@@ -581,6 +657,100 @@ def _check_sha1(file_name, sha1_hash):
     return sha1.hexdigest() == sha1_hash
 
 
+_manifest_file_name = "sha1_manifest.json"
+_manifest_lock = threading.Lock()
+
+
+def _check_sha1_with_manifest(file_path, sha1_hash, force_verify=False):
+    """
+    Check whether the sha1 hash of the file content matches the expected hash, using the manifest of verified files
+    in the same directory. The file is rehashed only if its size, modification time, or inode differ from the recorded
+    ones.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file.
+    sha1_hash : str
+        Expected sha1 hash in hexadecimal digits.
+    force_verify : bool, default False
+        Whether to rehash the file even if it is recorded as verified.
+
+    Returns
+    -------
+    bool
+        Whether the file content matches the expected hash.
+    """
+    dir_path, file_name = os.path.split(file_path)
+    manifest_file_path = os.path.join(dir_path, _manifest_file_name)
+    file_stat = os.stat(file_path)
+    file_record = {
+        "sha1": sha1_hash,
+        "size": file_stat.st_size,
+        "mtime": file_stat.st_mtime,
+        "inode": file_stat.st_ino}
+
+    if not force_verify:
+        with _manifest_lock:
+            manifest = _load_manifest(manifest_file_path)
+        if manifest.get(file_name) == file_record:
+            return True
+
+    if not _check_sha1(file_path, sha1_hash):
+        with _manifest_lock:
+            manifest = _load_manifest(manifest_file_path)
+            if manifest.pop(file_name, None) is not None:
+                _save_manifest(manifest_file_path, manifest)
+        return False
+
+    with _manifest_lock:
+        manifest = _load_manifest(manifest_file_path)
+        manifest[file_name] = file_record
+        _save_manifest(manifest_file_path, manifest)
+    return True
+
+
+def _load_manifest(manifest_file_path):
+    """
+    Load the manifest of verified files (empty for a missing or broken file).
+
+    Parameters
+    ----------
+    manifest_file_path : str
+        Path to the manifest file.
+
+    Returns
+    -------
+    dict
+        File name -> record with sha1 hash, size, modification time, and inode.
+    """
+    if not os.path.exists(manifest_file_path):
+        return {}
+    try:
+        with open(manifest_file_path, "r") as f:
+            manifest = json.load(f)
+    except ValueError:
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(manifest_file_path, manifest):
+    """
+    Save the manifest of verified files atomically.
+
+    Parameters
+    ----------
+    manifest_file_path : str
+        Path to the manifest file.
+    manifest : dict
+        File name -> record with sha1 hash, size, modification time, and inode.
+    """
+    tmp_file_path = "{}.{}.tmp".format(manifest_file_path, os.getpid())
+    with open(tmp_file_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.rename(tmp_file_path, manifest_file_path)
+
+
 def load_model(net,
                file_path,
                ignore_extra=True):
@@ -607,6 +777,156 @@ def load_model(net,
         net.load_state_dict(torch.load(file_path))
 
 
+_mmap_file_magic = b"PTCVMMAP"
+_mmap_alignment = 64
+
+
+def save_state_dict_mmap(state_dict, file_path):
+    """
+    Save model state dictionary to a flat tensor file, that can be memory-mapped by `load_state_dict_mmap`. The file
+    consists of a magic, a JSON header (names, dtypes, shapes, and offsets of tensors), and aligned raw tensor data.
+
+    Parameters
+    ----------
+    state_dict : dict of str -> Tensor
+        Model state dictionary.
+    file_path : str
+        Path to the file.
+    """
+    tensors = []
+    offset = 0
+    for name, tensor in state_dict.items():
+        array = tensor.detach().cpu().contiguous().numpy()
+        offset = (offset + _mmap_alignment - 1) // _mmap_alignment * _mmap_alignment
+        tensors.append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape), "offset": offset})
+        offset += array.nbytes
+    header = json.dumps({"tensors": tensors}).encode("utf-8")
+    data_offset = len(_mmap_file_magic) + 8 + len(header)
+    data_offset = (data_offset + _mmap_alignment - 1) // _mmap_alignment * _mmap_alignment
+
+    with open(file_path, "wb") as f:
+        f.write(_mmap_file_magic)
+        f.write(struct.pack("<Q", data_offset))
+        f.write(header)
+        for tensor_info, tensor in zip(tensors, state_dict.values()):
+            f.seek(data_offset + tensor_info["offset"])
+            f.write(tensor.detach().cpu().contiguous().numpy().tobytes())
+
+
+def load_state_dict_mmap(file_path):
+    """
+    Load model state dictionary from a flat tensor file without copying. Tensors are views of a copy-on-write memory
+    map, so the pages of the file are shared by all processes that load it until a tensor is modified.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file.
+
+    Returns
+    -------
+    OrderedDict of str -> Tensor
+        Model state dictionary.
+    """
+    from collections import OrderedDict
+    import numpy as np
+    import torch
+
+    with open(file_path, "rb") as f:
+        if f.read(len(_mmap_file_magic)) != _mmap_file_magic:
+            raise ValueError("File {} is not a flat tensor file".format(file_path))
+        data_offset = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(data_offset - len(_mmap_file_magic) - 8).decode("utf-8").rstrip("\0"))
+
+    buffer = np.memmap(file_path, dtype=np.uint8, mode="c")
+    state_dict = OrderedDict()
+    for tensor_info in header["tensors"]:
+        dtype = np.dtype(tensor_info["dtype"])
+        shape = tuple(tensor_info["shape"])
+        begin = data_offset + tensor_info["offset"]
+        end = begin + dtype.itemsize * int(np.prod(shape))
+        state_dict[tensor_info["name"]] = torch.from_numpy(buffer[begin:end].view(dtype).reshape(shape))
+    return state_dict
+
+
+def load_model_mmap(net,
+                    file_path,
+                    ignore_extra=True):
+    """
+    Load model weights from a flat tensor file without copying: parameters and buffers of the model are replaced by
+    memory-mapped tensors (see `load_state_dict_mmap`).
+
+    Parameters
+    ----------
+    net : Module
+        Network in which weights are loaded.
+    file_path : str
+        Path to the file.
+    ignore_extra : bool, default True
+        Whether to silently ignore parameters from the file that are not present in this Module.
+    """
+    import torch
+
+    pretrained_state = load_state_dict_mmap(file_path)
+    model_dict = net.state_dict()
+    if ignore_extra:
+        pretrained_state = {k: v for k, v in pretrained_state.items() if k in model_dict}
+    missing_keys = [k for k in model_dict.keys() if k not in pretrained_state]
+    unexpected_keys = [k for k in pretrained_state.keys() if k not in model_dict]
+    if missing_keys or unexpected_keys:
+        raise RuntimeError("Error in loading state dict: missing keys {}, unexpected keys {}".format(
+            missing_keys, unexpected_keys))
+
+    modules = dict(net.named_modules())
+    replaced_params = {}
+    for name, tensor in pretrained_state.items():
+        module_name, _, attr_name = name.rpartition(".")
+        module = modules[module_name]
+        if attr_name in module._parameters:
+            param = module._parameters[attr_name]
+            if param.shape != tensor.shape:
+                raise RuntimeError("Size mismatch for {}: {} vs {}".format(name, tensor.shape, param.shape))
+            # Tied parameters stay tied.
+            if id(param) not in replaced_params:
+                replaced_params[id(param)] = torch.nn.Parameter(
+                    tensor.to(param.dtype),
+                    requires_grad=param.requires_grad)
+            module._parameters[attr_name] = replaced_params[id(param)]
+        else:
+            buffer = module._buffers[attr_name]
+            if buffer.shape != tensor.shape:
+                raise RuntimeError("Size mismatch for {}: {} vs {}".format(name, tensor.shape, buffer.shape))
+            module._buffers[attr_name] = tensor.to(buffer.dtype)
+
+
+def convert_model_file_to_mmap(src_file_path,
+                               dst_file_path=None):
+    """
+    Convert a model file saved by `torch.save` (`.pth`) to a flat tensor file.
+
+    Parameters
+    ----------
+    src_file_path : str
+        Path to the source `.pth` file.
+    dst_file_path : str or None, default None
+        Path to the destination file (the source one with `.mmap` extension by default).
+
+    Returns
+    -------
+    str
+        Path to the destination file.
+    """
+    import torch
+
+    if dst_file_path is None:
+        dst_file_path = os.path.splitext(src_file_path)[0] + ".mmap"
+    state_dict = torch.load(src_file_path, map_location="cpu")
+    if isinstance(state_dict, dict) and ("state_dict" in state_dict):
+        state_dict = state_dict["state_dict"]
+    save_state_dict_mmap(state_dict, dst_file_path)
+    return dst_file_path
+
+
 def download_model(net,
                    model_name,
                    local_model_store_dir_path=os.path.join("~", ".torch", "models"),
@@ -29,15 +29,20 @@ class ResDropResUnit(nn.Module):
         Whether to use a bottleneck or simple block in units.
     life_prob : float
         Residual branch life probability.
+    skip_dropped : bool, default True
+        Whether to skip the residual branch computation when it is dropped (otherwise it is calculated and multiplied
+        by zero).
     """
     def __init__(self,
                  in_channels,
                  out_channels,
                  stride,
                  bottleneck,
-                 life_prob):
+                 life_prob,
+                 skip_dropped=True):
         super(ResDropResUnit, self).__init__()
         self.life_prob = life_prob
+        self.skip_dropped = skip_dropped
         self.resize_identity = (in_channels != out_channels) or (stride != 1)
         body_class = ResBottleneck if bottleneck else ResBlock
 
@@ -58,6 +63,16 @@ class ResDropResUnit(nn.Module):
             identity = self.identity_conv(x)
         else:
             identity = x
+        if self.training and self.skip_dropped:
+            # The per-batch decision is made on the host, before the branch runs (without device synchronization).
+            if float(torch.rand(1)) >= self.life_prob:
+                # The activation is in-place, so the unit input is not passed to it.
+                x = identity if self.resize_identity else identity.clone()
+                return self.activ(x)
+            x = self.body(x) / self.life_prob
+            x = x + identity
+            x = self.activ(x)
+            return x
         x = self.body(x)
         if self.training:
             b = torch.bernoulli(torch.full((1,), self.life_prob, dtype=x.dtype, device=x.device))
@@ -81,6 +96,8 @@ class CIFARResDropResNet(nn.Module):
         Whether to use a bottleneck or simple block in units.
     life_probs : list of float
         Residual branch life probability for each unit.
+    skip_dropped : bool, default True
+        Whether to skip the residual branch computation when it is dropped.
     in_channels : int, default 3
         Number of input channels.
     in_size : tuple of two ints, default (32, 32)
@@ -93,6 +110,7 @@ class CIFARResDropResNet(nn.Module):
                  init_block_channels,
                  bottleneck,
                  life_probs,
+                 skip_dropped=True,
                  in_channels=3,
                  in_size=(32, 32),
                  num_classes=10):
@@ -115,7 +133,8 @@ class CIFARResDropResNet(nn.Module):
                     out_channels=out_channels,
                     stride=stride,
                     bottleneck=bottleneck,
-                    life_prob=life_probs[k]))
+                    life_prob=life_probs[k],
+                    skip_dropped=skip_dropped))
                 in_channels = out_channels
                 k += 1
             self.features.add_module("stage{}".format(i + 1), stage)
@@ -79,9 +79,12 @@ class ShakeDropResUnit(nn.Module):
             identity = x
         x = self.body(x)
         if self.training:
-            b = torch.bernoulli(torch.full((1,), self.life_prob, dtype=x.dtype, device=x.device))
-            alpha = torch.empty(x.size(0), dtype=x.dtype, device=x.device).view(-1, 1, 1, 1).uniform_(-1.0, 1.0)
-            x = self.shake_drop(x, b, alpha)
+            # The per-batch decision is made on the host (without device synchronization). The perturbation is an
+            # identity for a live branch, so it is applied only to a dropped one.
+            if float(torch.rand(1)) >= self.life_prob:
+                b = torch.zeros(1, dtype=x.dtype, device=x.device)
+                alpha = torch.empty(x.size(0), dtype=x.dtype, device=x.device).view(-1, 1, 1, 1).uniform_(-1.0, 1.0)
+                x = self.shake_drop(x, b, alpha)
         else:
             x = self.life_prob * x
         x = x + identity
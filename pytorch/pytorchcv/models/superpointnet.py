@@ -67,6 +67,8 @@ class SPDetector(nn.Module):
         Image border size to remove points.
     reduction : int, default 8
         Feature reduction factor.
+    batched_nms : bool, default True
+        Whether to run NMS for the whole batch at once (otherwise the reference point-by-point loop is used).
     """
     def __init__(self,
                  in_channels,
@@ -74,12 +76,14 @@ class SPDetector(nn.Module):
                  conf_thresh=0.015,
                  nms_dist=4,
                  border_size=4,
-                 reduction=8):
+                 reduction=8,
+                 batched_nms=True):
         super(SPDetector, self).__init__()
         self.conf_thresh = conf_thresh
         self.nms_dist = nms_dist
         self.border_size = border_size
         self.reduction = reduction
+        self.batched_nms = batched_nms
         num_classes = reduction * reduction + 1
 
         self.detector = SPHead(
@@ -88,10 +92,7 @@ class SPDetector(nn.Module):
             out_channels=num_classes)
 
     def forward(self, x):
-        batch = x.size(0)
         x_height, x_width = x.size()[-2:]
-        img_height = x_height * self.reduction
-        img_width = x_width * self.reduction
 
         semi = self.detector(x)
 
@@ -102,6 +103,111 @@ class SPDetector(nn.Module):
         heatmap = heatmap.reshape((-1, x_height, x_width, self.reduction, self.reduction))
         heatmap = heatmap.permute(0, 1, 3, 2, 4)
         heatmap = heatmap.reshape((-1, 1, x_height * self.reduction, x_width * self.reduction))
+
+        if self.batched_nms:
+            return self._batched_nms(heatmap)
+        else:
+            return self._reference_nms(heatmap)
+
+    @staticmethod
+    def _calc_nms_priorities(confs, inds):
+        """
+        Calculate the NMS order keys of points: by confidence, and by the flat index (lower first) for equal
+        confidences. So both NMS modes keep the same point of neighbours with tied confidences.
+
+        Parameters:
+        ----------
+        confs : Tensor
+            Positive point confidences.
+        inds : Tensor
+            Flat point indices (int64, less than 2^32).
+
+        Returns
+        -------
+        Tensor
+            Unique int64 keys, greater for points processed earlier.
+        """
+        # The bit patterns of positive float32 numbers are ordered as the numbers.
+        conf_bits = confs.float().contiguous().view(torch.int32).long()
+        return conf_bits * (1 << 32) - inds
+
+    def _batched_nms(self, heatmap):
+        """
+        Greedy NMS for the whole batch. Each round keeps the candidates that are the maximum among the remaining
+        candidates within the NMS window, and removes them together with their neighbours. The candidates are ranked
+        by `_calc_nms_priorities` (without ties), so it selects the same points as the reference loop in a few
+        max-pooling rounds.
+
+        Parameters:
+        ----------
+        heatmap : Tensor
+            Point heatmap with shape (batch, 1, height, width).
+
+        Returns
+        -------
+        tuple of two lists of Tensor
+            Points and their confidences for each image, in descending order of confidence.
+        """
+        batch = heatmap.size(0)
+        img_height, img_width = heatmap.size()[-2:]
+        pad = self.nms_dist
+        bord = self.border_size + pad
+        kernel_size = 2 * pad + 1
+
+        candidate_mask = (heatmap >= self.conf_thresh)
+        cand_inds = torch.nonzero(candidate_mask.view(-1)).squeeze(1)
+        cand_order = torch.argsort(self._calc_nms_priorities(heatmap.view(-1)[cand_inds], cand_inds), descending=True)
+        cand_inds = cand_inds[cand_order]
+        num_cands = cand_inds.numel()
+        # Ranks are exact in float32 up to 2^24 candidates.
+        rank_dtype = torch.float32 if num_cands < (1 << 24) else torch.float64
+        ranks = torch.zeros(heatmap.numel(), dtype=rank_dtype, device=heatmap.device)
+        ranks[cand_inds] = torch.arange(num_cands, 0, -1, dtype=rank_dtype, device=heatmap.device)
+        ranks = ranks.view_as(heatmap)
+
+        keep_mask = torch.zeros_like(candidate_mask)
+        while candidate_mask.any():
+            scores = ranks.masked_fill(~candidate_mask, 0.0)
+            max_scores = F.max_pool2d(scores, kernel_size=kernel_size, stride=1, padding=pad)
+            new_keep_mask = candidate_mask & (scores == max_scores)
+            keep_mask |= new_keep_mask
+            suppressed_mask = F.max_pool2d(new_keep_mask.float(), kernel_size=kernel_size, stride=1, padding=pad)
+            candidate_mask &= (suppressed_mask == 0)
+
+        rows = torch.arange(img_height, device=heatmap.device)
+        cols = torch.arange(img_width, device=heatmap.device)
+        keep_mask &= ((rows > bord) & (rows <= img_height - bord)).view(-1, 1)
+        keep_mask &= ((cols > bord) & (cols <= img_width - bord)).view(1, -1)
+
+        # Kept points in the NMS order, grouped by images.
+        keep_inds = cand_inds[keep_mask.view(-1)[cand_inds]]
+        img_size = img_height * img_width
+        positions = torch.arange(keep_inds.numel(), device=heatmap.device)
+        keep_inds = keep_inds[torch.argsort((keep_inds // img_size) * num_cands + positions)]
+        confs = heatmap.view(-1)[keep_inds]
+        img_inds, pix_inds = keep_inds // img_size, keep_inds % img_size
+        pts = torch.stack([pix_inds // img_width, pix_inds % img_width], dim=1)
+        counts = torch.bincount(img_inds, minlength=batch).tolist()
+        pts_list = list(torch.split(pts, counts))
+        confs_list = list(torch.split(confs, counts))
+        return pts_list, confs_list
+
+    def _reference_nms(self, heatmap):
+        """
+        Greedy NMS as a loop over the points of each image (reference implementation).
+
+        Parameters:
+        ----------
+        heatmap : Tensor
+            Point heatmap with shape (batch, 1, height, width).
+
+        Returns
+        -------
+        tuple of two lists of Tensor
+            Points and their confidences for each image, in descending order of confidence.
+        """
+        batch = heatmap.size(0)
+        img_height, img_width = heatmap.size()[-2:]
         heatmap_mask = (heatmap >= self.conf_thresh)
         pad = self.nms_dist
         bord = self.border_size + pad
@@ -114,7 +220,9 @@ class SPDetector(nn.Module):
             heatmap_mask2_i = heatmap_mask2[i, 0]
             src_pts = torch.nonzero(heatmap_mask_i)
             src_confs = torch.masked_select(heatmap_i, heatmap_mask_i)
-            src_inds = torch.argsort(src_confs, descending=True)
+            src_inds = torch.argsort(
+                self._calc_nms_priorities(src_confs, src_pts[:, 0] * img_width + src_pts[:, 1]),
+                descending=True)
             dst_inds = torch.zeros_like(src_inds)
             dst_pts_count = 0
             for ind_j in src_inds:
@@ -153,17 +261,21 @@ class SPDescriptor(nn.Module):
         Whether transpose descriptors with respect to points.
     reduction : int, default 8
         Feature reduction factor.
+    batched_sampling : bool, default True
+        Whether to sample descriptors for the whole batch in one call (otherwise each image is sampled separately).
     """
     def __init__(self,
                  in_channels,
                  mid_channels,
                  descriptor_length=256,
                  transpose_descriptors=True,
-                 reduction=8):
+                 reduction=8,
+                 batched_sampling=True):
         super(SPDescriptor, self).__init__()
         self.desc_length = descriptor_length
         self.transpose_descriptors = transpose_descriptors
         self.reduction = reduction
+        self.batched_sampling = batched_sampling
 
         self.head = SPHead(
             in_channels=in_channels,
@@ -171,6 +283,11 @@ class SPDescriptor(nn.Module):
             out_channels=descriptor_length)
 
     def forward(self, x, pts_list):
+        if self.batched_sampling:
+            offsets, descriptors = self.forward_packed(x, pts_list)
+            counts = (offsets[1:] - offsets[:-1]).tolist()
+            return list(torch.split(descriptors, counts))
+
         x_height, x_width = x.size()[-2:]
 
         coarse_desc_map = self.head(x)
@@ -192,6 +309,52 @@ class SPDescriptor(nn.Module):
 
         return descriptors_list
 
+    def forward_packed(self, x, pts_list):
+        """
+        Calculate descriptors for all images in one sampling call. Point lists are padded into one grid tensor, and
+        only the valid (non-padded) samples are gathered.
+
+        Parameters:
+        ----------
+        x : Tensor
+            Input features.
+        pts_list : list of Tensor
+            Points for each image.
+
+        Returns
+        -------
+        tuple of two Tensors
+            Offsets of each image descriptors (with length `batch + 1`) and packed descriptors for all images.
+        """
+        x_height, x_width = x.size()[-2:]
+
+        coarse_desc_map = self.head(x)
+        coarse_desc_map = F.normalize(coarse_desc_map)
+
+        device = coarse_desc_map.device
+        counts = torch.tensor([len(pts) for pts in pts_list], dtype=torch.long, device=device)
+        offsets = F.pad(torch.cumsum(counts, dim=0), pad=(1, 0))
+        max_count = int(counts.max()) if len(pts_list) > 0 else 0
+        if max_count == 0:
+            return offsets, coarse_desc_map.new_zeros((0, coarse_desc_map.size(1)))
+
+        pts = torch.cat(pts_list, dim=0).to(device).float()
+        pts[:, 0] = pts[:, 0] / (0.5 * x_height * self.reduction) - 1.0
+        pts[:, 1] = pts[:, 1] / (0.5 * x_width * self.reduction) - 1.0
+        if self.transpose_descriptors:
+            pts = pts.flip(dims=[1])
+        batch_inds = torch.repeat_interleave(torch.arange(len(pts_list), device=device), counts)
+        pos_inds = torch.arange(pts.size(0), device=device) - offsets[batch_inds]
+
+        grid = pts.new_zeros((len(pts_list), max_count, 2))
+        grid[batch_inds, pos_inds] = pts
+        descriptors = F.grid_sample(coarse_desc_map[:len(pts_list)], grid.unsqueeze(1))
+        descriptors = descriptors.squeeze(2).transpose(1, 2)
+        descriptors = descriptors[batch_inds, pos_inds]
+        descriptors = F.normalize(descriptors)
+
+        return offsets, descriptors
+
 
 class SuperPointNet(nn.Module):
     """
@@ -344,6 +507,23 @@ def _test():
         # y.sum().backward()
         assert (len(y) == 3)
 
+        x = torch.randn(2, 1, 240, 320)
+        net.detector.batched_nms = False
+        pts_list1, confs_list1, _ = net(x)
+        net.detector.batched_nms = True
+        pts_list2, confs_list2, _ = net(x)
+        for pts1, confs1, pts2, confs2 in zip(pts_list1, confs_list1, pts_list2, confs_list2):
+            assert torch.equal(confs1, confs2)
+            assert (set(map(tuple, pts1.tolist())) == set(map(tuple, pts2.tolist())))
+
+        feats = net.features(x)
+        net.descriptor.batched_sampling = False
+        descriptors_list1 = net.descriptor(feats, pts_list2)
+        net.descriptor.batched_sampling = True
+        descriptors_list2 = net.descriptor(feats, pts_list2)
+        for descriptors1, descriptors2 in zip(descriptors_list1, descriptors_list2):
+            assert ((descriptors1 - descriptors2).abs().max().item() < 1e-5)
+
 
 if __name__ == "__main__":
     _test()
@@ -7,7 +7,7 @@ import torch
 from .metric import EvalMetric, check_label_shapes
 from .seg_metrics_np import seg_pixel_accuracy_np, seg_mean_iou_imasks_np
 
-__all__ = ['PixelAccuracyMetric', 'MeanIoUMetric']
+__all__ = ['PixelAccuracyMetric', 'MeanIoUMetric', 'ConfusionMatrixMetric']
 
 
 class PixelAccuracyMetric(EvalMetric):
@@ -160,6 +160,8 @@ class MeanIoUMetric(EvalMetric):
     macro_average : bool, default True
         Whether to use micro or macro averaging.
     """
+    state_attr_names = EvalMetric.state_attr_names + ("area_inter", "area_union")
+
     def __init__(self,
                  axis=1,
                  name="mean_iou",
@@ -269,3 +271,172 @@ class MeanIoUMetric(EvalMetric):
             area_union_eps = self.area_union + eps
             mean_iou = (self.area_inter / area_union_eps).sum() / class_count
             return self.name, mean_iou
+
+
+class ConfusionMatrixMetric(EvalMetric):
+    """
+    Computes the pixel accuracy, mean IoU, and frequency weighted IoU from one streaming confusion matrix. The matrix
+    is accumulated on the device of predictions (one `bincount` per batch) and copied to the host only in `get`.
+    The results are equal to the micro averaged `PixelAccuracyMetric` and `MeanIoUMetric`.
+
+    Parameters
+    ----------
+    axis : int, default 1
+        The axis that represents classes
+    name : str, default 'conf_matrix'
+        Name of this metric instance for display.
+    output_names : list of str, or None, default None
+        Name of predictions that should be used when updating with update_dict.
+        By default include all predictions.
+    label_names : list of str, or None, default None
+        Name of labels that should be used when updating with update_dict.
+        By default include all labels.
+    num_classes : int
+        Number of classes
+    vague_idx : int, default -1
+        Index of masked pixels.
+    use_vague : bool, default False
+        Whether to use pixel masking.
+    bg_idx : int, default -1
+        Index of background class.
+    ignore_bg : bool, default False
+        Whether to ignore background class in IoU metrics.
+    """
+    state_attr_names = EvalMetric.state_attr_names + ("conf_matrix",)
+
+    def __init__(self,
+                 axis=1,
+                 name="conf_matrix",
+                 output_names=None,
+                 label_names=None,
+                 num_classes=None,
+                 vague_idx=-1,
+                 use_vague=False,
+                 bg_idx=-1,
+                 ignore_bg=False):
+        self.num_classes = num_classes
+        super(ConfusionMatrixMetric, self).__init__(
+            name,
+            axis=axis,
+            output_names=output_names,
+            label_names=label_names)
+        assert ((not ignore_bg) or (bg_idx in (0, num_classes - 1)))
+        self.axis = axis
+        self.vague_idx = vague_idx
+        self.use_vague = use_vague
+        self.bg_idx = bg_idx
+        self.ignore_bg = ignore_bg
+
+    def update(self, labels, preds):
+        """
+        Updates the internal evaluation result.
+
+        Parameters
+        ----------
+        labels : torch.Tensor
+            The labels of the data.
+        preds : torch.Tensor
+            Predicted values.
+        """
+        assert (len(labels) == len(preds))
+        with torch.no_grad():
+            pred_imask = torch.argmax(preds, dim=self.axis).view(-1)
+            label_imask = labels.to(pred_imask.device).view(-1).long()
+            # Pixels with vague (or out of range) labels go to the extra last row: they are ignored in the label
+            # area, but their predictions are still counted in the predicted area.
+            valid_mask = (label_imask >= 0) & (label_imask < self.num_classes)
+            if self.use_vague:
+                valid_mask &= (label_imask != self.vague_idx)
+            label_imask = torch.where(valid_mask, label_imask, torch.full_like(label_imask, self.num_classes))
+            conf_matrix = torch.bincount(
+                label_imask * self.num_classes + pred_imask,
+                minlength=(self.num_classes + 1) * self.num_classes)
+            conf_matrix = conf_matrix.view(self.num_classes + 1, self.num_classes)
+            if self.conf_matrix is None:
+                self.conf_matrix = conf_matrix
+            else:
+                self.conf_matrix += conf_matrix
+            self.num_inst += labels.shape[0]
+
+    def reset(self):
+        """
+        Resets the internal evaluation result to initial state.
+        """
+        self.num_inst = 0
+        self.conf_matrix = None
+
+    def get_conf_matrix(self):
+        """
+        Gets the confusion matrix on host.
+
+        Returns
+        -------
+        np.array
+            Confusion matrix with shape (num_classes + 1, num_classes), rows are labels (the last one is for vague
+            labels) and columns are predictions.
+        """
+        if self.conf_matrix is None:
+            return np.zeros((self.num_classes + 1, self.num_classes), np.int64)
+        return self.conf_matrix.cpu().numpy()
+
+    def get_class_iou(self):
+        """
+        Gets the per-class intersection over union.
+
+        Returns
+        -------
+        np.array
+            IoU values for each class (NaN for classes without any pixels and for the ignored background).
+        """
+        area_inter, area_union, _ = self._get_class_areas()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            class_iou = area_inter / area_union.astype(np.float64)
+        class_iou[area_union == 0] = float("nan")
+        if self.ignore_bg:
+            class_iou[self.bg_idx] = float("nan")
+        return class_iou
+
+    def _get_class_areas(self):
+        """
+        Calculates per-class intersection, union, and label areas.
+        """
+        conf_matrix = self.get_conf_matrix()
+        area_inter = np.diag(conf_matrix[:-1])
+        area_label = conf_matrix[:-1].sum(axis=1)
+        area_pred = conf_matrix.sum(axis=0)
+        area_union = area_pred + area_label - area_inter
+        return area_inter, area_union, area_label
+
+    def get(self):
+        """
+        Gets the current evaluation result.
+
+        Returns
+        -------
+        names : list of str
+           Name of the metrics.
+        values : list of float
+           Value of the evaluations.
+        """
+        names = ["pix_acc", "mean_iou", "fw_iou"]
+        if self.num_inst == 0:
+            return names, [float("nan")] * len(names)
+
+        conf_matrix = self.get_conf_matrix()
+        num_correct = np.trace(conf_matrix[:-1])
+        num_pixels = conf_matrix[:-1].sum() if self.use_vague else conf_matrix.sum()
+        pix_acc = float(num_correct / num_pixels) if num_pixels > 0 else float("nan")
+
+        area_inter, area_union, area_label = self._get_class_areas()
+        if self.ignore_bg:
+            class_mask = np.arange(self.num_classes) != self.bg_idx
+            area_inter, area_union, area_label = area_inter[class_mask], area_union[class_mask], area_label[class_mask]
+        class_count = (area_union > 0).sum()
+        if class_count == 0:
+            return names, [pix_acc, float("nan"), float("nan")]
+        eps = np.finfo(np.float32).eps
+        class_iou = area_inter / (area_union + eps)
+        mean_iou = class_iou.sum() / class_count
+        fw_iou = (area_label * class_iou).sum() / max(area_label.sum(), 1)
+
+        return names, [pix_acc, float(mean_iou), float(fw_iou)]
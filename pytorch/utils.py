@@ -1,11 +1,20 @@
 import logging
 import os
+import copy
+import time
+import queue
+import pickle
+import traceback
 import numpy as np
 import torch.utils.data
+import torch.distributed as dist
+from common.step_timer import StepTimer
 from .pytorchcv.model_provider import get_model
+from .pytorchcv.models.model_store import load_model_mmap
+from .pytorchcv.models.fusion import RawInputNet
 from .metric import EvalMetric, CompositeEvalMetric
 from .cls_metrics import Top1Error, TopKError
-from .seg_metrics import PixelAccuracyMetric, MeanIoUMetric
+from .seg_metrics import PixelAccuracyMetric, MeanIoUMetric, ConfusionMatrixMetric
 
 
 def prepare_pt_context(num_gpus,
@@ -15,6 +24,115 @@ def prepare_pt_context(num_gpus,
     return use_cuda, batch_size
 
 
+def init_distributed(backend,
+                     use_cuda):
+    """
+    Initialize the default distributed process group from the environment variables set by `torchrun` (RANK,
+    WORLD_SIZE, LOCAL_RANK, MASTER_ADDR, MASTER_PORT).
+
+    Parameters:
+    ----------
+    backend : str
+        Distributed backend (gloo for CPU, nccl for GPU). An empty string selects it by `use_cuda`.
+    use_cuda : bool
+        Whether each process uses one GPU (selected by LOCAL_RANK).
+
+    Returns
+    -------
+    tuple of (int, int)
+        Rank of the current process and world size.
+    """
+    if not backend:
+        backend = "nccl" if use_cuda else "gloo"
+    if use_cuda:
+        torch.cuda.set_device(int(os.environ.get("LOCAL_RANK", "0")))
+    dist.init_process_group(backend=backend, init_method="env://")
+    return dist.get_rank(), dist.get_world_size()
+
+
+def get_dist_world_size():
+    """
+    Get the number of processes in the default distributed group (1 if torch.distributed is not initialized).
+    """
+    if dist.is_available() and dist.is_initialized():
+        return dist.get_world_size()
+    return 1
+
+
+def _get_dist_device():
+    """
+    Get the device for collective operations of the default distributed group.
+    """
+    return torch.device("cuda", torch.cuda.current_device()) if dist.get_backend() == "nccl" else torch.device("cpu")
+
+
+def all_reduce_mean(value):
+    """
+    Average a scalar value over all distributed processes. Does nothing without torch.distributed.
+
+    Parameters:
+    ----------
+    value : float
+        Local value.
+
+    Returns
+    -------
+    float
+        Mean value.
+    """
+    world_size = get_dist_world_size()
+    if world_size == 1:
+        return value
+    value_tensor = torch.tensor([value], dtype=torch.float64, device=_get_dist_device())
+    dist.all_reduce(value_tensor, op=dist.ReduceOp.SUM)
+    return value_tensor.item() / world_size
+
+
+def all_reduce_metric(metric):
+    """
+    Sum the internal state of a metric (or of each metric in a composite one) over all distributed processes, so that
+    every process gets the metric value for the whole data. Does nothing without torch.distributed.
+
+    Parameters:
+    ----------
+    metric : EvalMetric
+        Metric object.
+
+    Returns
+    -------
+    EvalMetric
+        The same metric object.
+    """
+    if get_dist_world_size() == 1:
+        return metric
+    if isinstance(metric, CompositeEvalMetric):
+        for child_metric in metric.metrics:
+            all_reduce_metric(child_metric)
+        return metric
+    device = _get_dist_device()
+    if isinstance(metric, ConfusionMatrixMetric):
+        metric.conf_matrix = torch.from_numpy(metric.get_conf_matrix())
+    for attr_name in metric.state_attr_names:
+        if not hasattr(metric, attr_name):
+            continue
+        value = getattr(metric, attr_name)
+        if isinstance(value, torch.Tensor):
+            value_tensor = value.to(device=device, dtype=torch.float64)
+        else:
+            value_tensor = torch.tensor(np.asarray(value, dtype=np.float64), device=device)
+        dist.all_reduce(value_tensor, op=dist.ReduceOp.SUM)
+        if isinstance(value, torch.Tensor):
+            value = value_tensor.to(dtype=value.dtype)
+        elif isinstance(value, np.ndarray):
+            value = value_tensor.cpu().numpy().astype(value.dtype)
+        elif isinstance(value, (int, np.integer)):
+            value = int(round(value_tensor.item()))
+        else:
+            value = value_tensor.item()
+        setattr(metric, attr_name, value)
+    return metric
+
+
 def prepare_model(model_name,
                   use_pretrained,
                   pretrained_model_file_path,
@@ -25,7 +143,9 @@ def prepare_model(model_name,
                   num_classes=None,
                   in_channels=None,
                   remap_to_cpu=False,
-                  remove_module=False):
+                  remove_module=False,
+                  use_distributed=False,
+                  raw_input_normalization=None):
     kwargs = {"pretrained": use_pretrained}
     if num_classes is not None:
         kwargs["num_classes"] = num_classes
@@ -36,7 +156,14 @@ def prepare_model(model_name,
 
     net = get_model(model_name, **kwargs)
 
-    if pretrained_model_file_path:
+    if pretrained_model_file_path and pretrained_model_file_path.endswith(".mmap"):
+        assert (os.path.isfile(pretrained_model_file_path))
+        logging.info("Loading model (memory-mapped): {}".format(pretrained_model_file_path))
+        load_model_mmap(
+            net=net,
+            file_path=pretrained_model_file_path,
+            ignore_extra=load_ignore_extra)
+    elif pretrained_model_file_path:
         assert (os.path.isfile(pretrained_model_file_path))
         logging.info("Loading model: {}".format(pretrained_model_file_path))
         checkpoint = torch.load(
@@ -58,6 +185,23 @@ def prepare_model(model_name,
             else:
                 net.load_state_dict(checkpoint)
 
+    if raw_input_normalization is not None:
+        mean_rgb, std_rgb = raw_input_normalization
+        net = RawInputNet(
+            net=net,
+            mean_rgb=mean_rgb,
+            std_rgb=std_rgb)
+
+    if use_distributed:
+        if use_cuda:
+            net = net.cuda()
+        # Models with skipped stochastic-depth branches have unused parameters in some iterations.
+        net = torch.nn.parallel.DistributedDataParallel(
+            net,
+            device_ids=([torch.cuda.current_device()] if use_cuda else None),
+            find_unused_parameters=any(getattr(module, "skip_dropped", False) for module in net.modules()))
+        return net
+
     if use_data_parallel and use_cuda:
         net = torch.nn.DataParallel(net)
 
@@ -67,6 +211,34 @@ def prepare_model(model_name,
     return net
 
 
+def get_cpu_snapshot(obj):
+    """
+    Get a snapshot of a (nested) training state in host memory: all tensors are copied to CPU (CPU tensors are cloned),
+    so the snapshot isn't affected by the following training steps and can be serialized in another thread.
+
+    Parameters:
+    ----------
+    obj : dict, list, tuple, Tensor, or other object
+        State (e.g. a dictionary with model and optimizer state dictionaries).
+
+    Returns
+    -------
+    object
+        Snapshot of the state.
+    """
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to(device="cpu", copy=True)
+    if isinstance(obj, dict):
+        # A shallow copy keeps the dictionary type and attributes (as `_metadata` of state dictionaries).
+        snapshot = copy.copy(obj)
+        for key, value in obj.items():
+            snapshot[key] = get_cpu_snapshot(value)
+        return snapshot
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(get_cpu_snapshot(value) for value in obj)
+    return copy.deepcopy(obj)
+
+
 def calc_net_weight_count(net):
     net.train()
     net_params = filter(lambda p: p.requires_grad, net.parameters())
@@ -118,18 +290,162 @@ def accuracy(output, target, topk=(1,)):
 def validate(metric,
              net,
              val_data,
-             use_cuda):
+             use_cuda,
+             step_timer=None):
     net.eval()
     metric.reset()
+    if step_timer is None:
+        step_timer = StepTimer(enabled=False)
     with torch.no_grad():
-        for data, target in val_data:
+        for data, target in step_timer.iter(val_data, category="val"):
             if use_cuda:
                 target = target.cuda(non_blocking=True)
+            step_timer.lap("h2d")
             output = net(data)
+            step_timer.lap("forward")
             metric.update(target, output)
+            step_timer.lap("metric")
+    all_reduce_metric(metric)
+    return metric
+
+
+def _validate_shard(shard_index,
+                    num_shards,
+                    num_threads,
+                    metric,
+                    net,
+                    get_data_source,
+                    result_queue):
+    """
+    Validate a model on one index shard of the data (in a worker process), and send the metric state. The state is
+    sent pickled by value: tensors put on a multiprocessing queue are shared by file descriptors, which the parent
+    can't open after the worker exits.
+    """
+    try:
+        torch.set_num_threads(num_threads)
+        val_data = get_data_source(shard=(shard_index, num_shards))
+        validate(
+            metric=metric,
+            net=net,
+            val_data=val_data,
+            use_cuda=False)
+        result_queue.put((shard_index, pickle.dumps(metric.get_state()), None))
+    except Exception:
+        result_queue.put((shard_index, None, traceback.format_exc()))
+
+
+def validate_sharded(metric,
+                     net,
+                     get_data_source,
+                     num_shards,
+                     num_threads=0):
+    """
+    Validate a model on CPU by several worker processes, each on its own index shard of the data and with its own
+    intra-op thread budget. The metric states of the shards are merged at the end.
+
+    Parameters:
+    ----------
+    metric : EvalMetric
+        Metric object.
+    net : Module
+        Model (on CPU).
+    get_data_source : function
+        Picklable function (e.g. a `functools.partial` of `get_val_data_source`) that takes a `shard` argument (index
+        and count of shards) and returns the data loader for it.
+    num_shards : int
+        Number of shards (worker processes).
+    num_threads : int, default 0
+        Number of intra-op threads per worker (0 means an equal part of the current number of threads).
+
+    Returns
+    -------
+    EvalMetric
+        The same metric object with the results for the whole data.
+    """
+    if num_threads <= 0:
+        num_threads = max(1, torch.get_num_threads() // num_shards)
+    net.eval()
+    metric.reset()
+    # Workers are started by spawning (forking a process with an initialized OpenMP pool isn't safe), so the model
+    # parameters are passed through shared memory.
+    net.share_memory()
+    mp_context = torch.multiprocessing.get_context("spawn")
+    result_queue = mp_context.Queue()
+    processes = [mp_context.Process(
+        target=_validate_shard,
+        args=(shard_index, num_shards, num_threads, copy.deepcopy(metric), net, get_data_source, result_queue))
+        for shard_index in range(num_shards)]
+    for process in processes:
+        process.start()
+    errors = []
+    finished_shards = set()
+    while len(finished_shards) < num_shards:
+        try:
+            shard_index, state, error = result_queue.get(timeout=1.0)
+        except queue.Empty:
+            # A worker killed without a result (e.g. by the OOM killer) is reported as failed.
+            for shard_index, process in enumerate(processes):
+                if (shard_index not in finished_shards) and (process.exitcode not in (None, 0)):
+                    finished_shards.add(shard_index)
+                    errors.append("Shard {}: exit code {}".format(shard_index, process.exitcode))
+            continue
+        finished_shards.add(shard_index)
+        if error is not None:
+            errors.append("Shard {}:\n{}".format(shard_index, error))
+        else:
+            metric.merge(pickle.loads(state))
+    for process in processes:
+        process.join()
+    if errors:
+        raise RuntimeError("Sharded validation failed.\n{}".format("\n".join(errors)))
     return metric
 
 
+def validate_models(metrics,
+                    nets,
+                    val_data,
+                    use_cuda):
+    """
+    Validate several models over one pass of the data (each batch is decoded once and fed to all models).
+
+    Parameters:
+    ----------
+    metrics : list of EvalMetric
+        Metric for each model.
+    nets : list of Module
+        Models.
+    val_data : DataLoader
+        Data loader.
+    use_cuda : bool
+        Whether to use CUDA.
+
+    Returns
+    -------
+    list of float
+        Forward time (in seconds) for each model.
+    """
+    assert (len(metrics) == len(nets))
+    for net, metric in zip(nets, metrics):
+        net.eval()
+        metric.reset()
+    forward_times = [0.0] * len(nets)
+    with torch.no_grad():
+        for data, target in val_data:
+            if use_cuda:
+                data = data.cuda(non_blocking=True)
+                target = target.cuda(non_blocking=True)
+            for i, (net, metric) in enumerate(zip(nets, metrics)):
+                tic = time.time()
+                output = net(data)
+                metric.update(target, output)
+                if use_cuda:
+                    torch.cuda.synchronize()
+                forward_times[i] += time.time() - tic
+    for metric in metrics:
+        all_reduce_metric(metric)
+    return forward_times
+
+
 def validate0(acc_top1,
               acc_top5,
               net,
@@ -182,7 +498,7 @@ def report_accuracy(metric,
                 msg += ", "
             msg += msg_pattern.format(name=m[0], value=m[1])
     elif isinstance(metric, EvalMetric):
-        msg = msg_pattern.format(name=metric_info[0], value=metric_info[1])
+        msg = ", ".join([msg_pattern.format(name=name, value=value) for name, value in metric.get_name_value()])
     else:
         raise Exception("Wrong metric type: {}".format(type(metric)))
     return msg
@@ -197,6 +513,8 @@ def get_metric(metric_name, metric_extra_kwargs):
         return PixelAccuracyMetric(**metric_extra_kwargs)
     elif metric_name == "MeanIoUMetric":
         return MeanIoUMetric(**metric_extra_kwargs)
+    elif metric_name == "ConfusionMatrixMetric":
+        return ConfusionMatrixMetric(**metric_extra_kwargs)
     else:
         raise Exception("Wrong metric name: {}".format(metric_name))
 
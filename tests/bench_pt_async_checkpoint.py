@@ -0,0 +1,80 @@
+"""
+    Benchmark for background checkpoint writing (`train_pt.py --async-checkpoint`): time the training thread is blocked
+    by synchronous saving (`.pth` and `.states`) versus background saving (one `.pth`), total write time, file sizes,
+    and the equality of the saved states. Random weights are used.
+    Run from the repository root: python -m tests.bench_pt_async_checkpoint --model resnet50
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import torch
+from common.async_checkpoint_writer import AsyncCheckpointWriter
+from pytorch.utils import prepare_model
+from train_pt import save_params, save_params_async
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Background checkpoint writing benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="resnet50",
+        help="model to save")
+    parser.add_argument(
+        "--save-dir",
+        type=str,
+        default="",
+        help="directory for checkpoint files (a temporary one is used if empty)")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    save_dir_path = args.save_dir if args.save_dir else tempfile.mkdtemp()
+    net = prepare_model(args.model, use_pretrained=False, pretrained_model_file_path="", use_cuda=False)
+    optimizer = torch.optim.SGD(net.parameters(), lr=0.1, momentum=0.9)
+    net(torch.randn(2, 3, 224, 224)).sum().backward()
+    optimizer.step()
+    state = {
+        "epoch": 1,
+        "state_dict": net.state_dict(),
+        "optimizer": optimizer.state_dict(),
+    }
+
+    sync_file_stem = os.path.join(save_dir_path, "sync")
+    tic = time.time()
+    save_params(sync_file_stem, state)
+    sync_time = time.time() - tic
+    sync_size = sum(os.path.getsize(sync_file_stem + ext) for ext in (".pth", ".states"))
+    print("sync: blocked {:.3f} sec, {:.1f} MB".format(sync_time, sync_size / 2 ** 20))
+
+    async_file_stem = os.path.join(save_dir_path, "async")
+    checkpoint_writer = AsyncCheckpointWriter()
+    tic = time.time()
+    save_params_async(async_file_stem, state, checkpoint_writer)
+    blocked_time = time.time() - tic
+    # The training continues: the snapshot must not change.
+    with torch.no_grad():
+        for param in net.parameters():
+            param.add_(1.0)
+    checkpoint_writer.close()
+    total_time = time.time() - tic
+    async_size = os.path.getsize(async_file_stem + ".pth")
+    print("async: blocked {:.3f} sec, written in {:.3f} sec, {:.1f} MB".format(
+        blocked_time, total_time, async_size / 2 ** 20))
+
+    ref_state = torch.load(sync_file_stem + ".states")
+    async_state = torch.load(async_file_stem + ".pth")
+    print("equal weights: {}, equal optimizer state: {}".format(
+        all(torch.equal(v, async_state["state_dict"][k]) for k, v in ref_state["state_dict"].items()),
+        all(torch.equal(v["momentum_buffer"], async_state["optimizer"]["state"][k]["momentum_buffer"])
+            for k, v in ref_state["optimizer"]["state"].items())))
+
+
+if __name__ == "__main__":
+    main()
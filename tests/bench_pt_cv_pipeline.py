@@ -0,0 +1,99 @@
+"""
+    Benchmark for ImageNet-1K validation preprocessing: PIL (default), PIL with OpenCV resize (`--use-cv-resize`), and
+    the OpenCV/NumPy pipeline (`--use-cv-pipeline`). Per-image latency (decoding included) and parity with the PIL path
+    (mean/max pixel difference, and, for a model, prediction agreement and Top-1 error) are reported. If no dataset is
+    given, a small synthetic one is generated.
+    Run from the repository root: python -m tests.bench_pt_cv_pipeline --data-dir ../imgclsmob_data/imagenet
+        --model resnet18 --resume ../imgclsmob_data/resnet18.pth
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import torch
+from pytorch.dataset_utils import get_dataset_metainfo
+from pytorch.utils import prepare_model
+from tests.bench_pt_imagenet_shards import create_synthetic_dataset
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="OpenCV preprocessing pipeline benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default="",
+        help="path to ImageNet-1K dataset with the val image folder (a synthetic dataset is generated if empty)")
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=256,
+        help="number of images to process")
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="",
+        help="model for prediction parity (skipped if empty)")
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default="",
+        help="model weights file")
+    args = parser.parse_args()
+    return args
+
+
+def get_dataset(data_dir_path,
+                mode_args):
+    ds_metainfo = get_dataset_metainfo(dataset_name="ImageNet1K")
+    parser = argparse.ArgumentParser()
+    ds_metainfo.add_dataset_parser_arguments(parser, "")
+    ds_metainfo.update(parser.parse_args(["--data-dir", data_dir_path] + mode_args))
+    return ds_metainfo.dataset_class(
+        root=ds_metainfo.root_dir_path,
+        mode="val",
+        transform=ds_metainfo.val_transform(ds_metainfo=ds_metainfo))
+
+
+def main():
+    args = parse_args()
+    data_dir_path = args.data_dir
+    if not data_dir_path:
+        data_dir_path = tempfile.mkdtemp()
+        create_synthetic_dataset(data_dir_path, args.num_images)
+        os.rename(os.path.join(data_dir_path, "train"), os.path.join(data_dir_path, "val"))
+
+    net = None
+    if args.model:
+        net = prepare_model(args.model, use_pretrained=False, pretrained_model_file_path=args.resume, use_cuda=False)
+        net.eval()
+
+    ref_images = None
+    ref_preds = None
+    for name, mode_args in (("PIL", []), ("cv_resize", ["--use-cv-resize"]), ("cv_pipeline", ["--use-cv-pipeline"])):
+        dataset = get_dataset(data_dir_path, mode_args)
+        num_images = min(args.num_images, len(dataset))
+        tic = time.time()
+        samples = [dataset[i] for i in range(num_images)]
+        latency = (time.time() - tic) / num_images * 1000.0
+        images = torch.stack([x for x, _ in samples])
+        labels = torch.tensor([y for _, y in samples])
+        if ref_images is None:
+            ref_images = images
+        diff = (images - ref_images).abs()
+        msg = "{:>11}: {:.2f} ms/image, diff with PIL: mean={:.4f}, max={:.4f}".format(
+            name, latency, float(diff.mean()), float(diff.max()))
+        if net is not None:
+            with torch.no_grad():
+                preds = torch.cat([net(x).argmax(dim=1) for x in images.split(32)])
+            if ref_preds is None:
+                ref_preds = preds
+            msg += ", agreement={:.4f}, top1 err={:.4f}".format(
+                float((preds == ref_preds).float().mean()), float((preds != labels).float().mean()))
+        print(msg)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+    Benchmark for on-device accumulation of classification metrics and training loss: time of per-batch updates with
+    host reads (`.cpu().numpy()` / `.item()` every batch, the former way) versus tensor accumulation with one read at
+    the end, and the equality of the results.
+    Run from the repository root: python -m tests.bench_pt_device_metrics --num-gpus 1
+"""
+
+import time
+import argparse
+import numpy as np
+import torch
+from pytorch.cls_metrics import Top1Error, TopKError
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="On-device metric accumulation benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--num-gpus",
+        type=int,
+        default=0,
+        help="number of gpus to use (0 or 1)")
+    parser.add_argument(
+        "--num-batches",
+        type=int,
+        default=200,
+        help="number of batches")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=256,
+        help="batch size")
+    parser.add_argument(
+        "--num-classes",
+        type=int,
+        default=1000,
+        help="number of classes")
+    args = parser.parse_args()
+    return args
+
+
+def host_update(preds,
+                labels,
+                loss,
+                state):
+    """
+    Per-batch update with host reads (the former way of `Top1Error`, `TopKError`, and training loss).
+    """
+    pred_label = torch.argmax(preds, dim=1).cpu().numpy().astype(np.int32)
+    label = labels.cpu().numpy().astype(np.int32)
+    state["top1"] += (pred_label == label).sum()
+    _, pred = preds.topk(k=5, dim=1, largest=True, sorted=True)
+    state["top5"] += pred.t().eq(labels.view(1, -1).expand(5, -1)).reshape(-1).float().sum().item()
+    state["loss"] += loss.item()
+
+
+def main():
+    args = parse_args()
+    device = torch.device("cuda" if args.num_gpus > 0 else "cpu")
+    torch.manual_seed(0)
+    batches = [(torch.randn(args.batch_size, args.num_classes, device=device),
+                torch.randint(0, args.num_classes, (args.batch_size,), device=device))
+               for _ in range(args.num_batches)]
+    weight = torch.randn(args.num_classes, args.num_classes, device=device)
+
+    # The matrix product stands for the forward pass, which runs asynchronously on a GPU.
+    state = {"top1": 0, "top5": 0.0, "loss": 0.0}
+    tic = time.time()
+    for preds, labels in batches:
+        preds = preds.mm(weight)
+        loss = torch.nn.functional.cross_entropy(preds, labels)
+        host_update(preds, labels, loss, state)
+    host_time = time.time() - tic
+
+    top1, top5 = Top1Error(), TopKError(top_k=5)
+    loss_sum = torch.zeros((), dtype=torch.float64, device=device)
+    tic = time.time()
+    for preds, labels in batches:
+        preds = preds.mm(weight)
+        loss = torch.nn.functional.cross_entropy(preds, labels)
+        top1.update(labels, preds)
+        top5.update(labels, preds)
+        loss_sum += loss.detach()
+    values = (top1.get()[1], top5.get()[1], loss_sum.item())
+    device_time = time.time() - tic
+
+    num_samples = args.num_batches * args.batch_size
+    print("host reads per batch: {:.3f} sec".format(host_time))
+    print("on-device accumulation: {:.3f} sec, speedup={:.2f}".format(device_time, host_time / device_time))
+    print("equal: top1={}, top5={}, loss diff={:.2e}".format(
+        values[0] == 1.0 - state["top1"] / num_samples,
+        values[1] == 1.0 - state["top5"] / num_samples,
+        abs(values[2] - state["loss"])))
+
+
+if __name__ == "__main__":
+    main()
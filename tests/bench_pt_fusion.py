@@ -0,0 +1,120 @@
+"""
+    Benchmark for `fuse_for_inference` from pytorchcv: CPU inference latency of original and fused models, and the
+    equivalence of their outputs (Batch normalization statistics are randomized, so that the folding is not trivial).
+    With `--all`, all models from the zoo are fused and checked in float64 (without timing), so that rounding errors
+    amplified by deep randomly initialized models are not confused with folding errors.
+    Run from the repository root: python -m tests.bench_pt_fusion --models resnet18 mobilenet_w1 shufflenetv2_w1
+"""
+
+import time
+import argparse
+import torch
+import torch.nn as nn
+from pytorch.pytorchcv.model_provider import get_model, _models
+from pytorch.pytorchcv.models.fusion import fuse_for_inference
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Conv-BN fusion benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        nargs="+",
+        default=("resnet18", "preresnet18", "mobilenet_w1", "mobilenetv2_w1", "shufflenetv2_w1", "densenet121"),
+        help="models to check")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="check all models from the zoo (without timing)")
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=(1, 16),
+        help="batch sizes for timing")
+    parser.add_argument(
+        "--num-iters",
+        type=int,
+        default=20,
+        help="number of timed iterations")
+    parser.add_argument(
+        "--num-threads",
+        type=int,
+        default=0,
+        help="number of CPU threads (0 for the default)")
+    args = parser.parse_args()
+    return args
+
+
+def randomize_bn_stats(net):
+    """
+    Set random Batch normalization statistics and affine parameters.
+    """
+    with torch.no_grad():
+        for module in net.modules():
+            if isinstance(module, nn.BatchNorm2d) and module.track_running_stats:
+                module.running_mean.uniform_(-0.1, 0.1)
+                module.running_var.uniform_(0.5, 2.0)
+                if module.affine:
+                    module.weight.uniform_(0.5, 1.5)
+                    module.bias.uniform_(-0.1, 0.1)
+
+
+def count_bns(net):
+    return sum(1 for module in net.modules() if isinstance(module, nn.BatchNorm2d))
+
+
+def measure(net,
+            x,
+            num_iters):
+    """
+    Measure the mean inference latency (ms).
+    """
+    with torch.no_grad():
+        for _ in range(3):
+            net(x)
+        tic = time.time()
+        for _ in range(num_iters):
+            net(x)
+    return (time.time() - tic) / num_iters * 1000.0
+
+
+def main():
+    args = parse_args()
+    if args.num_threads > 0:
+        torch.set_num_threads(args.num_threads)
+    torch.manual_seed(0)
+
+    if args.all:
+        num_failed = 0
+        for model in sorted(_models.keys()):
+            try:
+                net = get_model(model).double()
+                randomize_bn_stats(net)
+                fused_net = fuse_for_inference(net, tol=1e-6)
+                print("{}: ok, BN {} -> {}".format(model, count_bns(net), count_bns(fused_net)))
+            except Exception as e:
+                num_failed += 1
+                print("{}: failed ({})".format(model, str(e).split("\n")[0]))
+        print("Failed: {}".format(num_failed))
+        return
+
+    for model in args.models:
+        net = get_model(model)
+        randomize_bn_stats(net)
+        fused_net = fuse_for_inference(net)
+        for batch_size in args.batch_sizes:
+            x = torch.randn((batch_size, 3) + tuple(net.in_size))
+            orig_time = measure(net, x, args.num_iters)
+            fused_time = measure(fused_net, x, args.num_iters)
+            with torch.no_grad():
+                diff = float((fused_net(x) - net(x)).abs().max())
+            print("{}, batch={}: original={:.2f} ms, fused={:.2f} ms (speedup {:.2f}x), BN {} -> {}, max diff={:.2e}".format(
+                model, batch_size, orig_time, fused_time, orig_time / fused_time, count_bns(net), count_bns(fused_net),
+                diff))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+    Data loading benchmark for ImageNet-1K: image folder (`ImageNet1K`) versus packed shards (`ImageNet1KShards`) with
+    the standard training transform. If no dataset is given, a small synthetic one is generated and packed.
+    Run from the repository root: python -m tests.bench_pt_imagenet_shards --data-dir ../imgclsmob_data/imagenet
+        --shard-dir ../imgclsmob_data/imagenet_shard
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+from PIL import Image
+from torch.utils.data import DataLoader
+from pytorch.datasets.imagenet1k_cls_dataset import ImageNet1KMetaInfo, ImageNet1K
+from pytorch.datasets.imagenet1k_shard_cls_dataset import ImageNet1KShards, convert_image_folder_to_shards
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Data loading benchmark for ImageNet-1K image folder versus packed shards",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default="",
+        help="path to ImageNet-1K image folders (a synthetic dataset is generated if empty)")
+    parser.add_argument(
+        "--shard-dir",
+        type=str,
+        default="",
+        help="path to packed shards (created from --data-dir if empty)")
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=2000,
+        help="number of synthetic images")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="batch size")
+    parser.add_argument(
+        "--num-batches",
+        type=int,
+        default=30,
+        help="number of batches to read")
+    parser.add_argument(
+        "-j",
+        "--num-data-workers",
+        dest="num_workers",
+        type=int,
+        default=2,
+        help="number of preprocessing workers")
+    args = parser.parse_args()
+    return args
+
+
+def create_synthetic_dataset(dir_path,
+                             num_images,
+                             num_classes=10):
+    """
+    Create a synthetic image folder dataset with JPEG images of the typical ImageNet-1K size.
+    """
+    rng = np.random.RandomState(0)
+    base_img = rng.randint(0, 256, (375, 500, 3)).astype(np.uint8)
+    for i in range(num_images):
+        class_dir_path = os.path.join(dir_path, "train", "n{:08d}".format(i % num_classes))
+        if not os.path.exists(class_dir_path):
+            os.makedirs(class_dir_path)
+        img = np.roll(base_img, shift=i, axis=1)
+        Image.fromarray(img).save(os.path.join(class_dir_path, "{:06d}.JPEG".format(i)), quality=90)
+
+
+def measure(dataset,
+            batch_size,
+            num_batches,
+            num_workers):
+    """
+    Measure the data loading speed (images/sec).
+    """
+    data_loader = DataLoader(
+        dataset=dataset,
+        batch_size=batch_size,
+        num_workers=num_workers)
+    num_images = 0
+    tic = time.time()
+    for i, (data, _) in enumerate(data_loader):
+        num_images += data.shape[0]
+        if i + 1 == num_batches:
+            break
+    return num_images / (time.time() - tic)
+
+
+def main():
+    args = parse_args()
+    data_dir_path = args.data_dir
+    if not data_dir_path:
+        data_dir_path = tempfile.mkdtemp()
+        create_synthetic_dataset(data_dir_path, args.num_images)
+    shard_dir_path = args.shard_dir
+    if not shard_dir_path:
+        shard_dir_path = tempfile.mkdtemp()
+        tic = time.time()
+        convert_image_folder_to_shards(data_dir_path, shard_dir_path, split="train")
+        print("Packing time: {:.2f} sec".format(time.time() - tic))
+
+    ds_metainfo = ImageNet1KMetaInfo()
+    transform = ds_metainfo.train_transform(ds_metainfo=ds_metainfo)
+    for name, dataset in (
+            ("folder", ImageNet1K(root=data_dir_path, mode="train", transform=transform)),
+            ("shards", ImageNet1KShards(root=shard_dir_path, mode="train", transform=transform))):
+        speed = measure(dataset, args.batch_size, args.num_batches, args.num_workers)
+        print("{}: {:.1f} images/sec".format(name, speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+    Startup benchmark for the PyTorch model provider: measures `python -X importtime` for the former eager import of
+    every model module versus the lazy registry that imports only the requested model.
+    Run from the repository root: python -m tests.bench_pt_import --model resnet50
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+EAGER_CODE = (
+    "from pytorch.pytorchcv.model_provider import _models\n"
+    "for module_name in sorted(set(_models.values())):\n"
+    "    __import__('pytorch.pytorchcv.models.' + module_name)\n"
+    "from pytorch.pytorchcv.model_provider import get_model\n"
+    "get_model('{model}')\n")
+
+LAZY_CODE = (
+    "from pytorch.pytorchcv.model_provider import get_model\n"
+    "get_model('{model}')\n")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Import time benchmark for pytorchcv model provider",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="resnet50",
+        help="model to build after import")
+    parser.add_argument(
+        "--num-runs",
+        type=int,
+        default=5,
+        help="number of cold interpreter runs per mode")
+    args = parser.parse_args()
+    return args
+
+
+def measure(code,
+            model):
+    """
+    Run the code in a fresh interpreter with `-X importtime`.
+
+    Parameters:
+    ----------
+    code : str
+        Code template to run.
+    model : str
+        Model name.
+
+    Returns
+    -------
+    tuple of (float, float, int, int)
+        Wall time (sec), summed self import time (sec), summed self import time of pytorchcv modules (sec), and number
+        of imported pytorchcv model modules.
+    """
+    root_dir_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    tic = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code.format(model=model)],
+        cwd=root_dir_path,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True)
+    wall_time = time.time() - tic
+    total_us = 0
+    own_us = 0
+    model_module_count = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, module_name = line[len("import time:"):].split("|")
+        self_us = int(self_us)
+        module_name = module_name.strip()
+        total_us += self_us
+        if module_name.startswith("pytorch.pytorchcv"):
+            own_us += self_us
+            if module_name.startswith("pytorch.pytorchcv.models."):
+                model_module_count += 1
+    return wall_time, total_us * 1e-6, own_us * 1e-6, model_module_count
+
+
+def main():
+    args = parse_args()
+    for mode, code in (("eager", EAGER_CODE), ("lazy", LAZY_CODE)):
+        results = [measure(code, args.model) for _ in range(args.num_runs)]
+        wall_time, total_time, own_time, model_module_count = [min(x) for x in zip(*results)]
+        print("{:>5}: wall={:.3f} sec, imports={:.3f} sec, pytorchcv imports={:.3f} sec, model modules={}".format(
+            mode, wall_time, total_time, own_time, model_module_count))
+
+
+if __name__ == "__main__":
+    main()
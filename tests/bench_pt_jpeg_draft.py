@@ -0,0 +1,130 @@
+"""
+    Benchmark for reduced-resolution JPEG decoding (`--use-jpeg-draft`) in ImageNet-1K train/val transforms: per-image
+    decode+transform latency with full and draft decoding, and the difference of the results (the same random crop
+    parameters are used for both training variants). For a model, prediction agreement and Top-1 error on validation
+    data are reported. If no dataset is given, a small synthetic one of large JPEG images is generated.
+    Run from the repository root: python -m tests.bench_pt_jpeg_draft --data-dir ../imgclsmob_data/imagenet
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import cv2
+import torch
+from PIL import Image
+from pytorch.dataset_utils import get_dataset_metainfo
+from pytorch.utils import prepare_model
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Reduced-resolution JPEG decoding benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default="",
+        help="path to ImageNet-1K dataset with train/val image folders (a synthetic dataset is generated if empty)")
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        nargs=2,
+        default=(768, 1024),
+        help="height and width of synthetic images")
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=128,
+        help="number of images to process")
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="",
+        help="model for prediction parity (skipped if empty)")
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default="",
+        help="model weights file")
+    args = parser.parse_args()
+    return args
+
+
+def create_synthetic_dataset(dir_path,
+                             num_images,
+                             image_size,
+                             num_classes=10):
+    """
+    Create a synthetic image folder dataset (train and val) with smooth JPEG images.
+    """
+    rng = np.random.RandomState(0)
+    h, w = image_size
+    for split in ("train", "val"):
+        for i in range(num_images):
+            class_dir_path = os.path.join(dir_path, split, "n{:08d}".format(i % num_classes))
+            if not os.path.exists(class_dir_path):
+                os.makedirs(class_dir_path)
+            img = cv2.resize(rng.randint(0, 256, (h // 16, w // 16, 3)).astype(np.uint8), (w, h),
+                             interpolation=cv2.INTER_CUBIC)
+            Image.fromarray(img).save(os.path.join(class_dir_path, "{:06d}.JPEG".format(i)), quality=90)
+
+
+def get_dataset(data_dir_path,
+                mode,
+                use_jpeg_draft):
+    ds_metainfo = get_dataset_metainfo(dataset_name="ImageNet1K")
+    parser = argparse.ArgumentParser()
+    ds_metainfo.add_dataset_parser_arguments(parser, "")
+    ds_metainfo.update(parser.parse_args(["--data-dir", data_dir_path] + (["--use-jpeg-draft"] if use_jpeg_draft else [])))
+    transform = ds_metainfo.train_transform if mode == "train" else ds_metainfo.val_transform
+    return ds_metainfo.dataset_class(
+        root=ds_metainfo.root_dir_path,
+        mode=mode,
+        transform=transform(ds_metainfo=ds_metainfo))
+
+
+def main():
+    args = parse_args()
+    data_dir_path = args.data_dir
+    if not data_dir_path:
+        data_dir_path = tempfile.mkdtemp()
+        create_synthetic_dataset(data_dir_path, args.num_images, args.image_size)
+
+    net = None
+    if args.model:
+        net = prepare_model(args.model, use_pretrained=False, pretrained_model_file_path=args.resume, use_cuda=False)
+        net.eval()
+
+    for mode in ("train", "val"):
+        ref_images = None
+        ref_preds = None
+        for use_jpeg_draft in (False, True):
+            dataset = get_dataset(data_dir_path, mode, use_jpeg_draft)
+            num_images = min(args.num_images, len(dataset))
+            samples = []
+            tic = time.time()
+            for i in range(num_images):
+                torch.manual_seed(i)
+                samples.append(dataset[i])
+            latency = (time.time() - tic) / num_images * 1000.0
+            images = torch.stack([x for x, _ in samples])
+            labels = torch.tensor([y for _, y in samples])
+            if ref_images is None:
+                ref_images = images
+            diff = (images - ref_images).abs()
+            msg = "{:>5}, draft={}: {:.2f} ms/image, diff with full decoding: mean={:.4f}, max={:.4f}".format(
+                mode, use_jpeg_draft, latency, float(diff.mean()), float(diff.max()))
+            if (net is not None) and (mode == "val"):
+                with torch.no_grad():
+                    preds = torch.cat([net(x).argmax(dim=1) for x in images.split(32)])
+                if ref_preds is None:
+                    ref_preds = preds
+                msg += ", agreement={:.4f}, top1 err={:.4f}".format(
+                    float((preds == ref_preds).float().mean()), float((preds != labels).float().mean()))
+            print(msg)
+
+
+if __name__ == "__main__":
+    main()
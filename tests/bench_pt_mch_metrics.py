@@ -0,0 +1,192 @@
+"""
+    Benchmark for image matching metrics: the batched engine from `pytorch/mch_metrics.py` versus the former per-pair
+    NumPy repeatability of `eval_pt_mch.py` (kept here as a reference), on random point sets with known homographies.
+    Repeatability values are also checked for equality.
+    Run from the repository root: python -m tests.bench_pt_mch_metrics --num-points 300 2000
+"""
+
+import time
+import argparse
+import numpy as np
+import torch
+from pytorch.mch_metrics import calc_matching_metrics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Image matching metrics benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--num-pairs",
+        type=int,
+        default=100,
+        help="number of image pairs")
+    parser.add_argument(
+        "--num-points",
+        type=int,
+        nargs="+",
+        default=(300, 2000),
+        help="numbers of points per image to check")
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        nargs=2,
+        default=(480, 640),
+        help="image height and width")
+    parser.add_argument(
+        "--max-elements",
+        type=int,
+        default=(1 << 22),
+        help="maximal number of elements in a distance matrix chunk")
+    args = parser.parse_args()
+    return args
+
+
+def warp_keypoints(src_pts, homography):
+    src_hmg_pts = np.concatenate([src_pts, np.ones((src_pts.shape[0], 1))], axis=1)
+    dst_hmg_pts = np.dot(src_hmg_pts, np.transpose(homography))
+    dst_pts = dst_hmg_pts[:, :2] / dst_hmg_pts[:, 2:]
+    return dst_pts
+
+
+def calc_filter_mask(pts, shape):
+    mask = (pts[:, 0] >= 0) & (pts[:, 0] < shape[0]) & (pts[:, 1] >= 0) & (pts[:, 1] < shape[1])
+    return mask
+
+
+def select_k_best(pts,
+                  confs,
+                  max_count=300):
+    inds = confs.argsort()[::-1][:max_count]
+    return pts[inds, :], confs[inds]
+
+
+def calc_repeatability_np(src_pts,
+                          src_confs,
+                          dst_pts,
+                          dst_confs,
+                          homography,
+                          src_shape,
+                          dst_shape,
+                          distance_thresh=3):
+
+    pred_src_pts = warp_keypoints(dst_pts[:, [1, 0]], np.linalg.inv(homography))[:, [1, 0]]
+    pred_src_mask = calc_filter_mask(pred_src_pts, src_shape)
+    label_dst_pts, label_dst_confs = dst_pts[pred_src_mask, :], dst_confs[pred_src_mask]
+
+    pred_dst_pts = warp_keypoints(src_pts[:, [1, 0]], homography)[:, [1, 0]]
+    pred_dst_mask = calc_filter_mask(pred_dst_pts, dst_shape)
+    pred_dst_pts, pred_dst_confs = pred_dst_pts[pred_dst_mask, :], src_confs[pred_dst_mask]
+
+    label_dst_pts, label_dst_confs = select_k_best(label_dst_pts, label_dst_confs)
+    pred_dst_pts, pred_dst_confs = select_k_best(pred_dst_pts, pred_dst_confs)
+
+    n_pred = pred_dst_pts.shape[0]
+    n_label = label_dst_pts.shape[0]
+
+    label_dst_pts = np.stack([label_dst_pts[:, 0], label_dst_pts[:, 1], label_dst_confs], axis=1)
+    pred_dst_pts = np.stack([pred_dst_pts[:, 0], pred_dst_pts[:, 1], pred_dst_confs], axis=1)
+
+    pred_dst_pts = np.expand_dims(pred_dst_pts, 1)
+    label_dst_pts = np.expand_dims(label_dst_pts, 0)
+    norm = np.linalg.norm(pred_dst_pts - label_dst_pts, ord=None, axis=2)
+
+    count1 = 0
+    count2 = 0
+    if n_label != 0:
+        min1 = np.min(norm, axis=1)
+        count1 = np.sum(min1 <= distance_thresh)
+    if n_pred != 0:
+        min2 = np.min(norm, axis=0)
+        count2 = np.sum(min2 <= distance_thresh)
+    if n_pred + n_label > 0:
+        repeatability = (count1 + count2) / (n_pred + n_label)
+    else:
+        repeatability = 0
+
+    return n_pred, n_label, repeatability
+
+
+def generate_pairs(num_pairs,
+                   num_points,
+                   image_size,
+                   rng):
+    """
+    Generate random point sets (row, col) for image pairs related by small random homographies (acting on (x, y)).
+    """
+    pairs = []
+    shape = np.array(image_size, np.float64)
+    for _ in range(num_pairs):
+        homography = np.eye(3)
+        homography[:2, :2] += rng.uniform(-0.05, 0.05, (2, 2))
+        homography[:2, 2] = rng.uniform(-20, 20, 2)
+        homography[2, :2] = rng.uniform(-1e-5, 1e-5, 2)
+        src_pts = np.round(rng.uniform(0, 1, (num_points, 2)) * (shape - 1))
+        src_hmg_pts = np.concatenate([src_pts[:, [1, 0]], np.ones((num_points, 1))], axis=1).dot(homography.T)
+        dst_pts = src_hmg_pts[:, [1, 0]] / src_hmg_pts[:, 2:]
+        dst_pts = np.round(dst_pts + rng.normal(0, 1.5, (num_points, 2)))
+        dst_pts = np.clip(dst_pts, 0, shape - 1)
+        src_confs = rng.uniform(0.015, 1.0, num_points)
+        dst_confs = np.clip(src_confs + rng.normal(0, 0.01, num_points), 0.015, 1.0)
+        descs = rng.normal(0, 1, (num_points, 256))
+        src_descs = descs / np.linalg.norm(descs, axis=1, keepdims=True)
+        dst_descs = descs + rng.normal(0, 0.3, descs.shape)
+        dst_descs /= np.linalg.norm(dst_descs, axis=1, keepdims=True)
+        pairs.append((src_pts, src_confs, src_descs, dst_pts, dst_confs, dst_descs, homography))
+    return pairs
+
+
+def main():
+    args = parse_args()
+    rng = np.random.RandomState(0)
+    image_size = tuple(args.image_size)
+
+    for num_points in args.num_points:
+        pairs = generate_pairs(args.num_pairs, num_points, image_size, rng)
+
+        tic = time.time()
+        ref_values = np.array([calc_repeatability_np(
+            src_pts, src_confs, dst_pts, dst_confs, homography, image_size, image_size)[2]
+            for src_pts, src_confs, _, dst_pts, dst_confs, _, homography in pairs])
+        ref_time = time.time() - tic
+
+        tensors = [[torch.from_numpy(x).float() if x.ndim == 2 and x.shape[1] == 256 else torch.from_numpy(x)
+                    for x in pair[:6]] for pair in pairs]
+        tic = time.time()
+        metrics = calc_matching_metrics(
+            src_pts_list=[x[0] for x in tensors],
+            src_confs_list=[x[1] for x in tensors],
+            src_descs_list=None,
+            dst_pts_list=[x[3] for x in tensors],
+            dst_confs_list=[x[4] for x in tensors],
+            dst_descs_list=None,
+            homographies=[pair[6] for pair in pairs],
+            src_shapes=[image_size] * len(pairs),
+            dst_shapes=[image_size] * len(pairs),
+            max_elements=args.max_elements)
+        batched_time = time.time() - tic
+
+        tic = time.time()
+        full_metrics = calc_matching_metrics(
+            src_pts_list=[x[0] for x in tensors],
+            src_confs_list=[x[1] for x in tensors],
+            src_descs_list=[x[2] for x in tensors],
+            dst_pts_list=[x[3] for x in tensors],
+            dst_confs_list=[x[4] for x in tensors],
+            dst_descs_list=[x[5] for x in tensors],
+            homographies=[pair[6] for pair in pairs],
+            src_shapes=[image_size] * len(pairs),
+            dst_shapes=[image_size] * len(pairs),
+            max_elements=args.max_elements)
+        full_time = time.time() - tic
+
+        print("points={}: repeatability NumPy={:.3f} sec, batched={:.3f} sec (speedup {:.1f}x), equal={}; "
+              "all metrics={:.3f} sec (repeatability={:.4f}, MNN precision={:.4f}, homography accuracy={:.4f})".format(
+                  num_points, ref_time, batched_time, ref_time / batched_time,
+                  np.allclose(ref_values, metrics["repeatability"]), full_time,
+                  full_metrics["repeatability"].mean(), full_metrics["matching_precision"].mean(),
+                  full_metrics["homography_accuracy"].mean()))
+
+
+if __name__ == "__main__":
+    main()
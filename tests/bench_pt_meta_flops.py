@@ -0,0 +1,72 @@
+"""
+    Benchmark for shape-only FLOPs counting (`measure_model(..., use_meta=True)`): counting time with a real forward
+    pass versus a pass on the meta device (with the model created on the meta device too), and the equality of the
+    counts.
+    Run from the repository root: python -m tests.bench_pt_meta_flops --models resnet50 deeplabv3_resnetd50b_cityscapes
+"""
+
+import time
+import argparse
+import torch
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.model_stats import measure_model
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Shape-only FLOPs counting benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        nargs="+",
+        default=["resnet50", "mobilenetv3_large_w1", "deeplabv3_resnetd50b_cityscapes"],
+        help="models to count")
+    parser.add_argument(
+        "--in-size",
+        type=int,
+        nargs=2,
+        default=None,
+        help="spatial size of the input (the model input size by default)")
+    parser.add_argument(
+        "--skip-real",
+        action="store_true",
+        help="count only on the meta device (for sizes that don't fit in memory)")
+    args = parser.parse_args()
+    return args
+
+
+def create_model(model_name,
+                 in_size):
+    kwargs = {"pretrained": False}
+    if "_cityscapes" in model_name:
+        kwargs["aux"] = False
+        if in_size is not None:
+            kwargs["in_size"] = in_size
+    return get_model(model_name, **kwargs)
+
+
+def main():
+    args = parse_args()
+    for model_name in args.models:
+        in_size = tuple(args.in_size) if args.in_size else None
+        tic = time.time()
+        with torch.device("meta"):
+            net = create_model(model_name, in_size)
+        in_size = in_size if in_size else net.in_size
+        meta_stats = measure_model(net, in_channels=3, in_size=in_size, use_meta=True)
+        meta_time = time.time() - tic
+        msg = "{} {}: meta {:.2f} sec, FLOPs={}, MACs={}, params={}".format(
+            model_name, in_size, meta_time, *meta_stats)
+
+        if not args.skip_real:
+            tic = time.time()
+            net = create_model(model_name, in_size)
+            real_stats = measure_model(net, in_channels=3, in_size=in_size)
+            real_time = time.time() - tic
+            msg += "; real {:.2f} sec, equal={}".format(real_time, real_stats == meta_stats)
+        print(msg)
+
+
+if __name__ == "__main__":
+    main()
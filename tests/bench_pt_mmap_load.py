@@ -0,0 +1,130 @@
+"""
+    Benchmark for loading model weights: `torch.load` + `load_state_dict` from `.pth` versus zero-copy loading from
+    a memory-mapped flat tensor file. Several worker processes load the same file at once, and each reports the load
+    time, the peak RSS, and (after one forward pass, while all workers are alive) the proportional set size and the
+    private dirty memory.
+    Run from the repository root: python -m tests.bench_pt_mmap_load --models resnet152 vgg19
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+CHILD_CODE = """
+import sys, json, time, resource, torch
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.pytorchcv.models.model_store import load_model, load_model_mmap
+
+def smaps_mb(field):
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024.0
+    return float("nan")
+
+net = get_model("{model}")
+net.eval()
+tic = time.time()
+if "{mode}" == "mmap":
+    load_model_mmap(net, "{file_path}")
+else:
+    load_model(net, "{file_path}")
+load_time = time.time() - tic
+with torch.no_grad():
+    net(torch.zeros(1, 3, {input_size}, {input_size}))
+print("ready")
+sys.stdout.flush()
+sys.stdin.readline()
+print(json.dumps({{
+    "load_time": load_time,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    "pss_mb": smaps_mb("Pss"),
+    "private_mb": smaps_mb("Private_Dirty")}}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Weight loading benchmark for pytorchcv models",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        nargs="+",
+        default=("resnet152", "vgg19"),
+        help="models to check (random weights are saved if --pth-files are not given)")
+    parser.add_argument(
+        "--pth-files",
+        type=str,
+        nargs="*",
+        default=(),
+        help="existing .pth files for the models")
+    parser.add_argument(
+        "--num-procs",
+        type=int,
+        default=2,
+        help="number of concurrent worker processes")
+    parser.add_argument(
+        "--input-size",
+        type=int,
+        default=224,
+        help="input image size for the forward pass")
+    args = parser.parse_args()
+    return args
+
+
+def run_children(model,
+                 mode,
+                 file_path,
+                 input_size,
+                 num_procs):
+    """
+    Run worker processes that load the same file, and collect their mean statistics.
+    """
+    root_dir_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = CHILD_CODE.format(model=model, mode=mode, file_path=file_path, input_size=input_size)
+    procs = [subprocess.Popen(
+        [sys.executable, "-c", code],
+        cwd=root_dir_path,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        universal_newlines=True) for _ in range(num_procs)]
+    for proc in procs:
+        assert (proc.stdout.readline().strip() == "ready")
+    results = []
+    for proc in procs:
+        proc.stdin.write("\n")
+        proc.stdin.flush()
+        results.append(json.loads(proc.stdout.readline()))
+    for proc in procs:
+        proc.wait()
+    return {key: sum(res[key] for res in results) / len(results) for key in results[0]}
+
+
+def main():
+    args = parse_args()
+    import torch
+    from pytorch.pytorchcv.model_provider import get_model
+    from pytorch.pytorchcv.models.model_store import convert_model_file_to_mmap
+
+    tmp_dir_path = tempfile.mkdtemp()
+    for i, model in enumerate(args.models):
+        if i < len(args.pth_files):
+            pth_file_path = args.pth_files[i]
+        else:
+            pth_file_path = os.path.join(tmp_dir_path, model + ".pth")
+            torch.save(get_model(model).state_dict(), pth_file_path)
+        mmap_file_path = convert_model_file_to_mmap(pth_file_path, os.path.join(tmp_dir_path, model + ".mmap"))
+        size_mb = os.path.getsize(mmap_file_path) / 1024.0 / 1024.0
+        for mode, file_path in (("pth", pth_file_path), ("mmap", mmap_file_path)):
+            res = run_children(model, mode, file_path, args.input_size, args.num_procs)
+            print("{model} ({size:.0f} MB), {mode:>4}, per process: load={load_time:.3f} sec, peak RSS={peak_rss_mb:.0f} "
+                  "MB, PSS={pss_mb:.0f} MB, private dirty={private_mb:.0f} MB".format(
+                      model=model, size=size_mb, mode=mode, **res))
+
+
+if __name__ == "__main__":
+    main()
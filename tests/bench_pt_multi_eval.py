@@ -0,0 +1,116 @@
+"""
+    Benchmark for multi-model evaluation (`eval_pt.py --models`): total time of evaluation of several models with one
+    data pass per model versus one shared data pass (`validate_models`), and the equality of predictions. Random
+    weights are used. If no dataset is given, a small synthetic one is generated.
+    Run from the repository root: python -m tests.bench_pt_multi_eval --data-dir ../imgclsmob_data/imagenet
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import torch
+from pytorch.metric import EvalMetric
+from pytorch.dataset_utils import get_dataset_metainfo, get_val_data_source
+from pytorch.utils import prepare_model, validate, validate_models
+from tests.bench_pt_imagenet_shards import create_synthetic_dataset
+
+
+class PredictionRecorder(EvalMetric):
+    """
+    Metric that records predicted classes.
+    """
+    def __init__(self):
+        super(PredictionRecorder, self).__init__(name="preds")
+
+    def reset(self):
+        self.num_inst = 0
+        self.sum_metric = 0.0
+        self.preds = []
+
+    def update(self, labels, preds):
+        self.preds.append(preds.argmax(dim=1).cpu())
+        self.num_inst += len(labels)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Multi-model evaluation benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default="",
+        help="path to ImageNet-1K dataset with the val image folder (a synthetic dataset is generated if empty)")
+    parser.add_argument(
+        "--models",
+        type=str,
+        nargs="+",
+        default=["resnet10", "resnet12", "resnet14", "resnet18"],
+        help="models to evaluate")
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=512,
+        help="number of synthetic images")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="batch size")
+    parser.add_argument(
+        "-j",
+        "--num-data-workers",
+        dest="num_workers",
+        type=int,
+        default=2,
+        help="number of preprocessing workers")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    data_dir_path = args.data_dir
+    if not data_dir_path:
+        data_dir_path = tempfile.mkdtemp()
+        create_synthetic_dataset(data_dir_path, args.num_images)
+        os.rename(os.path.join(data_dir_path, "train"), os.path.join(data_dir_path, "val"))
+    ds_metainfo = get_dataset_metainfo(dataset_name="ImageNet1K")
+    parser = argparse.ArgumentParser()
+    ds_metainfo.add_dataset_parser_arguments(parser, "")
+    ds_metainfo.update(parser.parse_args(["--data-dir", data_dir_path]))
+
+    torch.manual_seed(0)
+    nets = [prepare_model(name, use_pretrained=False, pretrained_model_file_path="", use_cuda=False)
+            for name in args.models]
+
+    separate_metrics = [PredictionRecorder() for _ in nets]
+    tic = time.time()
+    for net, metric in zip(nets, separate_metrics):
+        val_data = get_val_data_source(
+            ds_metainfo=ds_metainfo,
+            batch_size=args.batch_size,
+            num_workers=args.num_workers)
+        validate(metric=metric, net=net, val_data=val_data, use_cuda=False)
+    separate_time = time.time() - tic
+    print("separate passes: {:.2f} sec".format(separate_time))
+
+    shared_metrics = [PredictionRecorder() for _ in nets]
+    tic = time.time()
+    val_data = get_val_data_source(
+        ds_metainfo=ds_metainfo,
+        batch_size=args.batch_size,
+        num_workers=args.num_workers)
+    forward_times = validate_models(metrics=shared_metrics, nets=nets, val_data=val_data, use_cuda=False)
+    shared_time = time.time() - tic
+    print("shared pass: {:.2f} sec (forward {:.2f} sec), speedup={:.2f}".format(
+        shared_time, sum(forward_times), separate_time / shared_time))
+
+    for name, separate_metric, shared_metric in zip(args.models, separate_metrics, shared_metrics):
+        print("{}: equal predictions={}".format(
+            name, torch.equal(torch.cat(separate_metric.preds), torch.cat(shared_metric.preds))))
+
+
+if __name__ == "__main__":
+    main()
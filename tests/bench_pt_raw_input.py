@@ -0,0 +1,97 @@
+"""
+    Benchmark for raw uint8 input (`--raw-input`): host-side validation preprocessing speed and batch size in bytes for
+    the normalized float pipeline and the raw one, and the output difference of the model with the input normalization
+    folded into it (`RawInputNet`). If no dataset is given, a small synthetic one is generated.
+    Run from the repository root: python -m tests.bench_pt_raw_input --data-dir ../imgclsmob_data/imagenet
+"""
+
+import os
+import copy
+import time
+import argparse
+import tempfile
+import torch
+from pytorch.dataset_utils import get_dataset_metainfo, get_val_data_source
+from pytorch.utils import prepare_model
+from pytorch.pytorchcv.models.fusion import RawInputNet
+from tests.bench_pt_imagenet_shards import create_synthetic_dataset
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Raw uint8 input benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default="",
+        help="path to ImageNet-1K dataset with the val image folder (a synthetic dataset is generated if empty)")
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="resnet18",
+        help="model to check")
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=512,
+        help="number of synthetic images")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="batch size")
+    parser.add_argument(
+        "-j",
+        "--num-data-workers",
+        dest="num_workers",
+        type=int,
+        default=0,
+        help="number of preprocessing workers")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    data_dir_path = args.data_dir
+    if not data_dir_path:
+        data_dir_path = tempfile.mkdtemp()
+        create_synthetic_dataset(data_dir_path, args.num_images)
+        os.rename(os.path.join(data_dir_path, "train"), os.path.join(data_dir_path, "val"))
+    torch.manual_seed(0)
+    net = prepare_model(args.model, use_pretrained=False, pretrained_model_file_path="", use_cuda=False)
+
+    outputs = []
+    for raw_input in (False, True):
+        ds_metainfo = get_dataset_metainfo(dataset_name="ImageNet1K")
+        parser = argparse.ArgumentParser()
+        ds_metainfo.add_dataset_parser_arguments(parser, "")
+        ds_metainfo.update(parser.parse_args(["--data-dir", data_dir_path] + (["--raw-input"] if raw_input else [])))
+        val_data = get_val_data_source(
+            ds_metainfo=ds_metainfo,
+            batch_size=args.batch_size,
+            num_workers=args.num_workers)
+
+        num_images = 0
+        num_bytes = 0
+        tic = time.time()
+        for data, _ in val_data:
+            num_images += data.shape[0]
+            num_bytes += data.element_size() * data.numel()
+        speed = num_images / (time.time() - tic)
+        print("raw input={}: {:.1f} images/sec, {:.1f} KB per image".format(
+            raw_input, speed, num_bytes / num_images / 1024.0))
+
+        if raw_input:
+            model = RawInputNet(copy.deepcopy(net), ds_metainfo.mean_rgb, ds_metainfo.std_rgb)
+        else:
+            model = net
+        model.eval()
+        with torch.no_grad():
+            outputs.append(torch.cat([model(data) for data, _ in val_data]))
+    print("max output difference: {:.2e}".format(float((outputs[0] - outputs[1]).abs().max())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+    Benchmark for sharded multi-process CPU evaluation (`eval_pt.py --num-shards`): evaluation time and metric values
+    for several numbers of shards. Random weights are used. If no dataset is given, a small synthetic one is generated.
+    Run from the repository root: python -m tests.bench_pt_sharded_eval --data-dir ../imgclsmob_data/imagenet
+"""
+
+import os
+import time
+import argparse
+import functools
+import tempfile
+import torch
+from pytorch.dataset_utils import get_dataset_metainfo, get_val_data_source
+from pytorch.utils import prepare_model, get_composite_metric, validate, validate_sharded
+from tests.bench_pt_imagenet_shards import create_synthetic_dataset
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Sharded CPU evaluation benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default="",
+        help="path to ImageNet-1K dataset with the val image folder (a synthetic dataset is generated if empty)")
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="resnet18",
+        help="model to evaluate")
+    parser.add_argument(
+        "--num-shards",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="numbers of shards to check")
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=256,
+        help="number of synthetic images")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=32,
+        help="batch size")
+    parser.add_argument(
+        "--num-repeats",
+        type=int,
+        default=1,
+        help="number of evaluations for each number of shards (to catch intermittent failures)")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    data_dir_path = args.data_dir
+    if not data_dir_path:
+        data_dir_path = tempfile.mkdtemp()
+        create_synthetic_dataset(data_dir_path, args.num_images)
+        os.rename(os.path.join(data_dir_path, "train"), os.path.join(data_dir_path, "val"))
+    ds_metainfo = get_dataset_metainfo(dataset_name="ImageNet1K")
+    parser = argparse.ArgumentParser()
+    ds_metainfo.add_dataset_parser_arguments(parser, "")
+    ds_metainfo.update(parser.parse_args(["--data-dir", data_dir_path, "--num-classes", "10"]))
+
+    torch.manual_seed(0)
+    net = prepare_model(args.model, use_pretrained=False, pretrained_model_file_path="", use_cuda=False,
+                        num_classes=ds_metainfo.num_classes)
+    get_data_source = functools.partial(
+        get_val_data_source,
+        ds_metainfo=ds_metainfo,
+        batch_size=args.batch_size,
+        num_workers=0)
+
+    print("CPU threads: {}".format(torch.get_num_threads()))
+    for num_shards in args.num_shards:
+        for _ in range(args.num_repeats):
+            metric = get_composite_metric(
+                metric_names=ds_metainfo.val_metric_names,
+                metric_extra_kwargs=ds_metainfo.val_metric_extra_kwargs)
+            tic = time.time()
+            if num_shards > 1:
+                validate_sharded(metric=metric, net=net, get_data_source=get_data_source, num_shards=num_shards)
+            else:
+                validate(metric=metric, net=net, val_data=get_data_source(), use_cuda=False)
+            print("shards={}: {:.2f} sec, {}".format(num_shards, time.time() - tic, metric.get()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+    Benchmark for the step-time breakdown (`train_pt.py --step-timing`): time of training steps with the step timer
+    disabled, enabled, and enabled with the Chrome trace, i.e. the instrumentation overhead per step. Random weights
+    and data are used.
+    Run from the repository root: python -m tests.bench_pt_step_timer --model resnet18
+"""
+
+import os
+import time
+import json
+import argparse
+import tempfile
+import torch
+from common.step_timer import StepTimer
+from pytorch.utils import prepare_model
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Step-time breakdown overhead benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="resnet18",
+        help="model to train")
+    parser.add_argument(
+        "--num-batches",
+        type=int,
+        default=10,
+        help="number of batches")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=4,
+        help="batch size")
+    parser.add_argument(
+        "--input-size",
+        type=int,
+        default=224,
+        help="size of the input")
+    args = parser.parse_args()
+    return args
+
+
+def train_steps(net,
+                optimizer,
+                batches,
+                step_timer):
+    loss_func = torch.nn.CrossEntropyLoss()
+    tic = time.time()
+    for data, target in step_timer.iter(batches, category="train"):
+        step_timer.lap("h2d")
+        output = net(data)
+        loss = loss_func(output, target)
+        step_timer.lap("forward")
+        loss.backward()
+        step_timer.lap("backward")
+        optimizer.step()
+        optimizer.zero_grad()
+        step_timer.lap("optimizer")
+    return time.time() - tic
+
+
+def main():
+    args = parse_args()
+    torch.manual_seed(0)
+    net = prepare_model(args.model, use_pretrained=False, pretrained_model_file_path="", use_cuda=False)
+    optimizer = torch.optim.SGD(net.parameters(), lr=0.01)
+    batches = [(torch.randn(args.batch_size, 3, args.input_size, args.input_size),
+                torch.randint(0, net.num_classes, (args.batch_size,)))
+               for _ in range(args.num_batches)]
+    trace_file_path = os.path.join(tempfile.mkdtemp(), "trace.json")
+
+    # Warm-up.
+    train_steps(net, optimizer, batches[:2], StepTimer(enabled=False))
+
+    for capt, step_timer in (("disabled", StepTimer(enabled=False)),
+                             ("enabled", StepTimer()),
+                             ("enabled+trace", StepTimer(trace_file_path=trace_file_path))):
+        total_time = train_steps(net, optimizer, batches, step_timer)
+        phase_total = sum(s[6] for s in step_timer.get_summary())
+        step_timer.close()
+        print("{}: {:.2f} ms/step, recorded {:.2f} ms/step".format(
+            capt, total_time / args.num_batches * 1e3, phase_total / args.num_batches * 1e3))
+
+    # Pure bookkeeping cost of one step (5 records and a trace event per record).
+    step_timer = StepTimer(trace_file_path=trace_file_path)
+    num_steps = 10000
+    tic = time.time()
+    for _ in step_timer.iter(range(num_steps)):
+        step_timer.lap("h2d")
+        step_timer.lap("forward")
+        step_timer.lap("backward")
+        step_timer.lap("optimizer")
+    print("bookkeeping: {:.2f} us/step".format((time.time() - tic) / num_steps * 1e6))
+    step_timer.close()
+    with open(trace_file_path, "r") as f:
+        print("trace events: {}".format(len(json.load(f)["traceEvents"])))
+
+
+if __name__ == "__main__":
+    main()
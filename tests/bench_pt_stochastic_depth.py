@@ -0,0 +1,105 @@
+"""
+    Training throughput benchmark for stochastic-depth CIFAR models (ResDrop-ResNet, ShakeDrop-ResNet) with
+    `train_epoch` from `train_pt.py`: dropped residual branches skipped versus calculated and multiplied by zero, for
+    several linear life probability schedules. Synthetic data is used.
+    Run from the repository root: python -m tests.bench_pt_stochastic_depth --final-death-probs 0.0 0.5 0.8
+"""
+
+import time
+import argparse
+import torch
+import torch.nn as nn
+from train_pt import train_epoch
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.cls_metrics import Top1Error
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Training throughput benchmark for stochastic-depth models",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--models",
+        type=str,
+        nargs="+",
+        default=("resdropresnet20_cifar10", "shakedropresnet20_cifar10"),
+        help="models to train")
+    parser.add_argument(
+        "--final-death-probs",
+        type=float,
+        nargs="+",
+        default=(0.0, 0.5, 0.8),
+        help="death probabilities of the last unit (life probabilities decay linearly, 0.5 is the default one)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="batch size")
+    parser.add_argument(
+        "--num-batches",
+        type=int,
+        default=20,
+        help="number of batches per epoch")
+    parser.add_argument(
+        "--num-gpus",
+        type=int,
+        default=0,
+        help="number of gpus to use (0 or 1)")
+    args = parser.parse_args()
+    return args
+
+
+def set_life_probs(net,
+                   final_death_prob):
+    """
+    Set a linear life probability schedule for all stochastic-depth units.
+    """
+    units = [module for module in net.modules() if hasattr(module, "life_prob")]
+    for i, unit in enumerate(units):
+        unit.life_prob = 1.0 - float(i + 1) / float(len(units)) * final_death_prob
+
+
+def main():
+    args = parse_args()
+    use_cuda = (args.num_gpus > 0)
+    torch.manual_seed(0)
+
+    train_data = [(torch.randn(args.batch_size, 3, 32, 32), torch.randint(0, 10, (args.batch_size,)))
+                  for _ in range(args.num_batches)]
+
+    for model in args.models:
+        skip_modes = (False, True) if model.startswith("resdrop") else (None,)
+        for final_death_prob in args.final_death_probs:
+            for skip_dropped in skip_modes:
+                kwargs = {} if skip_dropped is None else {"skip_dropped": skip_dropped}
+                net = get_model(model, **kwargs)
+                set_life_probs(net, final_death_prob)
+                L = nn.CrossEntropyLoss()
+                if use_cuda:
+                    net = net.cuda()
+                    L = L.cuda()
+                optimizer = torch.optim.SGD(params=net.parameters(), lr=0.01, momentum=0.9)
+                epoch_kwargs = dict(
+                    epoch=0,
+                    net=net,
+                    train_metric=Top1Error(),
+                    train_data=train_data,
+                    use_cuda=use_cuda,
+                    L=L,
+                    optimizer=optimizer,
+                    batch_size=args.batch_size,
+                    log_interval=0)
+                train_epoch(**epoch_kwargs)
+                if use_cuda:
+                    torch.cuda.synchronize()
+                tic = time.time()
+                train_epoch(**epoch_kwargs)
+                if use_cuda:
+                    torch.cuda.synchronize()
+                speed = args.batch_size * args.num_batches / (time.time() - tic)
+                print("{}, final death prob={:.2f}, skip dropped={}: {:.1f} samples/sec".format(
+                    model, final_death_prob, skip_dropped, speed))
+
+
+if __name__ == "__main__":
+    main()
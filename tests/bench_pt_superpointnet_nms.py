@@ -0,0 +1,118 @@
+"""
+    Benchmark for SuperPointNet detector NMS: batched max-pooling NMS versus the reference point-by-point loop for
+    several confidence thresholds. Both modes are also checked for equal results, on network heatmaps and on quantized
+    random heatmaps with many tied neighbours.
+    Run from the repository root: python -m tests.bench_pt_superpointnet_nms
+"""
+
+import time
+import argparse
+import torch
+from pytorch.pytorchcv.models.superpointnet import superpointnet
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="SuperPointNet NMS benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=4,
+        help="batch size")
+    parser.add_argument(
+        "--input-size",
+        type=int,
+        nargs=2,
+        default=(480, 640),
+        help="input image height and width")
+    parser.add_argument(
+        "--conf-threshs",
+        type=float,
+        nargs="+",
+        default=(0.015, 0.05, 0.1, 0.2),
+        help="confidence thresholds to check")
+    parser.add_argument(
+        "--num-runs",
+        type=int,
+        default=3,
+        help="number of timed runs per mode")
+    parser.add_argument(
+        "--pretrained",
+        action="store_true",
+        help="use pretrained weights (gives a realistic heatmap)")
+    parser.add_argument(
+        "--tie-levels",
+        type=int,
+        nargs="+",
+        default=(2, 10, 100),
+        help="numbers of confidence levels of quantized heatmaps (for tied confidences)")
+    args = parser.parse_args()
+    return args
+
+
+def time_detector(detector,
+                  x,
+                  num_runs):
+    """
+    Calculate the best detector time and its result.
+    """
+    best_time = float("inf")
+    y = None
+    for _ in range(num_runs):
+        tic = time.time()
+        y = detector(x)
+        best_time = min(best_time, time.time() - tic)
+    return best_time, y
+
+
+def same_points(pts1,
+                confs1,
+                pts2,
+                confs2):
+    """
+    Check that two NMS results are equal (including the order of points with tied confidences).
+    """
+    return torch.equal(confs1, confs2) and torch.equal(pts1, pts2)
+
+
+def same_results(result1,
+                 result2):
+    """
+    Check that two NMS results for a batch are equal.
+    """
+    return all(same_points(*z) for z in zip(result1[0], result1[1], result2[0], result2[1]))
+
+
+def main():
+    args = parse_args()
+    torch.manual_seed(0)
+
+    net = superpointnet(pretrained=args.pretrained)
+    net.eval()
+    x = torch.rand(args.batch_size, 1, args.input_size[0], args.input_size[1])
+    detector = net.detector
+
+    with torch.no_grad():
+        x = net.features(x)
+        for conf_thresh in args.conf_threshs:
+            detector.conf_thresh = conf_thresh
+            detector.batched_nms = False
+            ref_time, (ref_pts_list, ref_confs_list) = time_detector(detector, x, args.num_runs)
+            detector.batched_nms = True
+            batched_time, (pts_list, confs_list) = time_detector(detector, x, args.num_runs)
+            equal = same_results((ref_pts_list, ref_confs_list), (pts_list, confs_list))
+            print("conf_thresh={:.3f}: points/image={:.1f}, reference={:.4f} sec, batched={:.4f} sec, "
+                  "speedup={:.1f}x, equal={}".format(
+                      conf_thresh, sum(len(p) for p in pts_list) / float(len(pts_list)), ref_time, batched_time,
+                      ref_time / batched_time, equal))
+
+        heatmap_shape = (args.batch_size, 1, args.input_size[0], args.input_size[1])
+        for tie_levels in args.tie_levels:
+            heatmap = (torch.rand(heatmap_shape) * tie_levels).ceil() / tie_levels
+            equal = same_results(detector._reference_nms(heatmap.clone()), detector._batched_nms(heatmap.clone()))
+            print("tie levels={}: equal={}".format(tie_levels, equal))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+    Throughput benchmark for `train_epoch` from `train_pt.py` in different modes: float32, mixed precision (autocast
+    with float16/bfloat16), and gradient accumulation (batch size scale). Synthetic data is used.
+    Run from the repository root: python -m tests.bench_pt_train_modes --model resnet20_cifar10 --input-size 32
+"""
+
+import time
+import argparse
+import torch
+import torch.nn as nn
+from train_pt import create_grad_scaler, train_epoch
+from pytorch.pytorchcv.model_provider import get_model
+from pytorch.cls_metrics import Top1Error
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Training throughput benchmark for train_pt.py modes",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="resnet20_cifar10",
+        help="model to train")
+    parser.add_argument(
+        "--input-size",
+        type=int,
+        default=32,
+        help="input image size")
+    parser.add_argument(
+        "--num-classes",
+        type=int,
+        default=10,
+        help="number of classes")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="batch size")
+    parser.add_argument(
+        "--num-batches",
+        type=int,
+        default=20,
+        help="number of batches per epoch")
+    parser.add_argument(
+        "--num-gpus",
+        type=int,
+        default=0,
+        help="number of gpus to use (0 or 1)")
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    use_cuda = (args.num_gpus > 0)
+    torch.manual_seed(0)
+
+    train_data = [(torch.randn(args.batch_size, 3, args.input_size, args.input_size),
+                   torch.randint(0, args.num_classes, (args.batch_size,))) for _ in range(args.num_batches)]
+    modes = [("float32", 1), ("float32", 4), ("bfloat16", 1), ("bfloat16", 4)]
+    if use_cuda:
+        modes += [("float16", 1), ("float16", 4)]
+
+    for dtype, batch_size_scale in modes:
+        net = get_model(args.model, num_classes=args.num_classes)
+        L = nn.CrossEntropyLoss()
+        if use_cuda:
+            net = net.cuda()
+            L = L.cuda()
+        optimizer = torch.optim.SGD(params=net.parameters(), lr=0.01, momentum=0.9)
+        kwargs = dict(
+            epoch=0,
+            net=net,
+            train_metric=Top1Error(),
+            train_data=train_data,
+            use_cuda=use_cuda,
+            L=L,
+            optimizer=optimizer,
+            batch_size=args.batch_size,
+            log_interval=0,
+            dtype=dtype,
+            grad_scaler=create_grad_scaler(dtype, use_cuda),
+            batch_size_scale=batch_size_scale)
+        train_epoch(**kwargs)
+        if use_cuda:
+            torch.cuda.synchronize()
+        tic = time.time()
+        train_loss = train_epoch(**kwargs)
+        if use_cuda:
+            torch.cuda.synchronize()
+        speed = args.batch_size * args.num_batches / (time.time() - tic)
+        print("dtype={:>8}, batch size scale={} (effective batch {:>4}): {:.1f} samples/sec, loss={:.4f}".format(
+            dtype, batch_size_scale, args.batch_size * batch_size_scale, speed, train_loss))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+    Benchmark for the persistent validation cache (`--val-cache-dir`): ImageNet-1K validation data loading time without
+    the cache, with building of the cache (first run), and from the cache (later runs), and the equality of the data.
+    If no dataset is given, a small synthetic one is generated.
+    Run from the repository root: python -m tests.bench_pt_val_cache --data-dir ../imgclsmob_data/imagenet
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import torch
+from pytorch.dataset_utils import get_dataset_metainfo, get_val_data_source
+from tests.bench_pt_imagenet_shards import create_synthetic_dataset
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Validation cache benchmark",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--data-dir",
+        type=str,
+        default="",
+        help="path to ImageNet-1K dataset with the val image folder (a synthetic dataset is generated if empty)")
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default="",
+        help="path to cache directory (a temporary one is used if empty)")
+    parser.add_argument(
+        "--num-images",
+        type=int,
+        default=1000,
+        help="number of synthetic images")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="batch size")
+    parser.add_argument(
+        "-j",
+        "--num-data-workers",
+        dest="num_workers",
+        type=int,
+        default=2,
+        help="number of preprocessing workers")
+    args = parser.parse_args()
+    return args
+
+
+def read_val_data(data_dir_path,
+                  cache_args,
+                  batch_size,
+                  num_workers):
+    """
+    Read the whole validation data.
+    """
+    ds_metainfo = get_dataset_metainfo(dataset_name="ImageNet1K")
+    parser = argparse.ArgumentParser()
+    ds_metainfo.add_dataset_parser_arguments(parser, "")
+    ds_metainfo.update(parser.parse_args(["--data-dir", data_dir_path] + cache_args))
+    tic = time.time()
+    val_data = get_val_data_source(
+        ds_metainfo=ds_metainfo,
+        batch_size=batch_size,
+        num_workers=num_workers)
+    data = torch.cat([x for x, _ in val_data])
+    return data, time.time() - tic
+
+
+def main():
+    args = parse_args()
+    data_dir_path = args.data_dir
+    if not data_dir_path:
+        data_dir_path = tempfile.mkdtemp()
+        create_synthetic_dataset(data_dir_path, args.num_images)
+        os.rename(os.path.join(data_dir_path, "train"), os.path.join(data_dir_path, "val"))
+    cache_dir_path = args.cache_dir if args.cache_dir else tempfile.mkdtemp()
+
+    ref_data, ref_time = read_val_data(data_dir_path, [], args.batch_size, args.num_workers)
+    print("no cache: {:.2f} sec ({:.1f} images/sec)".format(ref_time, len(ref_data) / ref_time))
+    for name in ("cache build", "cached"):
+        data, data_time = read_val_data(
+            data_dir_path, ["--val-cache-dir", cache_dir_path], args.batch_size, args.num_workers)
+        print("{}: {:.2f} sec ({:.1f} images/sec), equal={}".format(
+            name, data_time, len(data) / data_time, torch.equal(data, ref_data)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+    Test for the packed-shard ImageNet-1K loader (`ImageNet1KShards`) in distributed training mode: all processes must
+    get the same number of batches with several data loader workers (otherwise DDP hangs on the extra step).
+    Run from the repository root: python -m pytest tests/test_pt_imagenet_shards.py
+"""
+
+import os
+import json
+import math
+import tempfile
+from torch.utils.data import DataLoader
+from torchvision import transforms
+from pytorch.datasets.imagenet1k_shard_cls_dataset import ImageNet1KShards, convert_image_folder_to_shards
+from tests.bench_pt_imagenet_shards import create_synthetic_dataset
+
+
+def create_dataset(root,
+                   rank,
+                   num_replicas,
+                   num_workers,
+                   transform=None):
+    dataset = ImageNet1KShards(root=root, mode="train", transform=transform)
+    dataset.rank, dataset.num_replicas = rank, num_replicas
+    dataset.set_num_workers(num_workers)
+    return dataset
+
+
+def test_rank_batch_counts_by_index():
+    """
+    Per-process batch counts for the ImageNet-1K shard layout (1251 shards), computed from worker parts as the data
+    loader batches them (each worker yields its own partial last batch).
+    """
+    root = tempfile.mkdtemp()
+    shard_sizes = [1024] * 1250 + [1167]
+    with open(os.path.join(root, "train.json"), "w") as f:
+        json.dump({"classes": [], "shards": [{"num_samples": n} for n in shard_sizes]}, f)
+    batch_size = 256
+    for num_replicas, num_workers in ((8, 4), (8, 3), (3, 4), (64, 2)):
+        datasets = [create_dataset(root, rank, num_replicas, num_workers) for rank in range(num_replicas)]
+        for epoch in range(30):
+            batch_counts = set()
+            sample_counts = set()
+            for dataset in datasets:
+                dataset.set_epoch(epoch)
+                worker_parts = dataset._get_worker_parts(num_workers)
+                worker_counts = [sum(c for _, _, c in part) for part in worker_parts]
+                batch_counts.add(sum(int(math.ceil(c / batch_size)) for c in worker_counts))
+                sample_counts.add(len(dataset))
+            assert (len(batch_counts) == 1), (num_replicas, num_workers, epoch, batch_counts)
+            assert (len(sample_counts) == 1)
+
+
+def test_rank_batch_counts_data_loader():
+    """
+    Per-process batch counts of real data loaders with several workers over small synthetic shards.
+    """
+    data_dir_path = tempfile.mkdtemp()
+    shard_dir_path = tempfile.mkdtemp()
+    create_synthetic_dataset(data_dir_path, num_images=157)
+    convert_image_folder_to_shards(data_dir_path, shard_dir_path, split="train", samples_per_shard=10)
+    transform = transforms.Compose([transforms.Resize(8), transforms.CenterCrop(8), transforms.ToTensor()])
+    num_replicas, num_workers, batch_size = 3, 2, 4
+    for epoch in range(3):
+        batch_counts = []
+        for rank in range(num_replicas):
+            dataset = create_dataset(shard_dir_path, rank, num_replicas, num_workers, transform)
+            dataset.set_epoch(epoch)
+            data_loader = DataLoader(dataset=dataset, batch_size=batch_size, num_workers=num_workers)
+            num_samples = 0
+            num_batches = 0
+            for data, _ in data_loader:
+                num_samples += data.shape[0]
+                num_batches += 1
+            assert (num_samples == len(dataset))
+            batch_counts.append(num_batches)
+        assert (len(set(batch_counts)) == 1), (epoch, batch_counts)
+
+
+if __name__ == "__main__":
+    test_rank_batch_counts_by_index()
+    test_rank_batch_counts_data_loader()
+    print("OK")
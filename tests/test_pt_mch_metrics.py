@@ -0,0 +1,45 @@
+"""
+    Test for image matching metrics (`pytorch/mch_metrics.py`): detector points are (row, col), while HPatches
+    homographies act on (x, y), so a pure horizontal shift must move points along columns.
+    Run from the repository root: python -m pytest tests/test_pt_mch_metrics.py
+"""
+
+import numpy as np
+import torch
+from pytorch.mch_metrics import calc_matching_metrics
+
+
+def test_x_translation():
+    """
+    Pairs of non-square images related by a pure x-translation, with destination points equal to the source points
+    shifted by the same number of columns.
+    """
+    rng = np.random.RandomState(0)
+    shift = 16
+    homography = np.array([[1.0, 0.0, shift], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    shape = (240, 320)
+    num_points = 200
+    rows = rng.randint(0, shape[0], num_points)
+    cols = rng.randint(0, shape[1] - shift, num_points)
+    src_pts = torch.from_numpy(np.stack([rows, cols], axis=1).astype(np.float32))
+    dst_pts = src_pts + torch.tensor([0.0, float(shift)])
+    confs = torch.from_numpy(rng.uniform(0.1, 1.0, num_points).astype(np.float32))
+    descs = torch.nn.functional.normalize(torch.randn(num_points, 256), dim=1)
+    metrics = calc_matching_metrics(
+        src_pts_list=[src_pts],
+        src_confs_list=[confs],
+        src_descs_list=[descs],
+        dst_pts_list=[dst_pts],
+        dst_confs_list=[confs],
+        dst_descs_list=[descs],
+        homographies=[homography],
+        src_shapes=[shape],
+        dst_shapes=[shape])
+    assert (np.allclose(metrics["repeatability"], 1.0))
+    assert (np.allclose(metrics["matching_precision"], 1.0))
+    assert (np.all(metrics["homography_accuracy"] == 1.0))
+
+
+if __name__ == "__main__":
+    test_x_translation()
+    print("OK")
@@ -0,0 +1,151 @@
+"""
+    Test for pretrained model downloads (`prefetch_models` and `_download(resume=True)` from the PyTorch model store)
+    against a local HTTP server with Range request support: resuming a truncated download, skipping a file with the
+    expected sha1 hash, and downloading again a file with another hash.
+    Run from the repository root: python -m pytest tests/test_pt_model_store.py
+"""
+
+import io
+import os
+import re
+import hashlib
+import zipfile
+import tempfile
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from pytorch.pytorchcv.models import model_store
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler serving in-memory files (`server.files`) with single `bytes=N-` ranges, and recording requests as
+    (path, Range header) in `server.requests`.
+    """
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        self.server.requests.append((self.path, range_header))
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        start = 0
+        if range_header is not None:
+            start = int(re.match(r"bytes=(\d+)-$", range_header).group(1))
+            if start >= len(data):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(start, len(data) - 1, len(data)))
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ModelStoreServer(object):
+    """
+    Local HTTP server for a fake pretrained model, which is registered in the model store for the time of the context.
+    """
+    def __init__(self,
+                 model_name="fakenet",
+                 error="0123",
+                 release_tag="v0.0.0"):
+        self.model_name = model_name
+        self.model_data = os.urandom(3 * 1048576 + 123)
+        self.sha1_hash = hashlib.sha1(self.model_data).hexdigest()
+        self.file_name = "{}-{}-{}.pth".format(model_name, error, self.sha1_hash[:8])
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+            zf.writestr(self.file_name, self.model_data)
+        self.zip_data = zip_buffer.getvalue()
+        self.model_sha1_record = (error, self.sha1_hash, release_tag)
+        self.server = HTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+        self.server.files = {"/releases/download/{}/{}.zip".format(release_tag, self.file_name): self.zip_data}
+        self.server.requests = []
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.repo_url = model_store.imgclsmob_repo_url
+        model_store.imgclsmob_repo_url = "http://127.0.0.1:{}".format(self.server.server_port)
+        model_store._model_sha1[self.model_name] = self.model_sha1_record
+        return self
+
+    def __exit__(self, *args):
+        model_store.imgclsmob_repo_url = self.repo_url
+        del model_store._model_sha1[self.model_name]
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def read_file(file_path):
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
+def test_resume_truncated_download():
+    store_dir_path = tempfile.mkdtemp()
+    with ModelStoreServer() as server:
+        part_size = len(server.zip_data) // 3
+        with open(os.path.join(store_dir_path, server.file_name + ".zip.part"), "wb") as f:
+            f.write(server.zip_data[:part_size])
+        file_paths = model_store.prefetch_models([server.model_name], local_model_store_dir_path=store_dir_path)
+        assert (server.server.requests == [(list(server.server.files)[0], "bytes={}-".format(part_size))])
+    assert (file_paths == [os.path.join(store_dir_path, server.file_name)])
+    assert (read_file(file_paths[0]) == server.model_data)
+    assert (sorted(os.listdir(store_dir_path)) == sorted([server.file_name, model_store._manifest_file_name]))
+
+
+def test_resume_download_directly():
+    dir_path = tempfile.mkdtemp()
+    with ModelStoreServer() as server:
+        url = model_store.imgclsmob_repo_url + list(server.server.files)[0]
+        file_path = os.path.join(dir_path, "model.zip")
+        with open(file_path + ".part", "wb") as f:
+            f.write(server.zip_data[:100])
+        model_store._download(url=url, path=file_path, resume=True)
+        assert (read_file(file_path) == server.zip_data)
+        assert (not os.path.exists(file_path + ".part"))
+
+        # A part file as long as the whole file can't be continued (416), so it is dropped and downloaded again.
+        with open(file_path + ".part", "wb") as f:
+            f.write(server.zip_data)
+        model_store._download(url=url, path=file_path, overwrite=True, resume=True)
+        assert (read_file(file_path) == server.zip_data)
+        assert ([x[1] for x in server.server.requests] == ["bytes=100-", "bytes={}-".format(len(server.zip_data)), None])
+
+
+def test_skip_matching_file():
+    store_dir_path = tempfile.mkdtemp()
+    with ModelStoreServer() as server:
+        file_path = os.path.join(store_dir_path, server.file_name)
+        with open(file_path, "wb") as f:
+            f.write(server.model_data)
+        file_paths = model_store.prefetch_models([server.model_name], local_model_store_dir_path=store_dir_path)
+        assert (server.server.requests == [])
+    assert (file_paths == [file_path])
+    assert (read_file(file_path) == server.model_data)
+
+
+def test_download_mismatching_file():
+    store_dir_path = tempfile.mkdtemp()
+    with ModelStoreServer() as server:
+        file_path = os.path.join(store_dir_path, server.file_name)
+        with open(file_path, "wb") as f:
+            f.write(server.model_data[:-1] + bytes([server.model_data[-1] ^ 1]))
+        file_paths = model_store.prefetch_models([server.model_name], local_model_store_dir_path=store_dir_path)
+        assert (server.server.requests == [(list(server.server.files)[0], None)])
+    assert (file_paths == [file_path])
+    assert (read_file(file_path) == server.model_data)
+
+
+if __name__ == "__main__":
+    test_resume_truncated_download()
+    test_resume_download_directly()
+    test_skip_matching_file()
+    test_download_mismatching_file()
+    print("OK")
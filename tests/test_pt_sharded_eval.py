@@ -0,0 +1,51 @@
+"""
+    Test for sharded multi-process CPU evaluation (`validate_sharded`) with metrics that accumulate in tensors: the
+    merged metric values must equal the values of a single-process evaluation, on every run.
+    Run from the repository root: python -m pytest tests/test_pt_sharded_eval.py
+"""
+
+import functools
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from pytorch.utils import get_composite_metric, validate, validate_sharded
+
+
+def get_data_source(num_samples,
+                    shard=None):
+    generator = torch.Generator().manual_seed(0)
+    data = torch.randn(num_samples, 16, generator=generator)
+    target = torch.randint(0, 10, (num_samples,), generator=generator)
+    if shard is not None:
+        shard_index, num_shards = shard
+        data, target = data[shard_index::num_shards], target[shard_index::num_shards]
+    return DataLoader(TensorDataset(data, target), batch_size=8)
+
+
+def test_validate_sharded_tensor_states():
+    torch.manual_seed(0)
+    net = torch.nn.Linear(16, 10)
+    metric_names = ["Top1Error", "TopKError"]
+    metric_extra_kwargs = [{}, {"top_k": 5}]
+    get_shard_data_source = functools.partial(get_data_source, 100)
+
+    ref_metric = validate(
+        metric=get_composite_metric(metric_names, metric_extra_kwargs),
+        net=net,
+        val_data=get_shard_data_source(),
+        use_cuda=False)
+    assert (isinstance(ref_metric.metrics[0].get_state()["sum_metric"], torch.Tensor))
+    ref_values = ref_metric.get()
+
+    for num_shards in (2, 3, 2, 3):
+        metric = validate_sharded(
+            metric=get_composite_metric(metric_names, metric_extra_kwargs),
+            net=net,
+            get_data_source=get_shard_data_source,
+            num_shards=num_shards,
+            num_threads=1)
+        assert (metric.get() == ref_values), (num_shards, metric.get(), ref_values)
+
+
+if __name__ == "__main__":
+    test_validate_sharded_tensor_states()
+    print("OK")
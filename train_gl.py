@@ -11,6 +11,7 @@ from mxnet import autograd as ag
 
 from common.logger_utils import initialize_logging
 from common.train_log_param_saver import TrainLogParamSaver
+from common.step_timer import StepTimer, add_step_timer_parser_arguments, create_step_timer
 from gluon.lr_scheduler import LRScheduler
 from gluon.utils import prepare_mx_context, prepare_model, validate
 from gluon.utils import report_accuracy, get_composite_metric, get_metric_name
@@ -255,6 +256,7 @@ def parse_args():
         work_dir_path=args.work_dir)
 
     add_train_cls_parser_arguments(parser)
+    add_step_timer_parser_arguments(parser)
 
     args = parser.parse_args()
     return args
@@ -372,7 +374,8 @@ def train_epoch(epoch,
                 num_classes,
                 num_epochs,
                 grad_clip_value,
-                batch_size_scale):
+                batch_size_scale,
+                step_timer=None):
 
     labels_list_inds = None
     batch_size_extend_count = 0
@@ -381,9 +384,11 @@ def train_epoch(epoch,
         train_data.reset()
     train_metric.reset()
     train_loss = 0.0
+    if step_timer is None:
+        step_timer = StepTimer(enabled=False)
 
     btic = time.time()
-    for i, batch in enumerate(train_data):
+    for i, batch in enumerate(step_timer.iter(train_data, category="train")):
         data_list, labels_list = batch_fn(batch, ctx)
 
         if label_smoothing:
@@ -401,12 +406,15 @@ def train_epoch(epoch,
                 lam = np.random.beta(alpha, alpha)
                 data_list = [lam * X + (1 - lam) * X[::-1] for X in data_list]
                 labels_list = [lam * Y + (1 - lam) * Y[::-1] for Y in labels_list]
+        step_timer.lap("h2d")
 
         with ag.record():
             outputs_list = [net(X.astype(dtype, copy=False)) for X in data_list]
             loss_list = [loss_func(yhat, y.astype(dtype, copy=False)) for yhat, y in zip(outputs_list, labels_list)]
+        step_timer.lap("forward")
         for loss in loss_list:
             loss.backward()
+        step_timer.lap("backward")
         lr_scheduler.update(i, epoch)
 
         if grad_clip_value is not None:
@@ -423,12 +431,14 @@ def train_epoch(epoch,
                     p.zero_grad()
             else:
                 batch_size_extend_count += 1
+        step_timer.lap("optimizer")
 
         train_loss += sum([loss.mean().asscalar() for loss in loss_list]) / len(loss_list)
 
         train_metric.update(
             labels=(labels_list if not (mixup or label_smoothing) else labels_list_inds),
             preds=outputs_list)
+        step_timer.lap("metric")
 
         if log_interval and not (i + 1) % log_interval:
             speed = batch_size * log_interval / (time.time() - btic)
@@ -445,6 +455,7 @@ def train_epoch(epoch,
     throughput = int(batch_size * (i + 1) / (time.time() - tic))
     logging.info("[Epoch {}] speed: {:.2f} samples/sec\ttime cost: {:.2f} sec".format(
         epoch + 1, throughput, time.time() - tic))
+    step_timer.log_summary("[Epoch {}] train steps".format(epoch + 1))
 
     train_loss /= (i + 1)
     train_accuracy_msg = report_accuracy(metric=train_metric)
@@ -475,7 +486,8 @@ def train_net(batch_size,
               batch_size_scale,
               val_metric,
               train_metric,
-              ctx):
+              ctx,
+              step_timer=None):
 
     if batch_size_scale != 1:
         for p in net.collect_params().values():
@@ -485,6 +497,8 @@ def train_net(batch_size,
         ctx = [ctx]
 
     loss_func = gluon.loss.SoftmaxCrossEntropyLoss(sparse_label=(not (mixup or label_smoothing)))
+    if step_timer is None:
+        step_timer = StepTimer(enabled=False)
 
     assert (type(start_epoch1) == int)
     assert (start_epoch1 >= 1)
@@ -523,16 +537,19 @@ def train_net(batch_size,
             num_classes=num_classes,
             num_epochs=num_epochs,
             grad_clip_value=grad_clip_value,
-            batch_size_scale=batch_size_scale)
-
-        validate(
-            metric=val_metric,
-            net=net,
-            val_data=val_data,
-            batch_fn=batch_fn,
-            data_source_needs_reset=data_source_needs_reset,
-            dtype=dtype,
-            ctx=ctx)
+            batch_size_scale=batch_size_scale,
+            step_timer=step_timer)
+
+        with step_timer.span("validation"):
+            validate(
+                metric=val_metric,
+                net=net,
+                val_data=val_data,
+                batch_fn=batch_fn,
+                data_source_needs_reset=data_source_needs_reset,
+                dtype=dtype,
+                ctx=ctx,
+                step_timer=step_timer)
         val_accuracy_msg = report_accuracy(metric=val_metric)
         logging.info("[Epoch {}] validation: {}".format(epoch + 1, val_accuracy_msg))
 
@@ -542,10 +559,12 @@ def train_net(batch_size,
             train_acc_values = train_metric.get()[1]
             val_acc_values = val_acc_values if type(val_acc_values) == list else [val_acc_values]
             train_acc_values = train_acc_values if type(train_acc_values) == list else [train_acc_values]
-            lp_saver.epoch_test_end_callback(
-                epoch1=(epoch + 1),
-                params=(val_acc_values + train_acc_values + [train_loss, trainer.learning_rate]),
-                **lp_saver_kwargs)
+            with step_timer.span("checkpoint"):
+                lp_saver.epoch_test_end_callback(
+                    epoch1=(epoch + 1),
+                    params=(val_acc_values + train_acc_values + [train_loss, trainer.learning_rate]),
+                    **lp_saver_kwargs)
+        step_timer.log_summary("[Epoch {}] validation steps".format(epoch + 1))
 
     logging.info("Total time cost: {:.2f} sec".format(time.time() - gtic))
     if lp_saver is not None:
@@ -644,6 +663,10 @@ def main():
     else:
         lp_saver = None
 
+    step_timer = create_step_timer(
+        args=args,
+        sync_fn=mx.nd.waitall)
+
     train_net(
         batch_size=batch_size,
         num_epochs=args.num_epochs,
@@ -666,7 +689,9 @@ def main():
         batch_size_scale=args.batch_size_scale,
         val_metric=get_composite_metric(ds_metainfo.val_metric_names, ds_metainfo.val_metric_extra_kwargs),
         train_metric=get_composite_metric(ds_metainfo.train_metric_names, ds_metainfo.train_metric_extra_kwargs),
-        ctx=ctx)
+        ctx=ctx,
+        step_timer=step_timer)
+    step_timer.close()
 
 
 if __name__ == "__main__":
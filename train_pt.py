@@ -3,6 +3,8 @@ import time
 import logging
 import argparse
 import random
+import functools
+import contextlib
 import numpy as np
 
 import torch.nn as nn
@@ -11,8 +13,11 @@ import torch.utils.data
 
 from common.logger_utils import initialize_logging
 from common.train_log_param_saver import TrainLogParamSaver
+from common.async_checkpoint_writer import AsyncCheckpointWriter
+from common.step_timer import StepTimer, add_step_timer_parser_arguments, create_step_timer
 from pytorch.utils import prepare_pt_context, prepare_model, validate
-from pytorch.utils import report_accuracy, get_composite_metric, get_metric_name
+from pytorch.utils import report_accuracy, get_composite_metric, get_metric_name, get_cpu_snapshot
+from pytorch.utils import init_distributed, get_dist_world_size, all_reduce_mean, all_reduce_metric
 
 from pytorch.dataset_utils import get_dataset_metainfo
 from pytorch.dataset_utils import get_train_data_source, get_val_data_source
@@ -28,6 +33,11 @@ def add_train_cls_parser_arguments(parser):
         "--use-pretrained",
         action="store_true",
         help="enable using pretrained model from github repo")
+    parser.add_argument(
+        "--dtype",
+        type=str,
+        default="float32",
+        help="data type for training. options are float32, float16 and bfloat16 (mixed precision with autocast)")
     parser.add_argument(
         "--resume",
         type=str,
@@ -44,6 +54,16 @@ def add_train_cls_parser_arguments(parser):
         type=int,
         default=0,
         help="number of gpus to use")
+    parser.add_argument(
+        "--distributed",
+        action="store_true",
+        help="enable multi-process training with DistributedDataParallel (launch with torchrun, one process per "
+             "GPU or CPU worker)")
+    parser.add_argument(
+        "--dist-backend",
+        type=str,
+        default="",
+        help="distributed backend. options are gloo and nccl (by default nccl for GPUs, gloo for CPUs)")
     parser.add_argument(
         "-j",
         "--num-data-workers",
@@ -61,7 +81,7 @@ def add_train_cls_parser_arguments(parser):
         "--batch-size-scale",
         type=int,
         default=1,
-        help="manual batch-size increasing factor")
+        help="manual batch-size increasing factor (number of batches for gradient accumulation)")
     parser.add_argument(
         "--num-epochs",
         type=int,
@@ -82,7 +102,7 @@ def add_train_cls_parser_arguments(parser):
         "--optimizer-name",
         type=str,
         default="nag",
-        help="optimizer name")
+        help="optimizer name. options are sgd, nag, adam and adamw")
     parser.add_argument(
         "--lr",
         type=float,
@@ -188,6 +208,10 @@ def add_train_cls_parser_arguments(parser):
         type=int,
         default=4,
         help="saving parameters epoch interval, best model will always be saved")
+    parser.add_argument(
+        "--async-checkpoint",
+        action="store_true",
+        help="write checkpoints in a background thread, as one .pth file with model and optimizer states")
     parser.add_argument(
         "--save-dir",
         type=str,
@@ -230,7 +254,7 @@ def parse_args():
         "--dataset",
         type=str,
         default="ImageNet1K",
-        help="dataset name. options are ImageNet1K, CUB200_2011, CIFAR10, CIFAR100, SVHN")
+        help="dataset name. options are ImageNet1K, ImageNet1K_shard, CUB200_2011, CIFAR10, CIFAR100, SVHN")
     parser.add_argument(
         "--work-dir",
         type=str,
@@ -244,6 +268,7 @@ def parse_args():
         work_dir_path=args.work_dir)
 
     add_train_cls_parser_arguments(parser)
+    add_step_timer_parser_arguments(parser)
 
     args = parser.parse_args()
     return args
@@ -276,7 +301,8 @@ def prepare_trainer(net,
                     # batch_size,
                     num_epochs,
                     # num_training_samples,
-                    state_file_path):
+                    state_file_path,
+                    grad_scaler=None):
 
     optimizer_name = optimizer_name.lower()
     if (optimizer_name == "sgd") or (optimizer_name == "nag"):
@@ -286,6 +312,16 @@ def prepare_trainer(net,
             momentum=momentum,
             weight_decay=wd,
             nesterov=(optimizer_name == "nag"))
+    elif optimizer_name == "adam":
+        optimizer = torch.optim.Adam(
+            params=net.parameters(),
+            lr=lr,
+            weight_decay=wd)
+    elif optimizer_name == "adamw":
+        optimizer = torch.optim.AdamW(
+            params=net.parameters(),
+            lr=lr,
+            weight_decay=wd)
     else:
         raise ValueError("Usupported optimizer: {}".format(optimizer_name))
 
@@ -293,6 +329,8 @@ def prepare_trainer(net,
         checkpoint = torch.load(state_file_path)
         if type(checkpoint) == dict:
             optimizer.load_state_dict(checkpoint["optimizer"])
+            if (grad_scaler is not None) and ("grad_scaler" in checkpoint):
+                grad_scaler.load_state_dict(checkpoint["grad_scaler"])
             start_epoch = checkpoint["epoch"]
         else:
             start_epoch = None
@@ -341,6 +379,42 @@ def save_params(file_stem,
         f=(file_stem + ".states"))
 
 
+def save_params_async(file_stem,
+                      state,
+                      checkpoint_writer):
+    """
+    Save a checkpoint in the background: the state is copied to host memory, and then written by the checkpoint writer
+    into one file (`.pth` with model weights, optimizer state, and epoch, which is accepted by both `--resume` and
+    `--resume-state`) with atomic rename.
+    """
+    checkpoint_writer.write(
+        file_path=(file_stem + ".pth"),
+        write_fn=functools.partial(torch.save, get_cpu_snapshot(state)))
+
+
+def get_autocast_dtype(dtype):
+    """
+    Get data type for mixed precision autocast (None for plain float32 training).
+    """
+    if dtype == "float32":
+        return None
+    elif dtype in ("float16", "bfloat16"):
+        return getattr(torch, dtype)
+    else:
+        raise ValueError("Usupported dtype: {}".format(dtype))
+
+
+def create_grad_scaler(dtype,
+                       use_cuda):
+    """
+    Create a gradient scaler for float16 mixed precision training (None for other data types, so that float32 training
+    doesn't need `torch.amp`).
+    """
+    if dtype != "float16":
+        return None
+    return torch.amp.GradScaler("cuda" if use_cuda else "cpu")
+
+
 def train_epoch(epoch,
                 net,
                 train_metric,
@@ -350,29 +424,74 @@ def train_epoch(epoch,
                 optimizer,
                 # lr_scheduler,
                 batch_size,
-                log_interval):
+                log_interval,
+                dtype="float32",
+                grad_scaler=None,
+                batch_size_scale=1,
+                step_timer=None):
 
     tic = time.time()
     net.train()
     train_metric.reset()
-    train_loss = 0.0
+    # The loss sum is accumulated on the device and read only at the epoch end (no per-batch synchronization).
+    train_loss_sum = torch.zeros((), dtype=torch.float64, device=("cuda" if use_cuda else "cpu"))
+
+    autocast_dtype = get_autocast_dtype(dtype)
+    if autocast_dtype is not None:
+        autocast = functools.partial(torch.autocast, device_type=("cuda" if use_cuda else "cpu"), dtype=autocast_dtype)
+    else:
+        autocast = contextlib.nullcontext
+
+    def backward(loss):
+        if grad_scaler is not None:
+            grad_scaler.scale(loss).backward()
+        else:
+            loss.backward()
+
+    def optimizer_step():
+        if grad_scaler is not None:
+            grad_scaler.step(optimizer)
+            grad_scaler.update()
+        else:
+            optimizer.step()
+
+    if step_timer is None:
+        step_timer = StepTimer(enabled=False)
+    batch_size_extend_count = 0
+    optimizer.zero_grad()
 
     btic = time.time()
-    for i, (data, target) in enumerate(train_data):
+    for i, (data, target) in enumerate(step_timer.iter(train_data, category="train")):
         if use_cuda:
             data = data.cuda(non_blocking=True)
             target = target.cuda(non_blocking=True)
-        output = net(data)
-        loss = L(output, target)
-        optimizer.zero_grad()
-        loss.backward()
-        optimizer.step()
-
-        train_loss += loss.item()
+        step_timer.lap("h2d")
+        with autocast():
+            output = net(data)
+            loss = L(output, target)
+        step_timer.lap("forward")
+        if batch_size_scale == 1:
+            backward(loss)
+            step_timer.lap("backward")
+            optimizer_step()
+            optimizer.zero_grad()
+        else:
+            backward(loss / batch_size_scale)
+            step_timer.lap("backward")
+            if (i + 1) % batch_size_scale == 0:
+                batch_size_extend_count = 0
+                optimizer_step()
+                optimizer.zero_grad()
+            else:
+                batch_size_extend_count += 1
+        step_timer.lap("optimizer")
+
+        train_loss_sum += loss.detach()
 
         train_metric.update(
             labels=target,
             preds=output)
+        step_timer.lap("metric")
 
         if log_interval and not (i + 1) % log_interval:
             speed = batch_size * log_interval / (time.time() - btic)
@@ -381,11 +500,20 @@ def train_epoch(epoch,
             logging.info("Epoch[{}] Batch [{}]\tSpeed: {:.2f} samples/sec\t{}\tlr={:.5f}".format(
                 epoch + 1, i, speed, train_accuracy_msg, optimizer.param_groups[0]["lr"]))
 
-    throughput = int(batch_size * (i + 1) / (time.time() - tic))
+    if (batch_size_scale != 1) and (batch_size_extend_count > 0):
+        for param in net.parameters():
+            if param.grad is not None:
+                param.grad.mul_(float(batch_size_scale) / batch_size_extend_count)
+        optimizer_step()
+        optimizer.zero_grad()
+
+    throughput = int(batch_size * get_dist_world_size() * (i + 1) / (time.time() - tic))
     logging.info("[Epoch {}] speed: {:.2f} samples/sec\ttime cost: {:.2f} sec".format(
         epoch + 1, throughput, time.time() - tic))
+    step_timer.log_summary("[Epoch {}] train steps".format(epoch + 1))
 
-    train_loss /= (i + 1)
+    train_loss = all_reduce_mean(train_loss_sum.item() / (i + 1))
+    all_reduce_metric(train_metric)
     train_accuracy_msg = report_accuracy(metric=train_metric)
     logging.info("[Epoch {}] training: {}\tloss={:.4f}".format(
         epoch + 1, train_accuracy_msg, train_loss))
@@ -406,13 +534,22 @@ def train_net(batch_size,
               num_classes,
               val_metric,
               train_metric,
-              use_cuda):
+              use_cuda,
+              dtype="float32",
+              grad_scaler=None,
+              batch_size_scale=1,
+              step_timer=None):
     assert (num_classes > 0)
+    if step_timer is None:
+        step_timer = StepTimer(enabled=False)
 
     L = nn.CrossEntropyLoss()
     if use_cuda:
         L = L.cuda()
 
+    logging.info("Training mode: dtype={}, loss scaling={}, batch size scale={} (effective batch size {})".format(
+        dtype, grad_scaler is not None, batch_size_scale, batch_size * batch_size_scale))
+
     assert (type(start_epoch1) == int)
     assert (start_epoch1 >= 1)
     if start_epoch1 > 1:
@@ -428,6 +565,10 @@ def train_net(batch_size,
     gtic = time.time()
     for epoch in range(start_epoch1 - 1, num_epochs):
         lr_scheduler.step()
+        if hasattr(train_data, "sampler") and hasattr(train_data.sampler, "set_epoch"):
+            train_data.sampler.set_epoch(epoch)
+        if hasattr(train_data, "dataset") and hasattr(train_data.dataset, "set_epoch"):
+            train_data.dataset.set_epoch(epoch)
 
         train_loss = train_epoch(
             epoch=epoch,
@@ -439,13 +580,19 @@ def train_net(batch_size,
             optimizer=optimizer,
             # lr_scheduler,
             batch_size=batch_size,
-            log_interval=log_interval)
-
-        validate(
-            metric=val_metric,
-            net=net,
-            val_data=val_data,
-            use_cuda=use_cuda)
+            log_interval=log_interval,
+            dtype=dtype,
+            grad_scaler=grad_scaler,
+            batch_size_scale=batch_size_scale,
+            step_timer=step_timer)
+
+        with step_timer.span("validation"):
+            validate(
+                metric=val_metric,
+                net=net,
+                val_data=val_data,
+                use_cuda=use_cuda,
+                step_timer=step_timer)
         val_accuracy_msg = report_accuracy(metric=val_metric)
         logging.info("[Epoch {}] validation: {}".format(epoch + 1, val_accuracy_msg))
 
@@ -455,15 +602,19 @@ def train_net(batch_size,
                 "state_dict": net.state_dict(),
                 "optimizer": optimizer.state_dict(),
             }
+            if grad_scaler is not None:
+                state["grad_scaler"] = grad_scaler.state_dict()
             lp_saver_kwargs = {"state": state}
             val_acc_values = val_metric.get()[1]
             train_acc_values = train_metric.get()[1]
             val_acc_values = val_acc_values if type(val_acc_values) == list else [val_acc_values]
             train_acc_values = train_acc_values if type(train_acc_values) == list else [train_acc_values]
-            lp_saver.epoch_test_end_callback(
-                epoch1=(epoch + 1),
-                params=(val_acc_values + train_acc_values + [train_loss, optimizer.param_groups[0]["lr"]]),
-                **lp_saver_kwargs)
+            with step_timer.span("checkpoint"):
+                lp_saver.epoch_test_end_callback(
+                    epoch1=(epoch + 1),
+                    params=(val_acc_values + train_acc_values + [train_loss, optimizer.param_groups[0]["lr"]]),
+                    **lp_saver_kwargs)
+        step_timer.log_summary("[Epoch {}] validation steps".format(epoch + 1))
 
     logging.info("Total time cost: {:.2f} sec".format(time.time() - gtic))
     if lp_saver is not None:
@@ -476,38 +627,60 @@ def main():
     args = parse_args()
     args.seed = init_rand(seed=args.seed)
 
-    _, log_file_exist = initialize_logging(
-        logging_dir_path=args.save_dir,
-        logging_file_name=args.logging_file_name,
-        script_args=args,
-        log_packages=args.log_packages,
-        log_pip_packages=args.log_pip_packages)
-
-    use_cuda, batch_size = prepare_pt_context(
-        num_gpus=args.num_gpus,
-        batch_size=args.batch_size)
+    if args.distributed:
+        rank, world_size = init_distributed(
+            backend=args.dist_backend,
+            use_cuda=(args.num_gpus > 0))
+    else:
+        rank, world_size = 0, 1
+
+    if rank == 0:
+        _, log_file_exist = initialize_logging(
+            logging_dir_path=args.save_dir,
+            logging_file_name=args.logging_file_name,
+            script_args=args,
+            log_packages=args.log_packages,
+            log_pip_packages=args.log_pip_packages)
+        if args.distributed:
+            logging.info("Distributed training: {} processes, backend={}".format(
+                world_size, torch.distributed.get_backend()))
+
+    if args.distributed:
+        use_cuda, batch_size = (args.num_gpus > 0), args.batch_size
+    else:
+        use_cuda, batch_size = prepare_pt_context(
+            num_gpus=args.num_gpus,
+            batch_size=args.batch_size)
 
     net = prepare_model(
         model_name=args.model,
         use_pretrained=args.use_pretrained,
         pretrained_model_file_path=args.resume.strip(),
-        use_cuda=use_cuda)
+        use_cuda=use_cuda,
+        use_distributed=args.distributed)
     real_net = net.module if hasattr(net, "module") else net
     assert (hasattr(real_net, "num_classes"))
     num_classes = real_net.num_classes
 
     ds_metainfo = get_dataset_metainfo(dataset_name=args.dataset)
     ds_metainfo.update(args=args)
+    # Raw uint8 input is supported only for evaluation (the folded first convolution isn't trainable as is).
+    assert (not getattr(ds_metainfo, "raw_input", False))
 
     train_data = get_train_data_source(
         ds_metainfo=ds_metainfo,
         batch_size=batch_size,
-        num_workers=args.num_workers)
+        num_workers=args.num_workers,
+        distributed=args.distributed)
     val_data = get_val_data_source(
         ds_metainfo=ds_metainfo,
         batch_size=batch_size,
-        num_workers=args.num_workers)
+        num_workers=args.num_workers,
+        distributed=args.distributed)
 
+    grad_scaler = create_grad_scaler(
+        dtype=args.dtype,
+        use_cuda=use_cuda)
     optimizer, lr_scheduler, start_epoch = prepare_trainer(
         net=net,
         optimizer_name=args.optimizer_name,
@@ -522,9 +695,13 @@ def main():
         # batch_size=batch_size,
         num_epochs=args.num_epochs,
         # num_training_samples=num_training_samples,
-        state_file_path=args.resume_state)
+        state_file_path=args.resume_state,
+        grad_scaler=grad_scaler)
 
-    if args.save_dir and args.save_interval:
+    checkpoint_writer = None
+    if args.save_dir and args.save_interval and (rank == 0):
+        if args.async_checkpoint:
+            checkpoint_writer = AsyncCheckpointWriter()
         param_names = ds_metainfo.val_metric_capts + ds_metainfo.train_metric_capts + ["Train.Loss", "LR"]
         lp_saver = TrainLogParamSaver(
             checkpoint_file_name_prefix="{}_{}".format(ds_metainfo.short_label, args.model),
@@ -534,8 +711,9 @@ def main():
             best_checkpoint_dir_path=None,
             last_checkpoint_file_count=2,
             best_checkpoint_file_count=2,
-            checkpoint_file_save_callback=save_params,
-            checkpoint_file_exts=(".pth", ".states"),
+            checkpoint_file_save_callback=(functools.partial(save_params_async, checkpoint_writer=checkpoint_writer)
+                                           if checkpoint_writer is not None else save_params),
+            checkpoint_file_exts=((".pth",) if checkpoint_writer is not None else (".pth", ".states")),
             save_interval=args.save_interval,
             num_epochs=args.num_epochs,
             param_names=param_names,
@@ -544,25 +722,42 @@ def main():
             # mask=None,
             score_log_file_path=os.path.join(args.save_dir, "score.log"),
             score_log_attempt_value=args.attempt,
-            best_map_log_file_path=os.path.join(args.save_dir, "best_map.log"))
+            best_map_log_file_path=os.path.join(args.save_dir, "best_map.log"),
+            checkpoint_writer=checkpoint_writer)
     else:
         lp_saver = None
 
-    train_net(
-        batch_size=batch_size,
-        num_epochs=args.num_epochs,
-        start_epoch1=args.start_epoch,
-        train_data=train_data,
-        val_data=val_data,
-        net=net,
-        optimizer=optimizer,
-        lr_scheduler=lr_scheduler,
-        lp_saver=lp_saver,
-        log_interval=args.log_interval,
-        num_classes=num_classes,
-        val_metric=get_composite_metric(ds_metainfo.val_metric_names, ds_metainfo.val_metric_extra_kwargs),
-        train_metric=get_composite_metric(ds_metainfo.train_metric_names, ds_metainfo.train_metric_extra_kwargs),
-        use_cuda=use_cuda)
+    step_timer = create_step_timer(
+        args=args,
+        sync_fn=(torch.cuda.synchronize if use_cuda else None))
+
+    try:
+        train_net(
+            batch_size=batch_size,
+            num_epochs=args.num_epochs,
+            start_epoch1=args.start_epoch,
+            train_data=train_data,
+            val_data=val_data,
+            net=net,
+            optimizer=optimizer,
+            lr_scheduler=lr_scheduler,
+            lp_saver=lp_saver,
+            log_interval=args.log_interval,
+            num_classes=num_classes,
+            val_metric=get_composite_metric(ds_metainfo.val_metric_names, ds_metainfo.val_metric_extra_kwargs),
+            train_metric=get_composite_metric(ds_metainfo.train_metric_names, ds_metainfo.train_metric_extra_kwargs),
+            use_cuda=use_cuda,
+            dtype=args.dtype,
+            grad_scaler=grad_scaler,
+            batch_size_scale=args.batch_size_scale,
+            step_timer=step_timer)
+    finally:
+        if checkpoint_writer is not None:
+            checkpoint_writer.close()
+        step_timer.close()
+
+    if args.distributed:
+        torch.distributed.destroy_process_group()
 
 
 if __name__ == "__main__":